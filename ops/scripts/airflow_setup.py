@@ -17,6 +17,10 @@ ENV = {
     "CLICKHOUSE_PASSWORD": os.getenv("CLICKHOUSE_PASSWORD", "clickpass"),
     "CEPH_BUCKET_BRONZE": os.getenv("CEPH_BUCKET_BRONZE", "bronze"),
     "CEPH_BUCKET_SILVER": os.getenv("CEPH_BUCKET_SILVER", "silver"),
+    "BATCH_SCORING_POOL_SLOTS": os.getenv("BATCH_SCORING_POOL_SLOTS", "4"),
+    "ICEBERG_MAINTENANCE_POOL_SLOTS": os.getenv("ICEBERG_MAINTENANCE_POOL_SLOTS", "1"),
+    "MEDALLION_POOL_SLOTS": os.getenv("MEDALLION_POOL_SLOTS", "8"),
+    "MEDALLION_BACKFILL_POOL_SLOTS": os.getenv("MEDALLION_BACKFILL_POOL_SLOTS", "8"),
 }
 
 CONNECTIONS = [
@@ -69,10 +73,29 @@ VARIABLES = {
     "gold_schema": "gold",
 }
 
+POOLS = {
+    "batch_scoring": {
+        "slots": int(ENV["BATCH_SCORING_POOL_SLOTS"]),
+        "description": "Concurrent churn_batch_scoring partitions",
+    },
+    "iceberg_maintenance": {
+        "slots": int(ENV["ICEBERG_MAINTENANCE_POOL_SLOTS"]),
+        "description": "Concurrent local Spark sessions compacting Iceberg tables",
+    },
+    "medallion_transform": {
+        "slots": int(ENV["MEDALLION_POOL_SLOTS"]),
+        "description": "Concurrent Bronze-to-Silver tasks in medallion_batch_demo",
+    },
+    "medallion_backfill": {
+        "slots": int(ENV["MEDALLION_BACKFILL_POOL_SLOTS"]),
+        "description": "Concurrent order_date days reprocessed by medallion_backfill",
+    },
+}
+
 PYTHON_PAYLOAD = f"""
 import json
 from airflow import settings
-from airflow.models import Connection, Variable
+from airflow.models import Connection, Pool, Variable
 
 session = settings.Session()
 try:
@@ -87,6 +110,8 @@ try:
         session.commit()
     for key, value in {json.dumps(VARIABLES)}.items():
         Variable.set(key, value, serialize_json=False)
+    for name, pool in {json.dumps(POOLS)}.items():
+        Pool.create_or_update_pool(name, slots=pool["slots"], description=pool["description"], include_deferred=False)
 finally:
     session.close()
 """
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""Compare the heap and month-partitioned ``gold.orders_snapshot`` layouts: upserts and mart queries.
+
+Both layouts are rebuilt as scratch tables in the ``gold`` schema with the same
+synthetic rows. The heap layout follows 0001-create-gold-table.xml. The partitioned
+layout follows 0002-partition-gold-orders.xml, including its indexes. Upserts use the
+publish path of each layout and are rolled back, so every repeat sees the same data.
+
+    python ops/scripts/benchmark_gold_layout.py --rows 5000000 --batch 50000 --repeats 5
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+MONTHS = 24
+FIRST_DAY = date(2023, 1, 1)
+COLUMNS = "order_id, order_date, customer_id, sales_total, status, ingested_at"
+TABLE_COLUMNS = (
+    "order_id VARCHAR(64) NOT NULL, order_date TIMESTAMP NOT NULL, customer_id VARCHAR(64),"
+    " sales_total NUMERIC(12,2), status VARCHAR(32), ingested_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP"
+)
+LAYOUTS = {
+    "heap": {
+        "table": "gold.bench_orders_heap",
+        "ddl": [f"CREATE TABLE gold.bench_orders_heap ({TABLE_COLUMNS}, PRIMARY KEY (order_id))"],
+        "upsert": (
+            "INSERT INTO gold.bench_orders_heap ({columns}) SELECT {columns} FROM bench_stage"
+            " ON CONFLICT (order_id) DO UPDATE SET order_date = EXCLUDED.order_date,"
+            " customer_id = EXCLUDED.customer_id, sales_total = EXCLUDED.sales_total,"
+            " status = EXCLUDED.status, ingested_at = EXCLUDED.ingested_at"
+        ),
+    },
+    "partitioned": {
+        "table": "gold.bench_orders_partitioned",
+        "ddl": [
+            f"CREATE TABLE gold.bench_orders_partitioned ({TABLE_COLUMNS}, PRIMARY KEY (order_id, order_date))"
+            " PARTITION BY RANGE (order_date)",
+            "CREATE INDEX ON gold.bench_orders_partitioned (customer_id, order_date)",
+            "CREATE INDEX ON gold.bench_orders_partitioned USING brin (order_date)",
+        ],
+        "upsert": (
+            "DELETE FROM gold.bench_orders_partitioned AS g USING bench_stage AS s"
+            " WHERE g.order_id = s.order_id AND g.order_date <> s.order_date;"
+            " INSERT INTO gold.bench_orders_partitioned ({columns}) SELECT {columns} FROM bench_stage"
+            " ON CONFLICT (order_id, order_date) DO UPDATE SET customer_id = EXCLUDED.customer_id,"
+            " sales_total = EXCLUDED.sales_total, status = EXCLUDED.status, ingested_at = EXCLUDED.ingested_at"
+        ),
+    },
+}
+QUERIES = {
+    # orders_summary over the three latest months.
+    "mart_recent_months": (
+        "SELECT customer_id, date_trunc('month', order_date), sum(sales_total), count(*) FROM {table}"
+        " WHERE order_date >= %(recent)s GROUP BY 1, 2"
+    ),
+    # BI drill-down into one customer's last year.
+    "customer_history": (
+        "SELECT order_date, sales_total, status FROM {table}"
+        " WHERE customer_id = %(customer_id)s AND order_date >= %(year_ago)s ORDER BY order_date"
+    ),
+    # The backfill's per-day delete predicate.
+    "single_day": "SELECT count(*) FROM {table} WHERE order_date >= %(day)s AND order_date < %(day)s + INTERVAL '1 day'",
+}
+
+
+def _connect():
+    return psycopg2.connect(
+        host=os.getenv("CURATED_PG_HOST", "localhost"),
+        port=int(os.getenv("CURATED_PG_PORT", "5432")),
+        dbname=os.getenv("CURATED_PG_DB", "curated"),
+        user=os.getenv("CURATED_PG_USER", "curated_user"),
+        password=os.getenv("CURATED_PG_PASSWORD", "curatedpass"),
+    )
+
+
+def _customer(number: int) -> str:
+    return f"CUST-{number:07d}"
+
+
+def prepare(connection, rows: int, customers: int) -> None:
+    span_seconds = MONTHS * 30 * 86400
+    with connection, connection.cursor() as cursor:
+        for layout in LAYOUTS.values():
+            cursor.execute(f"DROP TABLE IF EXISTS {layout['table']}")
+            for statement in layout["ddl"]:
+                cursor.execute(statement)
+        for offset in range(MONTHS + 1):
+            start = date(FIRST_DAY.year + (FIRST_DAY.month - 1 + offset) // 12, (FIRST_DAY.month - 1 + offset) % 12 + 1, 1)
+            end = date(start.year + start.month // 12, start.month % 12 + 1, 1)
+            cursor.execute(
+                f"CREATE TABLE gold.bench_orders_partitioned_p{start:%Y%m} PARTITION OF gold.bench_orders_partitioned"
+                " FOR VALUES FROM (%s) TO (%s)",
+                (start, end),
+            )
+        for layout in LAYOUTS.values():
+            cursor.execute(
+                f"INSERT INTO {layout['table']} ({COLUMNS})"
+                " SELECT 'ord-' || n,"
+                f" %(first)s::timestamp + (n::bigint * {span_seconds} / %(rows)s) * INTERVAL '1 second',"
+                " 'CUST-' || lpad(((hashint4(n) & 2147483647) %% %(customers)s)::text, 7, '0'),"
+                " round(((hashint4(n + 1) & 2147483647) %% 100000) / 100.0, 2),"
+                " (ARRAY['shipped', 'delivered', 'processing'])[1 + (hashint4(n + 2) & 2147483647) %% 3],"
+                " now()"
+                " FROM generate_series(0, %(rows)s - 1) AS n",
+                {"first": FIRST_DAY, "rows": rows, "customers": customers},
+            )
+    connection.autocommit = True
+    with connection.cursor() as cursor:
+        for layout in LAYOUTS.values():
+            cursor.execute(f"VACUUM ANALYZE {layout['table']}")
+    connection.autocommit = False
+
+
+def upsert_batch(rows: int, batch: int, customers: int) -> List[tuple]:
+    """Half updates of existing orders (same order_date), half new orders in the latest month."""
+    now = datetime.utcnow()
+    latest = datetime.combine(FIRST_DAY, datetime.min.time()) + timedelta(days=MONTHS * 30 - 15)
+    span_seconds = MONTHS * 30 * 86400
+    updates = [
+        (
+            f"ord-{n}",
+            datetime.combine(FIRST_DAY, datetime.min.time()) + timedelta(seconds=n * span_seconds // rows),
+            _customer(random.randrange(customers)),
+            round(random.uniform(1, 1000), 2),
+            "delivered",
+            now,
+        )
+        for n in random.sample(range(rows), batch // 2)
+    ]
+    inserts = [
+        (f"new-{i}", latest + timedelta(seconds=i), _customer(random.randrange(customers)), 9.99, "processing", now)
+        for i in range(batch - len(updates))
+    ]
+    return updates + inserts
+
+
+def time_upserts(connection, layout: Dict[str, str], batch: List[tuple], repeats: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeats):
+        with connection.cursor() as cursor:
+            started = time.perf_counter()
+            cursor.execute(f"CREATE TEMP TABLE bench_stage (LIKE {layout['table']}) ON COMMIT DROP")
+            execute_values(cursor, f"INSERT INTO bench_stage ({COLUMNS}) VALUES %s", batch, page_size=5_000)
+            cursor.execute(layout["upsert"].format(columns=COLUMNS))
+            timings.append((time.perf_counter() - started) * 1000)
+        connection.rollback()
+    return {"p50_ms": statistics.median(timings), "max_ms": max(timings)}
+
+
+def time_query(connection, sql: str, params: Callable[[], Dict[str, object]], repeats: int) -> Dict[str, float]:
+    timings = []
+    with connection.cursor() as cursor:
+        for _ in range(repeats):
+            started = time.perf_counter()
+            cursor.execute(sql, params())
+            cursor.fetchall()
+            timings.append((time.perf_counter() - started) * 1000)
+    connection.rollback()
+    return {"p50_ms": statistics.median(timings), "max_ms": max(timings)}
+
+
+def _print_comparison(title: str, heap: Dict[str, float], partitioned: Dict[str, float]) -> None:
+    print(f"\n{title}")
+    print(f"{'metric':<16}{'heap':>14}{'partitioned':>14}{'part/heap':>12}")
+    for key in heap:
+        ratio = f"{partitioned[key] / heap[key]:.2f}" if heap[key] else "-"
+        print(f"{key:<16}{heap[key]:>14,.1f}{partitioned[key]:>14,.1f}{ratio:>12}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000_000, help="Synthetic orders per layout")
+    parser.add_argument("--customers", type=int, default=200_000, help="Distinct synthetic customers")
+    parser.add_argument("--batch", type=int, default=20_000, help="Rows per timed upsert")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per upsert/query")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch tables afterwards")
+    args = parser.parse_args()
+
+    connection = _connect()
+    random.seed(7)
+    prepare(connection, args.rows, args.customers)
+    last_day = datetime.combine(FIRST_DAY, datetime.min.time()) + timedelta(days=MONTHS * 30 - 1)
+
+    def params() -> Dict[str, object]:
+        # Fresh customer and day per repeat so caches do not flatter either layout.
+        return {
+            "recent": last_day - timedelta(days=90),
+            "year_ago": last_day - timedelta(days=365),
+            "customer_id": _customer(random.randrange(args.customers)),
+            "day": last_day - timedelta(days=random.randrange(MONTHS * 30)),
+        }
+
+    try:
+        batch = upsert_batch(args.rows, args.batch, args.customers)
+        _print_comparison(
+            f"Upsert {len(batch)} rows (ms)",
+            time_upserts(connection, LAYOUTS["heap"], batch, args.repeats),
+            time_upserts(connection, LAYOUTS["partitioned"], batch, args.repeats),
+        )
+        for name, sql in QUERIES.items():
+            _print_comparison(
+                f"{name} (ms)",
+                time_query(connection, sql.format(table=LAYOUTS["heap"]["table"]), params, args.repeats),
+                time_query(connection, sql.format(table=LAYOUTS["partitioned"]["table"]), params, args.repeats),
+            )
+    finally:
+        if not args.keep:
+            with connection, connection.cursor() as cursor:
+                for layout in LAYOUTS.values():
+                    cursor.execute(f"DROP TABLE IF EXISTS {layout['table']}")
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
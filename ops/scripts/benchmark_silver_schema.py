@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Compare the v1 and v2 ClickHouse Silver layouts: bytes on disk and customer lookups.
+
+Both layouts are cloned into scratch tables (``CREATE TABLE ... AS`` keeps codecs,
+partitioning and skip indexes), filled with the same rows, merged, and measured.
+
+    python ops/scripts/benchmark_silver_schema.py --rows 5000000 --lookups 200
+"""
+import argparse
+import os
+import statistics
+import time
+from typing import Dict, List
+
+from clickhouse_driver import Client
+
+LAYOUTS = {
+    "v1": "analytics.orders_clean_v1",
+    "v2": "analytics.orders_clean",
+}
+COLUMNS = "order_id, order_date, customer_id, status, sales_total, ingestion_date"
+
+
+def _client() -> Client:
+    return Client(
+        host=os.getenv("CLICKHOUSE_HOST", "localhost"),
+        port=int(os.getenv("CLICKHOUSE_NATIVE_PORT", "9000")),
+        user=os.getenv("CLICKHOUSE_USER", "default"),
+        password=os.getenv("CLICKHOUSE_PASSWORD", ""),
+    )
+
+
+def _synthetic_insert(table: str, rows: int, customers: int) -> str:
+    return (
+        f"INSERT INTO {table} ({COLUMNS}) "
+        "SELECT concat('ord-', toString(number)) AS order_id,"
+        f" toDateTime('2023-01-01 00:00:00') + intDiv(number * 31536000, {rows}) AS order_date,"
+        f" concat('CUST-', leftPad(toString(cityHash64(number) % {customers}), 7, '0')) AS customer_id,"
+        " ['shipped', 'delivered', 'processing'][1 + (cityHash64(number, 2) % 3)] AS status,"
+        " round((cityHash64(number, 1) % 100000) / 100, 2) AS sales_total,"
+        " toDate(order_date) + 1 AS ingestion_date"
+        f" FROM numbers({rows})"
+    )
+
+
+def prepare(client: Client, rows: int, customers: int) -> Dict[str, str]:
+    scratch = {}
+    for layout, source in LAYOUTS.items():
+        table = f"analytics.bench_orders_{layout}"
+        client.execute(f"DROP TABLE IF EXISTS {table}")
+        client.execute(f"CREATE TABLE {table} AS {source}")
+        if rows:
+            client.execute(_synthetic_insert(table, rows, customers))
+        else:
+            client.execute(f"INSERT INTO {table} ({COLUMNS}) SELECT {COLUMNS} FROM analytics.orders_clean")
+        client.execute(f"OPTIMIZE TABLE {table} FINAL")
+        scratch[layout] = table
+    return scratch
+
+
+def storage(client: Client, table: str) -> Dict[str, int]:
+    database, name = table.split(".")
+    rows, on_disk, compressed, uncompressed = client.execute(
+        "SELECT sum(rows), sum(bytes_on_disk), sum(data_compressed_bytes), sum(data_uncompressed_bytes)"
+        " FROM system.parts WHERE database = %(database)s AND table = %(table)s AND active",
+        {"database": database, "table": name},
+    )[0]
+    columns = client.execute(
+        "SELECT name, data_compressed_bytes FROM system.columns WHERE database = %(database)s AND table = %(table)s",
+        {"database": database, "table": name},
+    )
+    return {
+        "rows": int(rows or 0),
+        "bytes_on_disk": int(on_disk or 0),
+        "compressed": int(compressed or 0),
+        "uncompressed": int(uncompressed or 0),
+        **{f"column:{column}": int(size) for column, size in columns},
+    }
+
+
+def lookups(client: Client, table: str, customer_ids: List[str]) -> Dict[str, float]:
+    latencies, rows_read = [], []
+    for customer_id in customer_ids:
+        started = time.perf_counter()
+        client.execute(
+            f"SELECT count(), sum(sales_total) FROM {table} WHERE customer_id = %(customer_id)s",
+            {"customer_id": customer_id},
+            settings={"use_query_cache": 0},
+        )
+        latencies.append((time.perf_counter() - started) * 1000)
+        rows_read.append(client.last_query.progress.rows)
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[max(int(len(latencies) * 0.95) - 1, 0)],
+        "avg_rows_read": statistics.fmean(rows_read),
+    }
+
+
+def _print_comparison(title: str, v1: Dict[str, float], v2: Dict[str, float]) -> None:
+    print(f"\n{title}")
+    print(f"{'metric':<32}{'v1':>16}{'v2':>16}{'v2/v1':>10}")
+    for key in v1:
+        ratio = f"{v2[key] / v1[key]:.2f}" if v1[key] else "-"
+        print(f"{key:<32}{v1[key]:>16,.1f}{v2.get(key, 0):>16,.1f}{ratio:>10}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=0, help="Synthetic rows per layout (0 copies analytics.orders_clean)")
+    parser.add_argument("--customers", type=int, default=200_000, help="Distinct synthetic customers")
+    parser.add_argument("--lookups", type=int, default=100, help="Customer lookups timed per layout")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch tables afterwards")
+    args = parser.parse_args()
+
+    client = _client()
+    scratch = prepare(client, args.rows, args.customers)
+    customer_ids = [
+        row[0]
+        for row in client.execute(
+            f"SELECT DISTINCT customer_id FROM {scratch['v1']} ORDER BY cityHash64(customer_id) LIMIT {args.lookups}"
+        )
+    ]
+    try:
+        _print_comparison("Storage (bytes)", storage(client, scratch["v1"]), storage(client, scratch["v2"]))
+        _print_comparison(
+            f"Customer lookups ({len(customer_ids)} ids)",
+            lookups(client, scratch["v1"], customer_ids),
+            lookups(client, scratch["v2"], customer_ids),
+        )
+    finally:
+        if not args.keep:
+            for table in scratch.values():
+                client.execute(f"DROP TABLE IF EXISTS {table}")
+
+
+if __name__ == "__main__":
+    main()
@@ -256,57 +256,9 @@ fi
 echo "Starting selected profiles (${PROFILE_LIST[*]})..."
 docker compose "${COMPOSE_PROFILE_FLAGS[@]}" up -d
 
-if profile_selected core; then
-  echo "Waiting for Airflow webserver..."
-  wait_for_service_health airflow-webserver 240 10 || echo "Airflow webserver health check timed out; continuing."
-fi
-
-if profile_selected ml; then
-  echo "Waiting for MLflow tracking server..."
-  wait_for_service_health mlflow 180 5 || echo "MLflow did not report healthy within timeout; check logs."
-fi
-
-if profile_selected ingestion; then
-  echo "Waiting for Airbyte API to become reachable..."
-  AIRBYTE_HEALTH_URL="${AIRBYTE_API_URL:-http://localhost:8001/api}/v1/health"
-  airbyte_ready=false
-  for attempt in $(seq 1 120); do
-    if curl -sf "$AIRBYTE_HEALTH_URL" >/dev/null 2>&1; then
-      airbyte_ready=true
-      break
-    fi
-    sleep 5
-  done
-
-  if [ "$airbyte_ready" != true ]; then
-    echo "Airbyte API did not become ready in time" >&2
-    exit 1
-  fi
-
-  echo "Registering Airbyte resources..."
-  python3 "$SCRIPT_DIR/bootstrap_airbyte.py"
-fi
-
-if profile_selected catalog; then
-  echo "Waiting for OpenMetadata server..."
-  wait_for_service_health openmetadata-server 300 5 || echo "OpenMetadata server health check timed out; continuing."
-  echo "Seeding OpenMetadata ingestion pipelines..."
-  python3 "$SCRIPT_DIR/openmetadata_seed.py"
-fi
-
-if profile_selected streaming; then
-  echo "Waiting for Pulsar broker..."
-  wait_for_service_health pulsar 240 10 || echo "Pulsar health check timed out; inspect logs if issues persist."
-fi
-
-if profile_selected cicd; then
-  echo "Waiting for Jenkins UI..."
-  wait_for_service_health jenkins 300 10 || echo "Jenkins health check timed out; the UI may still be initializing."
-fi
-
-if profile_selected core; then
-  echo "Injecting Airflow connections and variables..."
-  python3 "$SCRIPT_DIR/airflow_setup.py"
-fi
+# Readiness probes, seeding and service registration run as one dependency graph;
+# independent steps (e.g. Airbyte and Airflow setup) proceed concurrently.
+echo "Running bootstrap steps for profiles: ${PROFILE_LIST[*]}..."
+python3 "$SCRIPT_DIR/bootstrap_runner.py" --profiles "$(IFS=','; echo "${PROFILE_LIST[*]}")"
 
 echo "Bootstrap completed for profiles: ${PROFILE_LIST[*]}. Review README for next steps."
@@ -3,7 +3,7 @@
 import os
 import sys
 import time
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 import requests
 from requests import exceptions
@@ -20,6 +20,39 @@ ACCESS_KEY = os.getenv("CEPH_ACCESS_KEY")
 SECRET_KEY = os.getenv("CEPH_SECRET_KEY")
 CEPH_ENDPOINT = os.getenv("CEPH_RGW_ENDPOINT", "http://ceph:9000")
 CEPH_REGION = os.getenv("CEPH_REGION", "us-east-1")
+BRONZE_FORMAT = os.getenv("AIRBYTE_BRONZE_FORMAT", "jsonl").lower()
+STREAM_NAME = os.getenv("AIRBYTE_STREAM", "orders")
+SYNC_MODE = os.getenv("AIRBYTE_SYNC_MODE", "full_refresh").lower()
+CURSOR_FIELD = [part for part in os.getenv("AIRBYTE_CURSOR_FIELD", "updated_at").split(".") if part]
+PRIMARY_KEY = [[column.strip()] for column in os.getenv("AIRBYTE_PRIMARY_KEY", "order_id").split(",") if column.strip()]
+# Registered when discovery has no such stream (the demo Faker source exposes users/products/purchases).
+FALLBACK_STREAM: Dict[str, Any] = {
+    "name": STREAM_NAME,
+    "jsonSchema": {},
+    "supportedSyncModes": ["full_refresh"],
+    "defaultCursorField": [],
+    "sourceDefinedCursor": False,
+    "sourceDefinedPrimaryKey": []
+}
+# Airbyte's S3 destination compresses JSONL with GZIP only; Parquet takes any codec.
+BRONZE_FORMATS: Dict[str, Dict[str, Any]] = {
+    "jsonl": {
+        "format_type": "JSONL",
+        "compression": {"compression_type": "No Compression"},
+        "flattening": "No flattening"
+    },
+    "jsonl-gzip": {
+        "format_type": "JSONL",
+        "compression": {"compression_type": "GZIP"},
+        "flattening": "No flattening"
+    },
+    "parquet": {
+        "format_type": "Parquet",
+        "compression_codec": os.getenv("AIRBYTE_BRONZE_PARQUET_CODEC", "ZSTD"),
+        "block_size_mb": 128,
+        "page_size_kb": 1024
+    },
+}
 
 session = requests.Session()
 
@@ -35,7 +68,7 @@ def _post(path: str, payload: Dict[str, Any], *, timeout: int = REQUEST_TIMEOUT,
         except (exceptions.Timeout, exceptions.ConnectionError) as exc:
             if attempt == retries:
                 raise RuntimeError(f"Airbyte API call {path} failed after {retries} attempts: {exc}") from exc
-            time.sleep(5)
+            time.sleep(min(2 ** (attempt - 1), 10))
     raise RuntimeError(f"Airbyte API call {path} exhausted retries")
 
 
@@ -94,12 +127,42 @@ def ensure_source(workspace_id: str) -> str:
     return resp["sourceId"]
 
 
+def _bronze_format() -> Dict[str, Any]:
+    if BRONZE_FORMAT not in BRONZE_FORMATS:
+        raise RuntimeError(f"Unknown AIRBYTE_BRONZE_FORMAT '{BRONZE_FORMAT}'; expected one of {sorted(BRONZE_FORMATS)}")
+    return BRONZE_FORMATS[BRONZE_FORMAT]
+
+
 def ensure_destination(workspace_id: str) -> str:
     if not ACCESS_KEY or not SECRET_KEY:
         raise RuntimeError("CEPH_ACCESS_KEY and CEPH_SECRET_KEY must be set before seeding Airbyte.")
 
+    configuration = {
+        "s3_bucket_name": BRONZE_BUCKET,
+        "s3_bucket_region": CEPH_REGION,
+        "s3_bucket_path": "raw/orders",
+        "s3_path_format": "{namespace}/{stream}/{year}-{month}-{day}",
+        "s3_endpoint": CEPH_ENDPOINT,
+        "access_key_id": ACCESS_KEY,
+        "secret_access_key": SECRET_KEY,
+        "file_name_pattern": "{timestamp}",
+        "format": _bronze_format()
+    }
+
     existing = _find_existing("/v1/destinations/list", {"workspaceId": workspace_id}, "name", DESTINATION_NAME)
     if existing:
+        # Re-running with another AIRBYTE_BRONZE_FORMAT switches the profile in place; the
+        # medallion DAG reads old and new objects alike.
+        if existing.get("connectionConfiguration", {}).get("format") != configuration["format"]:
+            _post(
+                "/v1/destinations/update",
+                {
+                    "destinationId": existing["destinationId"],
+                    "name": DESTINATION_NAME,
+                    "connectionConfiguration": configuration
+                },
+            )
+            print(f"Airbyte destination switched to {BRONZE_FORMAT} output")
         return existing["destinationId"]
 
     destination_definition_id = _lookup_destination_definition_id(DESTINATION_DEFINITION_NAME)
@@ -108,55 +171,88 @@ def ensure_destination(workspace_id: str) -> str:
         "name": DESTINATION_NAME,
         "destinationDefinitionId": destination_definition_id,
         "workspaceId": workspace_id,
-        "connectionConfiguration": {
-            "s3_bucket_name": BRONZE_BUCKET,
-            "s3_bucket_region": CEPH_REGION,
-            "s3_bucket_path": "raw/orders",
-            "s3_path_format": "{namespace}/{stream}/{year}-{month}-{day}",
-            "s3_endpoint": CEPH_ENDPOINT,
-            "access_key_id": ACCESS_KEY,
-            "secret_access_key": SECRET_KEY,
-            "file_name_pattern": "{timestamp}",
-            "format": {
-                "format_type": "JSONL",
-                "compression": {"compression_type": "No Compression"},
-                "flattening": "No flattening"
-            }
-        }
+        "connectionConfiguration": configuration
     }
     resp = _post("/v1/destinations/create", payload)
     return resp["destinationId"]
 
 
+def _discover_stream(source_id: str) -> Dict[str, Any]:
+    catalog = _post("/v1/sources/discover_schema", {"sourceId": source_id, "disable_cache": True}).get("catalog") or {}
+    for entry in catalog.get("streams", []):
+        if entry["stream"]["name"] == STREAM_NAME:
+            return entry["stream"]
+    print(
+        f"Stream '{STREAM_NAME}' not found in the source catalog; registering it as a full_refresh stream",
+        file=sys.stderr,
+    )
+    return FALLBACK_STREAM
+
+
+def _destination_sync_modes(destination_id: str, workspace_id: str) -> List[str]:
+    destination = _post("/v1/destinations/get", {"destinationId": destination_id})
+    spec = _post(
+        "/v1/destination_definition_specifications/get",
+        {"destinationDefinitionId": destination["destinationDefinitionId"], "workspaceId": workspace_id},
+    )
+    return spec.get("supportedDestinationSyncModes", [])
+
+
+def stream_config(stream: Dict[str, Any], destination_modes: List[str]) -> Dict[str, Any]:
+    """Sync config for the stream: cursor-based deltas when both ends support them, else full refresh."""
+    if SYNC_MODE not in {"incremental", "full_refresh"}:
+        raise RuntimeError(f"Unknown AIRBYTE_SYNC_MODE '{SYNC_MODE}'; expected incremental or full_refresh")
+    if SYNC_MODE == "incremental" and "incremental" in stream.get("supportedSyncModes", []):
+        if stream.get("sourceDefinedCursor"):
+            cursor_field = stream.get("defaultCursorField") or []
+        else:
+            properties = stream.get("jsonSchema", {}).get("properties", {})
+            if not CURSOR_FIELD:
+                raise RuntimeError(f"AIRBYTE_CURSOR_FIELD is required for incremental sync of stream '{STREAM_NAME}'")
+            if properties and CURSOR_FIELD[0] not in properties:
+                raise RuntimeError(
+                    f"Cursor field '{'.'.join(CURSOR_FIELD)}' is not in stream '{STREAM_NAME}' ({sorted(properties)})"
+                )
+            cursor_field = CURSOR_FIELD
+        # Object stores such as S3 only append; duplicates are then resolved downstream by order_id.
+        destination_mode = "append_dedup" if "append_dedup" in destination_modes else "append"
+        return {
+            "syncMode": "incremental",
+            "cursorField": cursor_field,
+            "primaryKey": stream.get("sourceDefinedPrimaryKey") or PRIMARY_KEY,
+            "destinationSyncMode": destination_mode,
+            "selected": True
+        }
+    if SYNC_MODE == "incremental":
+        print(f"Stream '{STREAM_NAME}' does not support incremental sync; falling back to full_refresh", file=sys.stderr)
+    return {"syncMode": "full_refresh", "destinationSyncMode": "append", "selected": True}
+
+
 def ensure_connection(source_id: str, destination_id: str, workspace_id: str) -> str:
+    stream = _discover_stream(source_id)
+    sync_catalog = {
+        "streams": [{"stream": stream, "config": stream_config(stream, _destination_sync_modes(destination_id, workspace_id))}]
+    }
+
     connections = _post("/v1/connections/list", {"workspaceId": workspace_id}).get("connections", [])
     for conn in connections:
         if conn.get("name") == CONNECTION_NAME:
+            wanted = sync_catalog["streams"][0]["config"]
+            streams = conn.get("syncCatalog", {}).get("streams", [])
+            current = next((entry.get("config", {}) for entry in streams if entry["stream"]["name"] == STREAM_NAME), {})
+            if any(current.get(key) != value for key, value in wanted.items()):
+                _post(
+                    "/v1/connections/update",
+                    {"connectionId": conn["connectionId"], "syncCatalog": sync_catalog, "status": conn.get("status", "active")},
+                )
+                print(f"Airbyte connection switched to {wanted['syncMode']} sync")
             return conn["connectionId"]
 
     payload = {
         "name": CONNECTION_NAME,
         "sourceId": source_id,
         "destinationId": destination_id,
-        "syncCatalog": {
-            "streams": [
-                {
-                    "stream": {
-                        "name": "orders",
-                        "jsonSchema": {},
-                        "supportedSyncModes": ["full_refresh"],
-                        "defaultCursorField": [],
-                        "sourceDefinedCursor": False,
-                        "sourceDefinedPrimaryKey": []
-                    },
-                    "config": {
-                        "syncMode": "full_refresh",
-                        "destinationSyncMode": "append",
-                        "selected": True
-                    }
-                }
-            ]
-        },
+        "syncCatalog": sync_catalog,
         "scheduleType": "manual",
         "status": "active"
     }
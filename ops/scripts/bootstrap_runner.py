@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""Run the post-start bootstrap steps as a dependency graph, concurrently where possible.
+
+Each step waits only for the steps it depends on. Readiness is polled with async
+probes: HTTP targets from ``verify_infra.TARGETS``, or the container health that
+``docker compose`` reports. The run ends with a per-step timing report.
+
+    python3 ops/scripts/bootstrap_runner.py --profiles core,ingestion,catalog
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from verify_infra import TARGETS
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+ROOT = SCRIPT_DIR.parents[1]
+PROBE_INTERVAL = 1.0
+PROBE_MAX_INTERVAL = 10.0
+
+
+@dataclass
+class Step:
+    name: str
+    action: Callable[[], Awaitable[None]]
+    after: Tuple[str, ...] = ()
+    # A failed fatal step skips its dependents and fails the run; others only warn.
+    fatal: bool = True
+
+
+@dataclass
+class StepResult:
+    status: str
+    started: float = 0.0
+    finished: float = 0.0
+    detail: str = ""
+
+    @property
+    def seconds(self) -> float:
+        return self.finished - self.started
+
+
+@dataclass
+class Runner:
+    profiles: Set[str]
+    compose_flags: List[str] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        for profile in sorted(self.profiles):
+            self.compose_flags += ["--profile", profile]
+
+
+def _http_ok(url: str) -> bool:
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return response.status < 400
+    except (urllib.error.URLError, OSError, ValueError):
+        return False
+
+
+async def _poll(check: Callable[[], Awaitable[bool]], what: str, timeout: float) -> None:
+    """Poll ``check`` with exponential backoff until it passes or ``timeout`` elapses."""
+    deadline = time.monotonic() + timeout
+    interval = PROBE_INTERVAL
+    while True:
+        if await check():
+            return
+        if time.monotonic() + interval > deadline:
+            raise TimeoutError(f"{what} not ready after {timeout:.0f}s")
+        await asyncio.sleep(interval)
+        interval = min(interval * 1.5, PROBE_MAX_INTERVAL)
+
+
+def http_ready(url: str, timeout: float) -> Callable[[], Awaitable[None]]:
+    async def probe() -> None:
+        await _poll(lambda: asyncio.to_thread(_http_ok, url), url, timeout)
+
+    return probe
+
+
+async def _output(*cmd: str) -> str:
+    process = await asyncio.create_subprocess_exec(
+        *cmd, cwd=ROOT, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+    )
+    stdout, _ = await process.communicate()
+    return stdout.decode().strip()
+
+
+def compose_healthy(runner: Runner, service: str, timeout: float) -> Callable[[], Awaitable[None]]:
+    """Wait until the service's container reports ``healthy`` (or ``running`` without a healthcheck)."""
+
+    async def check() -> bool:
+        container = await _output("docker", "compose", *runner.compose_flags, "ps", "-q", service)
+        if not container:
+            return False
+        status = await _output(
+            "docker",
+            "inspect",
+            "--format",
+            "{{if .State.Health}}{{.State.Health.Status}}{{else}}{{.State.Status}}{{end}}",
+            container,
+        )
+        if status in {"unhealthy", "exited", "dead"}:
+            raise RuntimeError(f"{service} reported status '{status}'")
+        return status in {"healthy", "running"}
+
+    async def probe() -> None:
+        await _poll(check, service, timeout)
+
+    return probe
+
+
+def script(name: str, *args: str, env: Optional[Dict[str, str]] = None) -> Callable[[], Awaitable[None]]:
+    """Run a bootstrap script, prefixing its output lines with the step name."""
+
+    async def run() -> None:
+        process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            str(SCRIPT_DIR / name),
+            *args,
+            cwd=ROOT,
+            env={**os.environ, **(env or {})},
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+        )
+        assert process.stdout is not None
+        async for line in process.stdout:
+            print(f"[{name}] {line.decode().rstrip()}", flush=True)
+        if await process.wait():
+            raise RuntimeError(f"{name} exited with {process.returncode}")
+
+    return run
+
+
+def build_steps(runner: Runner) -> List[Step]:
+    """The bootstrap graph for the selected profiles (steps of unselected profiles are left out)."""
+    profiles = runner.profiles
+    ceph_port = os.getenv("CEPH_RGW_PORT", "9000")
+    steps: List[Step] = []
+    if profiles & {"core", "ingestion", "ml", "streaming", "analytics"}:
+        steps.append(Step("ceph", http_ready(f"http://localhost:{ceph_port}/", 240), fatal=False))
+        steps.append(
+            Step(
+                "seed_ceph",
+                # The runner is on the host, so reach RGW through its published port.
+                script("seed_ceph.py", env={"CEPH_RGW_ENDPOINT": f"http://localhost:{ceph_port}"}),
+                after=("ceph",),
+                fatal=False,
+            )
+        )
+    if "core" in profiles:
+        steps.append(Step("airflow", http_ready(TARGETS["Airflow"], 240), fatal=False))
+        steps.append(Step("airflow_setup", script("airflow_setup.py"), after=("airflow",)))
+    if "ingestion" in profiles:
+        steps.append(Step("airbyte", http_ready(TARGETS["Airbyte"], 600)))
+        steps.append(Step("bootstrap_airbyte", script("bootstrap_airbyte.py"), after=("airbyte",)))
+    if "catalog" in profiles:
+        steps.append(Step("openmetadata", compose_healthy(runner, "openmetadata-server", 300), fatal=False))
+        # Ingest after Airflow and Airbyte are configured so their pipelines show up in the catalog.
+        steps.append(
+            Step(
+                "openmetadata_seed",
+                script("openmetadata_seed.py"),
+                after=("openmetadata", "airflow_setup", "bootstrap_airbyte"),
+                fatal=False,
+            )
+        )
+    if "ml" in profiles:
+        steps.append(Step("mlflow", compose_healthy(runner, "mlflow", 180), fatal=False))
+    if "streaming" in profiles:
+        steps.append(Step("pulsar", compose_healthy(runner, "pulsar", 240), fatal=False))
+    if "cicd" in profiles:
+        steps.append(Step("jenkins", compose_healthy(runner, "jenkins", 300), fatal=False))
+    names = {step.name for step in steps}
+    for step in steps:
+        # Dependencies on steps of unselected profiles are dropped.
+        step.after = tuple(dep for dep in step.after if dep in names)
+    return steps
+
+
+def validate(steps: Sequence[Step]) -> None:
+    """Reject duplicate names, unknown dependencies and cycles before anything runs."""
+    graph = {step.name: step.after for step in steps}
+    if len(graph) != len(steps):
+        raise ValueError("Duplicate step names")
+    for name, after in graph.items():
+        unknown = set(after) - graph.keys()
+        if unknown:
+            raise ValueError(f"Step {name} depends on unknown steps {sorted(unknown)}")
+    visiting: Set[str] = set()
+    done: Set[str] = set()
+
+    def visit(name: str) -> None:
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"Dependency cycle through {name}")
+        visiting.add(name)
+        for dep in graph[name]:
+            visit(dep)
+        visiting.discard(name)
+        done.add(name)
+
+    for name in graph:
+        visit(name)
+
+
+async def run_graph(steps: Sequence[Step]) -> Dict[str, StepResult]:
+    """Start every step at once; each awaits its dependencies before running."""
+    validate(steps)
+    origin = time.monotonic()
+    by_name = {step.name: step for step in steps}
+    tasks: Dict[str, asyncio.Task] = {}
+
+    async def run(step: Step) -> StepResult:
+        for dep in step.after:
+            result = await tasks[dep]
+            if result.status != "ok" and by_name[dep].fatal:
+                now = time.monotonic() - origin
+                return StepResult("skipped", now, now, f"{dep} {result.status}")
+        started = time.monotonic() - origin
+        print(f"→ {step.name}", flush=True)
+        try:
+            await step.action()
+        except Exception as exc:  # pylint: disable=broad-except
+            finished = time.monotonic() - origin
+            print(f"✖ {step.name} ({finished - started:.1f}s): {exc}", flush=True)
+            return StepResult("failed", started, finished, str(exc))
+        finished = time.monotonic() - origin
+        print(f"✔ {step.name} ({finished - started:.1f}s)", flush=True)
+        return StepResult("ok", started, finished)
+
+    for step in steps:
+        tasks[step.name] = asyncio.create_task(run(step))
+    return {name: await task for name, task in tasks.items()}
+
+
+def report(results: Dict[str, StepResult], wall: float) -> None:
+    print(f"\n{'step':<22}{'status':<10}{'start':>8}{'took':>8}  detail")
+    for name, result in sorted(results.items(), key=lambda item: item[1].started):
+        print(f"{name:<22}{result.status:<10}{result.started:>7.1f}s{result.seconds:>7.1f}s  {result.detail}")
+    serial = sum(result.seconds for result in results.values())
+    print(f"Wall clock {wall:.1f}s for {serial:.1f}s of step time")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", default="core", help="Comma-separated compose profiles that were started")
+    args = parser.parse_args()
+
+    runner = Runner({profile.strip() for profile in args.profiles.split(",") if profile.strip()})
+    steps = build_steps(runner)
+    started = time.monotonic()
+    results = asyncio.run(run_graph(steps))
+    report(results, time.monotonic() - started)
+    fatal = {step.name for step in steps if step.fatal}
+    if any(result.status != "ok" for name, result in results.items() if name in fatal):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@
 import subprocess
 import sys
 from pathlib import Path
+from typing import List
 
 ROOT = Path(__file__).resolve().parents[2]
 CONFIG_BASE = ROOT / "platform" / "catalog" / "openmetadata" / "ingestion"
@@ -14,35 +15,38 @@ CONFIGS = [
 ]
 
 
-def run_ingestion(config: Path) -> None:
-    if not config.exists():
-        raise FileNotFoundError(f"Missing ingestion config: {config}")
-    print(f"Running OpenMetadata ingestion for {config}...")
-    container_config = Path("/openmetadata/ingestion") / config.relative_to(CONFIG_BASE)
-    try:
-        subprocess.run(
-            [
-                "docker",
-                "compose",
-                "run",
-                "--rm",
-                "--entrypoint",
-                "metadata",
-                "openmetadata-ingestion",
-                "ingest",
-                "-c",
-                str(container_config),
-            ],
-            check=True,
-            cwd=ROOT,
+def ingestion_command(configs: List[Path]) -> str:
+    """Shell loop that runs every config in one container and reports each failure without stopping."""
+    lines = []
+    for config in configs:
+        container_config = Path("/openmetadata/ingestion") / config.relative_to(CONFIG_BASE)
+        lines.append(
+            f'echo "Running OpenMetadata ingestion for {config.name}..."; '
+            f'metadata ingest -c {container_config} || echo "Warning: OpenMetadata ingestion failed for {config.name}" >&2'
         )
-    except subprocess.CalledProcessError as exc:
-        print(f"Warning: OpenMetadata ingestion failed for {config.name}: {exc}", file=sys.stderr)
+    return "; ".join(lines)
 
 
 def main() -> None:
-    for config in CONFIGS:
-        run_ingestion(config)
+    missing = [config for config in CONFIGS if not config.exists()]
+    if missing:
+        raise FileNotFoundError(f"Missing ingestion config: {missing[0]}")
+    # One container for all configs: the ingestion image takes longer to start than most runs take.
+    subprocess.run(
+        [
+            "docker",
+            "compose",
+            "run",
+            "--rm",
+            "--entrypoint",
+            "sh",
+            "openmetadata-ingestion",
+            "-c",
+            ingestion_command(CONFIGS),
+        ],
+        check=True,
+        cwd=ROOT,
+    )
 
 
 if __name__ == "__main__":
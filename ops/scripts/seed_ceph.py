@@ -1,11 +1,31 @@
 #!/usr/bin/env python3
-"""Upload sample CSV data to the Ceph RGW buckets for demo purposes."""
+"""Upload sample and reference data to the Ceph RGW buckets.
+
+Without arguments the two demo datasets are seeded. ``--source PATH=BUCKET/PREFIX``
+(repeatable) and ``--manifest FILE`` seed extra files or whole directories. Uploads
+run on a thread pool with multipart transfers. Objects whose size and MD5 already
+match are skipped; a file is only hashed for that check once a HEAD finds an object
+of the same size, so re-seeding unchanged data costs HEAD requests and local reads
+of the same-size files only.
+
+    python ops/scripts/seed_ceph.py --source data/reference=bronze/reference --workers 16
+"""
+import argparse
+import functools
+import hashlib
+import json
 import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, Callable, Iterable, List, Optional, Tuple
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.client import Config
+from botocore.exceptions import ClientError
 
 CEPH_ENDPOINT = os.getenv("CEPH_RGW_ENDPOINT", "http://localhost:9000")
 ACCESS_KEY = os.getenv("CEPH_ACCESS_KEY", "cephadmin")
@@ -19,41 +39,173 @@ FILE_PATH = Path(os.getenv("BRONZE_SAMPLE_FILE", str(DEFAULT_SAMPLE)))
 OBJECT_KEY = os.getenv("BRONZE_OBJECT_KEY", "airbyte/orders/orders_raw.csv")
 DEFAULT_FEAST_SAMPLE = ROOT / "platform" / "featurestore" / "feast_repo" / "data" / "customer_transactions.csv"
 FEAST_SAMPLE = Path(os.getenv("FEAST_SAMPLE_FILE", str(DEFAULT_FEAST_SAMPLE)))
-FEAST_OBJECT_KEY = os.getenv("FEAST_OBJECT_KEY", "featurestore/customer_transactions.csv")
+FEAST_SOURCE_PREFIX = os.getenv("FEAST_SOURCE_PREFIX", "featurestore/customer_transactions")
+FEAST_OBJECT_KEY = os.getenv("FEAST_OBJECT_KEY", f"{FEAST_SOURCE_PREFIX}/seed.csv")
+MB = 1024 * 1024
+CHUNK_SIZE = int(os.getenv("SEED_MULTIPART_CHUNK_MB", "64")) * MB
+MD5_METADATA_KEY = "md5"
+
+
+@dataclass
+class Upload:
+    path: Path
+    bucket: str
+    key: str
 
 
-def _upload_file(client, *, path: Path, bucket: str, key: str, label: str) -> None:
+def default_uploads() -> List[Upload]:
+    return [Upload(FILE_PATH, BRONZE_BUCKET, OBJECT_KEY), Upload(FEAST_SAMPLE, FEATURESTORE_BUCKET, FEAST_OBJECT_KEY)]
+
+
+def expand(path: Path, bucket: str, key: str) -> List[Upload]:
+    """A file maps to ``key``; a directory maps every file below it under the ``key`` prefix."""
     if not path.exists():
-        print(f"{label} not found: {path}", file=sys.stderr)
-        sys.exit(1)
+        raise FileNotFoundError(f"Seed source not found: {path}")
+    if path.is_file():
+        return [Upload(path, bucket, key)]
+    prefix = key.strip("/")
+    return [
+        Upload(file, bucket, f"{prefix}/{file.relative_to(path).as_posix()}" if prefix else file.relative_to(path).as_posix())
+        for file in sorted(path.rglob("*"))
+        if file.is_file()
+    ]
+
+
+def parse_source(spec: str) -> List[Upload]:
+    """``PATH=BUCKET/KEY_OR_PREFIX``."""
+    path, _, target = spec.partition("=")
+    bucket, _, key = target.partition("/")
+    if not path or not bucket:
+        raise ValueError(f"Invalid --source '{spec}'; expected PATH=BUCKET/KEY")
+    return expand(Path(path), bucket, key)
+
+
+def read_manifest(manifest: Path) -> List[Upload]:
+    """JSON list of ``{"path", "bucket", "key"}``; relative paths resolve against the manifest's directory."""
+    uploads: List[Upload] = []
+    for entry in json.loads(manifest.read_text(encoding="utf-8")):
+        path = Path(entry["path"])
+        uploads += expand(path if path.is_absolute() else manifest.parent / path, entry["bucket"], entry.get("key", ""))
+    return uploads
+
+
+def file_md5(path: Path) -> str:
+    digest = hashlib.md5()
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(8 * MB), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def multipart_etag(path: Path, chunk_size: int) -> str:
+    """The ETag S3 assigns to a multipart upload with ``chunk_size`` parts."""
+    digests = []
     with path.open("rb") as handle:
-        client.upload_fileobj(handle, bucket, key)
-    print(f"Uploaded {label} ({path}) to s3://{bucket}/{key}")
+        for block in iter(lambda: handle.read(chunk_size), b""):
+            digests.append(hashlib.md5(block).digest())
+    return f"{hashlib.md5(b''.join(digests)).hexdigest()}-{len(digests)}"
+
+
+def unchanged(head: Optional[dict], path: Path, size: int, md5: Callable[[], str]) -> bool:
+    """Whether the remote object already holds this file, judged by size then MD5.
+
+    The MD5 comes from our own upload metadata when present. Otherwise it comes
+    from the ETag, either a plain MD5 or a multipart ETag that is recomputed locally.
+    ``md5`` is only called once the sizes match and there is a digest to compare.
+    """
+    if head is None or head.get("ContentLength") != size:
+        return False
+    recorded = head.get("Metadata", {}).get(MD5_METADATA_KEY)
+    if recorded:
+        return recorded == md5()
+    etag = head.get("ETag", "").strip('"')
+    if "-" in etag:
+        # Only comparable when the object was split with our chunk size.
+        parts = int(etag.rsplit("-", 1)[1])
+        return parts == -(-size // CHUNK_SIZE) and multipart_etag(path, CHUNK_SIZE) == etag
+    return bool(etag) and etag == md5()
+
+
+def _head(client: Any, upload: Upload) -> Optional[dict]:
+    try:
+        return client.head_object(Bucket=upload.bucket, Key=upload.key)
+    except ClientError as exc:
+        if exc.response.get("Error", {}).get("Code") in {"404", "NoSuchKey", "NotFound"}:
+            return None
+        raise
+
+
+def seed_one(client: Any, upload: Upload, transfer: TransferConfig) -> Tuple[str, int]:
+    size = upload.path.stat().st_size
+    # Hashed at most once, and only when the HEAD comparison or the upload metadata needs it.
+    md5 = functools.lru_cache(maxsize=None)(lambda: file_md5(upload.path))
+    if unchanged(_head(client, upload), upload.path, size, md5):
+        return "skipped", size
+    client.upload_file(
+        str(upload.path),
+        upload.bucket,
+        upload.key,
+        Config=transfer,
+        ExtraArgs={"Metadata": {MD5_METADATA_KEY: md5()}},
+    )
+    return "uploaded", size
+
+
+def seed(client: Any, uploads: Iterable[Upload], workers: int, transfer: TransferConfig) -> dict:
+    uploads = list(uploads)
+    started = time.perf_counter()
+    totals = {"uploaded": 0, "skipped": 0, "uploaded_bytes": 0, "skipped_bytes": 0}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for upload, (outcome, size) in zip(uploads, pool.map(lambda item: seed_one(client, item, transfer), uploads)):
+            totals[outcome] += 1
+            totals[f"{outcome}_bytes"] += size
+            print(f"{outcome:<9}{size / MB:>10.1f} MB  {upload.path} -> s3://{upload.bucket}/{upload.key}")
+    totals["seconds"] = time.perf_counter() - started
+    return totals
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", action="append", default=[], help="PATH=BUCKET/KEY_OR_PREFIX (repeatable)")
+    parser.add_argument("--manifest", action="append", default=[], type=Path, help="JSON manifest of uploads")
+    parser.add_argument("--no-defaults", action="store_true", help="Skip the demo datasets")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("SEED_WORKERS", "8")), help="Files uploaded in parallel")
+    parser.add_argument(
+        "--part-concurrency", type=int, default=int(os.getenv("SEED_PART_CONCURRENCY", "4")), help="Parts in flight per file"
+    )
+    args = parser.parse_args()
+
+    uploads = [] if args.no_defaults else default_uploads()
+    for spec in args.source:
+        uploads += parse_source(spec)
+    for manifest in args.manifest:
+        uploads += read_manifest(manifest)
+    missing = [upload.path for upload in uploads if not upload.path.is_file()]
+    if missing:
+        print(f"Seed file not found: {missing[0]}", file=sys.stderr)
+        sys.exit(1)
+
+    transfer = TransferConfig(
+        multipart_threshold=CHUNK_SIZE,
+        multipart_chunksize=CHUNK_SIZE,
+        max_concurrency=args.part_concurrency,
+        use_threads=True,
+    )
     session = boto3.session.Session()
     client = session.client(
         "s3",
         endpoint_url=CEPH_ENDPOINT,
         aws_access_key_id=ACCESS_KEY,
         aws_secret_access_key=SECRET_KEY,
-        config=Config(signature_version="s3v4"),
+        config=Config(signature_version="s3v4", max_pool_connections=args.workers * args.part_concurrency),
         region_name=REGION,
     )
-    _upload_file(
-        client,
-        path=FILE_PATH,
-        bucket=BRONZE_BUCKET,
-        key=OBJECT_KEY,
-        label="Bronze sample data",
-    )
-    _upload_file(
-        client,
-        path=FEAST_SAMPLE,
-        bucket=FEATURESTORE_BUCKET,
-        key=FEAST_OBJECT_KEY,
-        label="Feast feature sample",
+    totals = seed(client, uploads, args.workers, transfer)
+    seconds = totals["seconds"]
+    print(
+        f"Seeded {totals['uploaded']} files ({totals['uploaded_bytes'] / MB:.1f} MB), "
+        f"skipped {totals['skipped']} unchanged ({totals['skipped_bytes'] / MB:.1f} MB) in {seconds:.1f}s; "
+        f"upload throughput {totals['uploaded_bytes'] / MB / seconds if seconds else 0:.1f} MB/s"
     )
 
 
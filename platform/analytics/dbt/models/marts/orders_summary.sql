@@ -1,11 +1,49 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='insert_overwrite',
+        engine='MergeTree()',
+        order_by='(customer_id, order_month)',
+        partition_by='toYYYYMM(order_month)'
+    )
+}}
+
+{% if is_incremental() %}
+with staged_orders as (
+    -- ">=" like stg_orders: rows tied with the last watermark may have been staged after
+    -- it was recorded, and recomputing a month twice is harmless.
+    select order_date, previous_order_date
+    from {{ ref('stg_orders') }}
+    where updated_at >= (select max(last_updated_at) from {{ this }})
+    {% if var('orders_reprocess_from', none) %}
+       or order_date >= toDate('{{ var("orders_reprocess_from") }}')
+    {% endif %}
+),
+
+changed_months as (
+    -- Months holding orders staged since the last run, plus the months those orders
+    -- moved out of; each is recomputed in full and its partition swapped in, so
+    -- unchanged months are never re-aggregated.
+    select date_trunc('month', order_date)::date as order_month from staged_orders
+    union distinct
+    select date_trunc('month', previous_order_date)::date as order_month from staged_orders
+),
+
+orders as (
+{% else %}
 with orders as (
+{% endif %}
     select
         customer_id,
         date_trunc('month', order_date)::date as order_month,
         sum(total_amount) as gross_revenue,
         sum(completed_amount) as completed_revenue,
-        count(*) as order_count
+        count(*) as order_count,
+        max(updated_at) as last_updated_at
     from {{ ref('stg_orders') }}
+    {% if is_incremental() %}
+    where date_trunc('month', order_date)::date in (select order_month from changed_months)
+    {% endif %}
     group by 1, 2
 )
 
@@ -18,5 +56,6 @@ select
     case
         when order_count = 0 then 0
         else completed_revenue / nullif(order_count, 0)
-    end as avg_completed_order_value
+    end as avg_completed_order_value,
+    last_updated_at
 from orders
@@ -1,3 +1,14 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key='order_id',
+        on_schema_change='append_new_columns',
+        engine='MergeTree()',
+        order_by='(order_id)'
+    )
+}}
+
 with source_orders as (
     select
         order_id,
@@ -7,14 +18,32 @@ with source_orders as (
         order_date,
         updated_at
     from {{ source('gold', 'orders_snapshot') }}
+    {% if is_incremental() %}
+    -- ">=" re-reads rows sharing the last watermark; delete+insert on order_id keeps them unique.
+    where updated_at >= (select max(updated_at) from {{ this }})
+    {% endif %}
 )
 
 select
-    order_id,
-    customer_id,
-    status,
-    total_amount,
-    order_date,
-    updated_at,
-    case when status = 'completed' then total_amount else 0 end as completed_amount
+    source_orders.order_id as order_id,
+    source_orders.customer_id as customer_id,
+    source_orders.status as status,
+    source_orders.total_amount as total_amount,
+    source_orders.order_date as order_date,
+    source_orders.updated_at as updated_at,
+    case when source_orders.status = 'completed' then source_orders.total_amount else 0 end as completed_amount,
+    {% if is_incremental() %}
+    -- The staged copy is read before delete+insert replaces it, so orders_summary can
+    -- also rebuild the month an order moved out of.
+    if(previous.order_id = source_orders.order_id, previous.order_date, source_orders.order_date)
+    {% else %}
+    source_orders.order_date
+    {% endif %} as previous_order_date
 from source_orders
+{% if is_incremental() %}
+left join (
+    select order_id, order_date
+    from {{ this }}
+    where order_id in (select order_id from source_orders)
+) as previous on previous.order_id = source_orders.order_id
+{% endif %}
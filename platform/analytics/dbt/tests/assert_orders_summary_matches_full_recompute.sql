@@ -0,0 +1,39 @@
+-- Recompute orders_summary from the source snapshot and return every
+-- (customer_id, order_month) where the incrementally maintained mart differs.
+with incremental as (
+    select customer_id, order_month, gross_revenue, completed_revenue, order_count
+    from {{ ref('orders_summary') }}
+),
+
+full_recompute as (
+    select
+        customer_id,
+        date_trunc('month', order_date)::date as order_month,
+        sum(total_amount) as gross_revenue,
+        sum(case when status = 'completed' then total_amount else 0 end) as completed_revenue,
+        count(*) as order_count
+    from {{ source('gold', 'orders_snapshot') }}
+    group by 1, 2
+),
+
+sides as (
+    select customer_id, order_month, gross_revenue, completed_revenue, toInt64(order_count) as order_count, 1 as side
+    from incremental
+    union all
+    select customer_id, order_month, gross_revenue, completed_revenue, toInt64(order_count) as order_count, -1 as side
+    from full_recompute
+)
+
+select
+    customer_id,
+    order_month,
+    sum(gross_revenue * side) as gross_revenue_delta,
+    sum(completed_revenue * side) as completed_revenue_delta,
+    sum(order_count * side) as order_count_delta,
+    sum(side) as row_balance
+from sides
+group by customer_id, order_month
+having abs(gross_revenue_delta) > 0.01
+    or abs(completed_revenue_delta) > 0.01
+    or order_count_delta != 0
+    or row_balance != 0
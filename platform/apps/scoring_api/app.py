@@ -0,0 +1,110 @@
+"""Async HTTP churn scoring API backed by the Feast Redis online store."""
+import logging
+import os
+
+import mlflow
+import numpy as np
+import pandas as pd
+from aiohttp import web
+from mlflow.exceptions import MlflowException
+from mlflow.tracking import MlflowClient
+from redis import asyncio as aioredis
+
+from ml.scoring.native_scorer import NATIVE_MODEL_ARTIFACT, NativeLogisticScorer
+from service import (
+    FEATURE_COLUMNS,
+    FeastRedisCodec,
+    MicroBatcher,
+    RedisFeatureLookup,
+    ScoringService,
+    TTLCache,
+)
+
+TRACKING_URI = os.environ.get("MLFLOW_TRACKING_URI", "http://localhost:5000")
+MODEL_NAME = os.environ.get("MLFLOW_MODEL_NAME", "oner_churn_model")
+MODEL_STAGE = os.environ.get("SCORING_MODEL_STAGE", os.environ.get("MLFLOW_MODEL_STAGE", "Staging"))
+REDIS_URL = os.environ.get("FEAST_REDIS_URL", "redis://redis:6379/0")
+FEAST_PROJECT = os.environ.get("FEAST_PROJECT_NAME", "oner_feast")
+CACHE_SIZE = int(os.environ.get("SCORING_CACHE_SIZE", "100000"))
+CACHE_TTL_SECONDS = float(os.environ.get("SCORING_CACHE_TTL_SECONDS", "60"))
+BATCH_MAX_ROWS = int(os.environ.get("SCORING_BATCH_MAX_ROWS", "1024"))
+BATCH_MAX_WAIT_MS = float(os.environ.get("SCORING_BATCH_MAX_WAIT_MS", "2"))
+MAX_IDS_PER_REQUEST = int(os.environ.get("SCORING_MAX_IDS_PER_REQUEST", "1000"))
+PORT = int(os.environ.get("SCORING_API_PORT", "8000"))
+
+
+def _load_predict_fn():
+    mlflow.set_tracking_uri(TRACKING_URI)
+    versions = MlflowClient().get_latest_versions(MODEL_NAME, stages=[MODEL_STAGE])
+    if not versions:
+        raise RuntimeError(f"No '{MODEL_STAGE}' version registered for model '{MODEL_NAME}'")
+    version = versions[0]
+    try:
+        local_path = mlflow.artifacts.download_artifacts(run_id=version.run_id, artifact_path=NATIVE_MODEL_ARTIFACT)
+        return NativeLogisticScorer.load(local_path).predict_proba, version.version
+    except MlflowException:
+        logging.warning("Model version %s has no %s; falling back to mlflow.pyfunc", version.version, NATIVE_MODEL_ARTIFACT)
+
+    model = mlflow.pyfunc.load_model(f"models:/{MODEL_NAME}/{MODEL_STAGE}")
+
+    def predict(matrix: np.ndarray) -> np.ndarray:
+        predictions = model.predict(pd.DataFrame(matrix, columns=FEATURE_COLUMNS))
+        if isinstance(predictions, pd.DataFrame):
+            return predictions[predictions.columns[-1]].to_numpy(dtype=float)
+        return np.array(predictions, dtype=float).flatten()
+
+    return predict, version.version
+
+
+async def score_handler(request: web.Request) -> web.Response:
+    try:
+        body = await request.json()
+        customer_ids = body["customer_ids"]
+    except (ValueError, KeyError, TypeError):
+        raise web.HTTPBadRequest(text='Expected JSON body {"customer_ids": [...]}')
+    if not isinstance(customer_ids, list) or len(customer_ids) > MAX_IDS_PER_REQUEST:
+        raise web.HTTPBadRequest(text=f"customer_ids must be a list of at most {MAX_IDS_PER_REQUEST} ids")
+    scores = await request.app["service"].score(customer_ids)
+    return web.json_response({"model_version": request.app["model_version"], "scores": scores})
+
+
+async def stats_handler(request: web.Request) -> web.Response:
+    return web.json_response(request.app["service"].stats())
+
+
+async def health_handler(_: web.Request) -> web.Response:
+    return web.json_response({"status": "ok"})
+
+
+async def _startup(app: web.Application) -> None:
+    predict, model_version = _load_predict_fn()
+    redis = aioredis.from_url(REDIS_URL)
+    batcher = MicroBatcher(predict, max_batch_rows=BATCH_MAX_ROWS, max_wait_ms=BATCH_MAX_WAIT_MS)
+    batcher.start()
+    app["redis"] = redis
+    app["model_version"] = model_version
+    app["service"] = ScoringService(
+        lookup=RedisFeatureLookup(redis, FeastRedisCodec(FEAST_PROJECT)),
+        cache=TTLCache(CACHE_SIZE, CACHE_TTL_SECONDS),
+        batcher=batcher,
+    )
+
+
+async def _cleanup(app: web.Application) -> None:
+    await app["service"].batcher.stop()
+    await app["redis"].close()
+
+
+def create_app() -> web.Application:
+    app = web.Application()
+    app.router.add_post("/score", score_handler)
+    app.router.add_get("/stats", stats_handler)
+    app.router.add_get("/healthz", health_handler)
+    app.on_startup.append(_startup)
+    app.on_cleanup.append(_cleanup)
+    return app
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    web.run_app(create_app(), host="0.0.0.0", port=PORT)
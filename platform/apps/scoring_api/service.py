@@ -0,0 +1,229 @@
+"""Building blocks for the low-latency churn scoring API.
+
+Everything here is framework-agnostic so it can be exercised against an
+in-memory Redis stand-in; ``app.py`` wires it into an aiohttp server.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+FEATURE_VIEW = "customer_features"
+FEATURE_COLUMNS = [
+    "total_transactions",
+    "total_spend",
+    "avg_transaction_value",
+    "spend_last_30d",
+]
+
+
+class TTLCache:
+    """LRU cache whose entries also expire ``ttl_seconds`` after insertion."""
+
+    def __init__(self, maxsize: int, ttl_seconds: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_many(self, keys: Sequence[Any]) -> Tuple[Dict[Any, Any], List[Any]]:
+        now = self._clock()
+        found: Dict[Any, Any] = {}
+        missing: List[Any] = []
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                missing.append(key)
+                continue
+            self._entries.move_to_end(key)
+            found[key] = entry[1]
+        self.hits += len(found)
+        self.misses += len(missing)
+        return found, missing
+
+    def put_many(self, values: Dict[Any, Any]) -> None:
+        expires_at = self._clock() + self.ttl_seconds
+        for key, value in values.items():
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+class FeastRedisCodec:
+    """Encode keys and decode values the way Feast's Redis online store lays them out."""
+
+    def __init__(self, project: str, feature_view: str = FEATURE_VIEW, entity_key_serialization_version: int = 2):
+        from feast.infra.online_stores.helpers import _mmh3, _redis_key
+        from feast.protos.feast.types.EntityKey_pb2 import EntityKey
+        from feast.protos.feast.types.Value_pb2 import Value
+        from ml.features.customer_aggregates import entity_id
+
+        self._entity_id = entity_id
+        self._redis_key = _redis_key
+        self._entity_key = EntityKey
+        self._value = Value
+        self.project = project
+        self.version = entity_key_serialization_version
+        self.fields = [_mmh3(f"{feature_view}:{name}") for name in FEATURE_COLUMNS]
+
+    def encode_key(self, customer_id: Any) -> bytes:
+        # Same id mapping as the feature pipelines, so gold keys such as "ACME_B2B" resolve too.
+        value = self._value(int64_val=self._entity_id(customer_id))
+        entity_key = self._entity_key(join_keys=["customer_id"], entity_values=[value])
+        return self._redis_key(self.project, entity_key, entity_key_serialization_version=self.version)
+
+    def decode_value(self, raw: bytes) -> float:
+        value = self._value()
+        value.ParseFromString(raw)
+        return float(getattr(value, value.WhichOneof("val")))
+
+
+class RedisFeatureLookup:
+    """Fetch ``customer_features`` rows for many entities in one pipelined round trip."""
+
+    def __init__(self, redis: Any, codec: Any) -> None:
+        self.redis = redis
+        self.codec = codec
+
+    async def fetch(self, customer_ids: Sequence[Any]) -> Dict[Any, Optional[np.ndarray]]:
+        if not customer_ids:
+            return {}
+        pipe = self.redis.pipeline(transaction=False)
+        for customer_id in customer_ids:
+            pipe.hmget(self.codec.encode_key(customer_id), self.codec.fields)
+        responses = await pipe.execute()
+        rows: Dict[Any, Optional[np.ndarray]] = {}
+        for customer_id, values in zip(customer_ids, responses):
+            if values is None or any(value is None for value in values):
+                rows[customer_id] = None
+            else:
+                rows[customer_id] = np.array([self.codec.decode_value(value) for value in values], dtype=np.float64)
+        return rows
+
+
+class MicroBatcher:
+    """Coalesce concurrent scoring requests into a single ``predict`` call."""
+
+    def __init__(self, predict: Callable[[np.ndarray], Any], max_batch_rows: int = 1024, max_wait_ms: float = 2.0):
+        self._predict = predict
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: "asyncio.Queue[Tuple[np.ndarray, asyncio.Future]]" = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+        self.batches = 0
+
+    def start(self) -> None:
+        if self._worker is None:
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def submit(self, matrix: np.ndarray) -> np.ndarray:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((matrix, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            rows = len(batch[0][0])
+            deadline = loop.time() + self.max_wait
+            while rows < self.max_batch_rows:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                rows += len(item[0])
+            self._dispatch(batch)
+
+    def _dispatch(self, batch: List[Tuple[np.ndarray, asyncio.Future]]) -> None:
+        self.batches += 1
+        try:
+            scores = np.asarray(self._predict(np.vstack([matrix for matrix, _ in batch])), dtype=np.float64)
+        except Exception as exc:  # noqa: BLE001 - surfaced to every waiting request
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        offset = 0
+        for matrix, future in batch:
+            if not future.done():
+                future.set_result(scores[offset : offset + len(matrix)])
+            offset += len(matrix)
+
+
+class LatencyTracker:
+    """Keep a rolling window of request latencies and report percentiles."""
+
+    def __init__(self, window: int = 10_000) -> None:
+        self._samples: Deque[float] = deque(maxlen=window)
+        self.count = 0
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds * 1000.0)
+        self.count += 1
+
+    def snapshot(self) -> Dict[str, Optional[float]]:
+        if not self._samples:
+            return {"count": self.count, "p50_ms": None, "p99_ms": None}
+        p50, p99 = np.percentile(np.fromiter(self._samples, dtype=np.float64), [50, 99])
+        return {"count": self.count, "p50_ms": float(p50), "p99_ms": float(p99)}
+
+
+class ScoringService:
+    """Resolve features for ``customer_id``s and score them through the micro-batcher."""
+
+    def __init__(self, lookup: RedisFeatureLookup, cache: TTLCache, batcher: MicroBatcher) -> None:
+        self.lookup = lookup
+        self.cache = cache
+        self.batcher = batcher
+        self.latency = LatencyTracker()
+
+    async def score(self, customer_ids: Sequence[Any]) -> List[Dict[str, Any]]:
+        started = time.perf_counter()
+        unique_ids = list(dict.fromkeys(customer_ids))
+        features, missing = self.cache.get_many(unique_ids)
+        if missing:
+            fetched = await self.lookup.fetch(missing)
+            self.cache.put_many({key: row for key, row in fetched.items() if row is not None})
+            features.update(fetched)
+
+        known = [customer_id for customer_id in unique_ids if features.get(customer_id) is not None]
+        scores: Dict[Any, float] = {}
+        if known:
+            probabilities = await self.batcher.submit(np.vstack([features[key] for key in known]))
+            scores = dict(zip(known, probabilities.tolist()))
+
+        self.latency.record(time.perf_counter() - started)
+        return [{"customer_id": customer_id, "score": scores.get(customer_id)} for customer_id in customer_ids]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "latency": self.latency.snapshot(),
+            "cache": {"size": len(self.cache), "hits": self.cache.hits, "misses": self.cache.misses},
+            "predict_batches": self.batcher.batches,
+        }
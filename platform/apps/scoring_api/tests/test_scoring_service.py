@@ -0,0 +1,119 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import numpy as np
+
+APP_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(APP_DIR))
+
+from service import FEATURE_COLUMNS, MicroBatcher, RedisFeatureLookup, ScoringService, TTLCache
+
+
+class PlainCodec:
+    fields = [name.encode() for name in FEATURE_COLUMNS]
+
+    def encode_key(self, customer_id):
+        return f"customer:{customer_id}".encode()
+
+    def decode_value(self, raw):
+        return float(raw)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self._redis = redis
+        self._commands = []
+
+    def hmget(self, key, fields):
+        self._commands.append((key, fields))
+        return self
+
+    async def execute(self):
+        self._redis.round_trips += 1
+        return [[self._redis.hashes.get(key, {}).get(field) for field in fields] for key, fields in self._commands]
+
+
+class FakeRedis:
+    """Just enough of ``redis.asyncio.Redis`` to stand in for the Feast online store."""
+
+    def __init__(self, hashes):
+        self.hashes = hashes
+        self.round_trips = 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+def _redis_with(customers):
+    codec = PlainCodec()
+    hashes = {
+        codec.encode_key(customer_id): dict(zip(codec.fields, (str(v).encode() for v in values)))
+        for customer_id, values in customers.items()
+    }
+    return FakeRedis(hashes), codec
+
+
+def test_scoring_service_batches_lookups_and_caches_hot_entities():
+    redis, codec = _redis_with({1: [10, 100.0, 10.0, 5.0], 2: [20, 200.0, 10.0, 50.0]})
+    calls = []
+
+    def predict(matrix):
+        calls.append(len(matrix))
+        return matrix[:, 0] / 100.0
+
+    async def scenario():
+        batcher = MicroBatcher(predict, max_wait_ms=5)
+        batcher.start()
+        service = ScoringService(RedisFeatureLookup(redis, codec), TTLCache(maxsize=10, ttl_seconds=60), batcher)
+        first = await service.score([1, 2, 3])
+        second = await service.score([2, 1])
+        await batcher.stop()
+        return service, first, second
+
+    service, first, second = asyncio.run(scenario())
+
+    assert first == [
+        {"customer_id": 1, "score": 0.1},
+        {"customer_id": 2, "score": 0.2},
+        {"customer_id": 3, "score": None},
+    ]
+    assert second == [{"customer_id": 2, "score": 0.2}, {"customer_id": 1, "score": 0.1}]
+    assert redis.round_trips == 1
+    assert service.cache.hits == 2
+    stats = service.stats()
+    assert stats["latency"]["count"] == 2
+    assert stats["latency"]["p99_ms"] >= stats["latency"]["p50_ms"]
+
+
+def test_micro_batcher_coalesces_concurrent_requests():
+    calls = []
+
+    def predict(matrix):
+        calls.append(matrix.shape[0])
+        return matrix.sum(axis=1)
+
+    async def scenario():
+        batcher = MicroBatcher(predict, max_batch_rows=100, max_wait_ms=20)
+        batcher.start()
+        results = await asyncio.gather(*(batcher.submit(np.full((2, 4), i, dtype=float)) for i in range(5)))
+        await batcher.stop()
+        return results
+
+    results = asyncio.run(scenario())
+
+    assert calls == [10]
+    for i, scores in enumerate(results):
+        assert scores.tolist() == [4.0 * i, 4.0 * i]
+
+
+def test_ttl_cache_expires_and_evicts_least_recent():
+    now = [0.0]
+    cache = TTLCache(maxsize=2, ttl_seconds=10, clock=lambda: now[0])
+    cache.put_many({"a": 1, "b": 2})
+    cache.get_many(["a"])
+    cache.put_many({"c": 3})
+
+    assert cache.get_many(["a", "b", "c"]) == ({"a": 1, "c": 3}, ["b"])
+    now[0] = 11.0
+    assert cache.get_many(["a"]) == ({}, ["a"])
@@ -5,6 +5,10 @@ import mlflow
 import numpy as np
 import pandas as pd
 import streamlit as st
+from mlflow.exceptions import MlflowException
+from mlflow.tracking import MlflowClient
+
+from ml.scoring.native_scorer import NATIVE_MODEL_ARTIFACT, NativeLogisticScorer
 
 TRACKING_URI = os.environ.get("MLFLOW_TRACKING_URI", "http://localhost:5000")
 MODEL_NAME = os.environ.get("MLFLOW_MODEL_NAME", "oner_churn_model")
@@ -18,7 +22,26 @@ def _load_model():
     return mlflow.pyfunc.load_model(model_uri)
 
 
+@lru_cache(maxsize=1)
+def _load_native_scorer():
+    mlflow.set_tracking_uri(TRACKING_URI)
+    versions = MlflowClient().get_latest_versions(MODEL_NAME, stages=[MODEL_STAGE])
+    if not versions:
+        return None
+    try:
+        local_path = mlflow.artifacts.download_artifacts(
+            run_id=versions[0].run_id, artifact_path=NATIVE_MODEL_ARTIFACT
+        )
+    except MlflowException:
+        # Models trained before the native export existed only ship the Spark flavour.
+        return None
+    return NativeLogisticScorer.load(local_path)
+
+
 def _score(payload):
+    scorer = _load_native_scorer()
+    if scorer is not None:
+        return scorer.predict_proba(payload).tolist()
     model = _load_model()
     frame = pd.DataFrame(payload)
     predictions = model.predict(frame)
@@ -8,11 +8,10 @@ from feast.types import Float32, Int64
 
 CEPH_ENDPOINT = os.getenv("CEPH_RGW_ENDPOINT", "http://ceph:9000")
 FEATURESTORE_BUCKET = os.getenv("CEPH_BUCKET_FEATURESTORE", os.getenv("CEPH_BUCKET_BRONZE", "bronze"))
-FEATURESTORE_OBJECT_KEY = os.getenv(
-    "FEAST_OBJECT_KEY", os.getenv("FEAST_FEATURESTORE_OBJECT_KEY", "featurestore/customer_transactions.csv")
-)
+# The seed file and the per-run objects of customer_features_incremental share this prefix.
+FEATURESTORE_PREFIX = os.getenv("FEAST_SOURCE_PREFIX", "featurestore/customer_transactions")
 FEATURESTORE_SOURCE_URI = os.getenv(
-    "FEAST_SOURCE_URI", f"s3://{FEATURESTORE_BUCKET}/{FEATURESTORE_OBJECT_KEY}"
+    "FEAST_SOURCE_URI", f"s3://{FEATURESTORE_BUCKET}/{FEATURESTORE_PREFIX}/"
 )
 
 customer = Entity(name="customer_id", join_keys=["customer_id"], description="Unique customer identifier")
@@ -0,0 +1,207 @@
+"""SQL tables behind a store-backed :class:`~ml.features.customer_aggregates.CustomerFeatureState`.
+
+Each order's last applied contribution, each customer's running totals and the daily spend
+buckets inside the window are stored as one row each. A run therefore reads and writes only
+the orders and customers it touches. The Airflow DAG keeps them in Postgres (``analytics``
+tables created by Liquibase); the CDC service keeps them in a local SQLite file.
+"""
+from __future__ import annotations
+
+import sqlite3
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+CHECKPOINT_NAME = "customer_features"
+# Rows per IN list or multi-row INSERT; keeps statements well under SQLite's variable limit.
+CHUNK_SIZE = 500
+
+# Mirrors platform/versioning/liquibase/changelogs/postgres/0003-customer-feature-state.xml.
+SQLITE_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS customer_feature_orders ("
+    " order_id TEXT PRIMARY KEY, customer_id INTEGER, order_day TEXT, amount REAL, version INTEGER NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS customer_feature_totals ("
+    " customer_id INTEGER PRIMARY KEY, total_transactions INTEGER NOT NULL, total_spend REAL NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS customer_feature_daily_spend ("
+    " customer_id INTEGER NOT NULL, spend_day TEXT NOT NULL, spend REAL NOT NULL, PRIMARY KEY (customer_id, spend_day))",
+    "CREATE INDEX IF NOT EXISTS idx_customer_feature_daily_spend_day ON customer_feature_daily_spend (spend_day)",
+    "CREATE TABLE IF NOT EXISTS customer_feature_checkpoint (name TEXT PRIMARY KEY, watermark TEXT)",
+]
+
+OrderRow = Tuple[Any, Optional[date], Optional[float], int]
+CustomerRow = Tuple[int, float, Dict[date, float]]
+
+
+def _chunks(values: Sequence[Any], size: int = CHUNK_SIZE) -> Iterable[Sequence[Any]]:
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
+
+
+def _as_date(value: Any) -> Optional[date]:
+    if isinstance(value, datetime):
+        return value.date()
+    if value is None or isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def _as_datetime(value: Any) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+class SqlStateStore:
+    """Load and save feature state rows through a DB-API connection.
+
+    ``placeholder`` is the driver's parameter marker (``%s`` for psycopg2, ``?`` for sqlite3).
+    :meth:`save` commits; nothing else does, so a run's reads and writes share one transaction.
+    """
+
+    def __init__(self, connection: Any, schema: str = "analytics", placeholder: str = "%s") -> None:
+        self.connection = connection
+        self._prefix = f"{schema}." if schema else ""
+        self._placeholder = placeholder
+
+    @classmethod
+    def sqlite(cls, path: str) -> "SqlStateStore":
+        """Open (and create if needed) a SQLite state file."""
+        connection = sqlite3.connect(path)
+        for statement in SQLITE_SCHEMA:
+            connection.execute(statement)
+        connection.commit()
+        return cls(connection, schema="", placeholder="?")
+
+    def _sql(self, text: str) -> str:
+        return text.replace("{p}", self._prefix).replace("%s", self._placeholder)
+
+    def _markers(self, count: int) -> str:
+        return ", ".join(["%s"] * count)
+
+    def _query(self, text: str, params: Sequence[Any] = ()) -> List[Tuple]:
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(self._sql(text), list(params))
+            return list(cursor.fetchall())
+        finally:
+            cursor.close()
+
+    def load_orders(self, order_ids: Iterable[str]) -> Dict[str, OrderRow]:
+        """Stored contributions for ``order_ids`` that have one."""
+        found: Dict[str, OrderRow] = {}
+        for chunk in _chunks(sorted(order_ids)):
+            rows = self._query(
+                "SELECT order_id, customer_id, order_day, amount, version FROM {p}customer_feature_orders"
+                f" WHERE order_id IN ({self._markers(len(chunk))})",
+                chunk,
+            )
+            for order_id, customer_id, day, amount, version in rows:
+                found[order_id] = (customer_id, _as_date(day), amount, int(version))
+        return found
+
+    def load_customers(self, customer_ids: Iterable[int]) -> Dict[int, CustomerRow]:
+        """Totals and in-window daily buckets for the ``customer_ids`` that have any."""
+        found: Dict[int, CustomerRow] = {}
+        for chunk in _chunks(sorted(customer_ids)):
+            markers = self._markers(len(chunk))
+            totals = self._query(
+                "SELECT customer_id, total_transactions, total_spend FROM {p}customer_feature_totals"
+                f" WHERE customer_id IN ({markers})",
+                chunk,
+            )
+            for customer_id, transactions, spend in totals:
+                found[customer_id] = (int(transactions), float(spend), {})
+            buckets = self._query(
+                "SELECT customer_id, spend_day, spend FROM {p}customer_feature_daily_spend"
+                f" WHERE customer_id IN ({markers})",
+                chunk,
+            )
+            for customer_id, day, spend in buckets:
+                found.setdefault(customer_id, (0, 0.0, {}))[2][_as_date(day)] = float(spend)
+        return found
+
+    def stale_customers(self, window_start: date) -> Set[int]:
+        """Customers holding a bucket older than ``window_start``."""
+        rows = self._query(
+            "SELECT DISTINCT customer_id FROM {p}customer_feature_daily_spend WHERE spend_day < %s",
+            [window_start.isoformat()],
+        )
+        return {customer_id for (customer_id,) in rows}
+
+    def watermark(self) -> Optional[datetime]:
+        rows = self._query("SELECT watermark FROM {p}customer_feature_checkpoint WHERE name = %s", [CHECKPOINT_NAME])
+        return _as_datetime(rows[0][0]) if rows else None
+
+    def _upsert(self, cursor: Any, table: str, columns: Sequence[str], key: str, rows: List[Tuple]) -> None:
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns if column != key)
+        row_markers = f"({self._markers(len(columns))})"
+        for chunk in _chunks(rows):
+            cursor.execute(
+                self._sql(
+                    f"INSERT INTO {{p}}{table} ({', '.join(columns)}) VALUES {', '.join([row_markers] * len(chunk))}"
+                    f" ON CONFLICT ({key}) DO UPDATE SET {updates}"
+                ),
+                [value for row in chunk for value in row],
+            )
+
+    def save(
+        self,
+        orders: Dict[str, OrderRow],
+        customers: Dict[int, CustomerRow],
+        watermark: Optional[datetime] = None,
+    ) -> None:
+        """Write changed contributions and customers (buckets are replaced per customer), then commit."""
+        cursor = self.connection.cursor()
+        try:
+            self._upsert(
+                cursor,
+                "customer_feature_orders",
+                ["order_id", "customer_id", "order_day", "amount", "version"],
+                "order_id",
+                [
+                    (order_id, customer_id, day.isoformat() if day else None, amount, version)
+                    for order_id, (customer_id, day, amount, version) in orders.items()
+                ],
+            )
+            self._upsert(
+                cursor,
+                "customer_feature_totals",
+                ["customer_id", "total_transactions", "total_spend"],
+                "customer_id",
+                [(customer_id, transactions, spend) for customer_id, (transactions, spend, _) in customers.items()],
+            )
+            ids = sorted(customers)
+            for chunk in _chunks(ids):
+                cursor.execute(
+                    self._sql(
+                        f"DELETE FROM {{p}}customer_feature_daily_spend WHERE customer_id IN ({self._markers(len(chunk))})"
+                    ),
+                    list(chunk),
+                )
+            buckets = [
+                (customer_id, day.isoformat(), spend)
+                for customer_id in ids
+                for day, spend in sorted(customers[customer_id][2].items())
+            ]
+            for chunk in _chunks(buckets):
+                cursor.execute(
+                    self._sql(
+                        "INSERT INTO {p}customer_feature_daily_spend (customer_id, spend_day, spend)"
+                        f" VALUES {', '.join(['(%s, %s, %s)'] * len(chunk))}"
+                    ),
+                    [value for row in chunk for value in row],
+                )
+            if watermark is not None:
+                self._upsert(
+                    cursor,
+                    "customer_feature_checkpoint",
+                    ["name", "watermark"],
+                    "name",
+                    [(CHECKPOINT_NAME, watermark.isoformat())],
+                )
+        except Exception:
+            # Leave nothing half-written; the caller still holds the changes and can retry.
+            self.connection.rollback()
+            raise
+        finally:
+            cursor.close()
+        self.connection.commit()
@@ -0,0 +1,93 @@
+"""NumPy-only scorer for the churn logistic regression exported from Spark ML."""
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Mapping, Sequence
+
+import numpy as np
+
+NATIVE_MODEL_ARTIFACT = "native_model.json"
+NATIVE_MODEL_FORMAT = "oner-logistic-regression/v1"
+
+
+class NativeLogisticScorer:
+    """Score feature rows with exported logistic regression weights, without Spark."""
+
+    def __init__(
+        self,
+        coefficients: Sequence[float],
+        intercept: float,
+        feature_columns: Sequence[str],
+        threshold: float = 0.5,
+    ) -> None:
+        self.coefficients = np.asarray(coefficients, dtype=np.float64)
+        if self.coefficients.ndim != 1 or len(self.coefficients) != len(feature_columns):
+            raise ValueError(
+                f"Expected {len(feature_columns)} coefficients, got shape {self.coefficients.shape}"
+            )
+        self.intercept = float(intercept)
+        self.feature_columns = list(feature_columns)
+        self.threshold = float(threshold)
+
+    @classmethod
+    def from_spark_model(cls, model: Any, feature_columns: Sequence[str]) -> "NativeLogisticScorer":
+        """Build a scorer from a fitted binary ``pyspark.ml`` LogisticRegressionModel."""
+        return cls(
+            coefficients=model.coefficients.toArray(),
+            intercept=model.intercept,
+            feature_columns=feature_columns,
+            threshold=model.getThreshold(),
+        )
+
+    @classmethod
+    def from_dict(cls, payload: Mapping[str, Any]) -> "NativeLogisticScorer":
+        if payload.get("format") != NATIVE_MODEL_FORMAT:
+            raise ValueError(f"Unsupported native model format: {payload.get('format')}")
+        return cls(
+            coefficients=payload["coefficients"],
+            intercept=payload["intercept"],
+            feature_columns=payload["feature_columns"],
+            threshold=payload.get("threshold", 0.5),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "NativeLogisticScorer":
+        with open(path, "r", encoding="utf-8") as handle:
+            return cls.from_dict(json.load(handle))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "format": NATIVE_MODEL_FORMAT,
+            "feature_columns": self.feature_columns,
+            "coefficients": self.coefficients.tolist(),
+            "intercept": self.intercept,
+            "threshold": self.threshold,
+        }
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(self.to_dict(), handle)
+
+    def feature_matrix(self, rows: Any) -> np.ndarray:
+        """Coerce a DataFrame, a list of dicts, or a 2-D array into an (n, k) float matrix."""
+        if hasattr(rows, "columns"):
+            return rows[self.feature_columns].to_numpy(dtype=np.float64)
+        if isinstance(rows, np.ndarray):
+            matrix = rows.astype(np.float64, copy=False)
+        elif rows and isinstance(rows[0], Mapping):
+            matrix = np.array([[row[name] for name in self.feature_columns] for row in rows], dtype=np.float64)
+        else:
+            matrix = np.asarray(rows, dtype=np.float64)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(-1, len(self.feature_columns))
+        return matrix
+
+    def predict_proba(self, rows: Any) -> np.ndarray:
+        """Return the positive-class probability, matching Spark's ``probability[1]``."""
+        margin = self.feature_matrix(rows) @ self.coefficients + self.intercept
+        # Spark evaluates 1 / (1 + exp(-margin)); overflow to inf yields the correct 0.0.
+        with np.errstate(over="ignore"):
+            return 1.0 / (1.0 + np.exp(-margin))
+
+    def predict(self, rows: Any) -> np.ndarray:
+        return (self.predict_proba(rows) > self.threshold).astype(np.int64)
@@ -0,0 +1,64 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+sys.path.insert(0, str(PROJECT_ROOT / "platform"))
+
+from ml.scoring.native_scorer import NativeLogisticScorer
+
+FEATURES = ["total_transactions", "total_spend", "avg_transaction_value", "spend_last_30d"]
+
+
+class _DenseVector:
+    def __init__(self, values):
+        self._values = values
+
+    def toArray(self):
+        return np.array(self._values)
+
+
+class _SparkModelStub:
+    coefficients = _DenseVector([0.02, -0.001, 0.05, -0.004])
+    intercept = -0.3
+
+    def getThreshold(self):
+        return 0.5
+
+
+def test_native_scorer_matches_logistic_formula(tmp_path):
+    scorer = NativeLogisticScorer.from_spark_model(_SparkModelStub(), FEATURES)
+    artifact = tmp_path / "native_model.json"
+    scorer.save(str(artifact))
+    loaded = NativeLogisticScorer.load(str(artifact))
+
+    frame = pd.read_csv(PROJECT_ROOT / "storage" / "data" / "ml" / "customer_transactions.csv")
+    # Column order in the input must not matter; the artifact carries the feature order.
+    shuffled = frame[list(reversed(FEATURES))]
+    probabilities = loaded.predict_proba(shuffled)
+
+    margin = frame[FEATURES].to_numpy() @ np.array([0.02, -0.001, 0.05, -0.004]) - 0.3
+    expected = 1.0 / (1.0 + np.exp(-margin))
+    np.testing.assert_allclose(probabilities, expected, rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(loaded.predict(shuffled), (expected > 0.5).astype(int))
+
+
+def test_native_scorer_accepts_records_and_extreme_margins():
+    scorer = NativeLogisticScorer([1.0, 0.0, 0.0, 0.0], 0.0, FEATURES)
+    records = [
+        {"total_transactions": -1000.0, "total_spend": 0, "avg_transaction_value": 0, "spend_last_30d": 0},
+        {"total_transactions": 0.0, "total_spend": 0, "avg_transaction_value": 0, "spend_last_30d": 0},
+    ]
+
+    probabilities = scorer.predict_proba(records)
+
+    assert probabilities.tolist() == [0.0, 0.5]
+    assert scorer.predict_proba([]).shape == (0,)
+
+
+def test_native_scorer_rejects_mismatched_weights():
+    with pytest.raises(ValueError):
+        NativeLogisticScorer([1.0, 2.0], 0.0, FEATURES)
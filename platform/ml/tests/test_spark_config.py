@@ -0,0 +1,66 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+sys.path.insert(0, str(PROJECT_ROOT / "platform"))
+
+from ml.training.spark_config import LOCAL_MASTER, master_reachable, resolve_execution
+
+
+def test_local_mode_is_the_default():
+    execution = resolve_execution({}, reachable=lambda master: pytest.fail("local mode must not probe"))
+
+    assert execution.mode == "local"
+    assert execution.master == LOCAL_MASTER
+    assert execution.conf["spark.serializer"] == "org.apache.spark.serializer.KryoSerializer"
+    assert "spark.dynamicAllocation.enabled" not in execution.conf
+
+
+def test_cluster_mode_sizes_executors_and_enables_dynamic_allocation():
+    env = {
+        "ML_SPARK_MODE": "cluster",
+        "ML_SPARK_MASTER": "spark://spark-master:7077",
+        "ML_SPARK_EXECUTOR_MEMORY": "2g",
+        "ML_SPARK_MAX_EXECUTORS": "3",
+        "ML_SPARK_DRIVER_HOST": "airflow-worker",
+        "ML_SPARK_DFS_TMPDIR": "s3a://silver/tmp/mlflow",
+    }
+
+    execution = resolve_execution(env, reachable=lambda master: True)
+
+    assert execution.mode == "cluster"
+    assert execution.master == "spark://spark-master:7077"
+    assert execution.conf["spark.executor.memory"] == "2g"
+    assert execution.conf["spark.dynamicAllocation.maxExecutors"] == "3"
+    assert execution.conf["spark.dynamicAllocation.shuffleTracking.enabled"] == "true"
+    assert execution.conf["spark.driver.host"] == "airflow-worker"
+    assert execution.conf["spark.sql.execution.arrow.pyspark.enabled"] == "true"
+    assert execution.dfs_tmpdir == "s3a://silver/tmp/mlflow"
+
+
+def test_cluster_mode_without_shared_dfs_tmpdir_trains_locally():
+    execution = resolve_execution({"ML_SPARK_MODE": "cluster"}, reachable=lambda master: True)
+
+    assert execution.mode == "local"
+    assert execution.dfs_tmpdir is None
+
+
+def test_unreachable_master_falls_back_to_local():
+    execution = resolve_execution(
+        {"ML_SPARK_MODE": "cluster", "ML_SPARK_DFS_TMPDIR": "/shared/tmp"}, reachable=lambda master: False
+    )
+
+    assert execution.mode == "local"
+    assert execution.master == LOCAL_MASTER
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError, match="ML_SPARK_MODE"):
+        resolve_execution({"ML_SPARK_MODE": "yarn"})
+
+
+def test_master_reachable_only_probes_spark_urls():
+    assert not master_reachable("local[*]")
+    assert not master_reachable("spark://127.0.0.1:1", timeout=0.2)
@@ -0,0 +1,111 @@
+"""Spark execution settings for training: the standalone cluster, or ``local[*]`` as fallback.
+
+``ML_SPARK_MODE=cluster`` submits training to ``ML_SPARK_MASTER`` in client mode.
+The Airflow worker only hosts the driver; executors run on the ``spark-worker``
+services and are sized by the ``ML_SPARK_*`` variables. MLflow saves Spark models
+through ``dfs_tmpdir``, which executors write and the driver reads, so cluster mode
+also needs ``ML_SPARK_DFS_TMPDIR`` on storage both can see (an ``s3a://`` path or a
+volume mounted on the worker and the spark-workers). When the mode is ``local``, that
+directory is not set, or the master cannot be reached, training keeps running
+in-process on ``local[*]``.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import socket
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional
+from urllib.parse import urlparse
+
+LOCAL_MASTER = "local[*]"
+DEFAULT_CLUSTER_MASTER = "spark://spark-master:7077"
+SPARK_MODES = ("local", "cluster")
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SparkExecution:
+    mode: str
+    master: str
+    conf: Dict[str, str]
+    # Passed to mlflow.spark.log_model; None keeps MLflow's driver-local default.
+    dfs_tmpdir: Optional[str] = None
+
+
+def _common_conf(env: Mapping[str, str]) -> Dict[str, str]:
+    return {
+        "spark.ui.showConsoleProgress": "false",
+        "spark.serializer": "org.apache.spark.serializer.KryoSerializer",
+        "spark.kryoserializer.buffer.max": env.get("ML_SPARK_KRYO_BUFFER_MAX", "256m"),
+        # Training data is built with pandas on the driver; Arrow makes createDataFrame columnar.
+        "spark.sql.execution.arrow.pyspark.enabled": "true",
+        "spark.sql.execution.arrow.pyspark.fallback.enabled": "true",
+        "spark.sql.execution.arrow.maxRecordsPerBatch": env.get("ML_SPARK_ARROW_BATCH_ROWS", "10000"),
+        "spark.sql.shuffle.partitions": env.get("ML_SPARK_SHUFFLE_PARTITIONS", "8"),
+    }
+
+
+def _driver_host() -> str:
+    # Executors connect back to the driver, so advertise an address they can route to.
+    try:
+        return socket.gethostbyname(socket.gethostname())
+    except OSError:
+        return socket.gethostname()
+
+
+def cluster_conf(env: Mapping[str, str], driver_host: Optional[str] = None) -> Dict[str, str]:
+    """Executor sizing and dynamic allocation for the standalone cluster."""
+    return {
+        **_common_conf(env),
+        "spark.submit.deployMode": "client",
+        "spark.driver.host": env.get("ML_SPARK_DRIVER_HOST") or driver_host or _driver_host(),
+        "spark.driver.bindAddress": "0.0.0.0",
+        "spark.driver.memory": env.get("ML_SPARK_DRIVER_MEMORY", "1g"),
+        "spark.executor.cores": env.get("ML_SPARK_EXECUTOR_CORES", "1"),
+        "spark.executor.memory": env.get("ML_SPARK_EXECUTOR_MEMORY", "1g"),
+        "spark.cores.max": env.get("ML_SPARK_CORES_MAX", "4"),
+        "spark.dynamicAllocation.enabled": "true",
+        # Standalone workers run no external shuffle service; track shuffle files instead.
+        "spark.dynamicAllocation.shuffleTracking.enabled": "true",
+        "spark.dynamicAllocation.minExecutors": env.get("ML_SPARK_MIN_EXECUTORS", "0"),
+        "spark.dynamicAllocation.maxExecutors": env.get("ML_SPARK_MAX_EXECUTORS", "4"),
+        "spark.dynamicAllocation.executorIdleTimeout": env.get("ML_SPARK_EXECUTOR_IDLE_TIMEOUT", "60s"),
+    }
+
+
+def local_conf(env: Mapping[str, str]) -> Dict[str, str]:
+    return {**_common_conf(env), "spark.driver.memory": env.get("ML_SPARK_DRIVER_MEMORY", "1g")}
+
+
+def master_reachable(master: str, timeout: float = 3.0) -> bool:
+    parsed = urlparse(master)
+    if parsed.scheme != "spark" or not parsed.hostname:
+        return False
+    try:
+        with socket.create_connection((parsed.hostname, parsed.port or 7077), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def resolve_execution(env: Optional[Mapping[str, str]] = None, reachable=master_reachable) -> SparkExecution:
+    """Pick the master and settings from ``ML_SPARK_MODE``, falling back to ``local[*]``."""
+    env = os.environ if env is None else env
+    mode = env.get("ML_SPARK_MODE", "local").strip().lower()
+    if mode not in SPARK_MODES:
+        raise ValueError(f"ML_SPARK_MODE must be one of {SPARK_MODES}, got '{mode}'")
+    if mode == "cluster":
+        master = env.get("ML_SPARK_MASTER", DEFAULT_CLUSTER_MASTER)
+        dfs_tmpdir = env.get("ML_SPARK_DFS_TMPDIR", "").strip()
+        if not dfs_tmpdir:
+            logger.warning(
+                "ML_SPARK_DFS_TMPDIR is not set, so MLflow could not save models from the cluster; training on %s",
+                LOCAL_MASTER,
+            )
+        elif reachable(master):
+            return SparkExecution("cluster", master, cluster_conf(env), dfs_tmpdir=dfs_tmpdir)
+        else:
+            logger.warning("Spark master %s is unreachable; training on %s instead", master, LOCAL_MASTER)
+    return SparkExecution("local", LOCAL_MASTER, local_conf(env))
@@ -2,9 +2,12 @@
 from __future__ import annotations
 
 import os
+import time
 from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
 
 import mlflow
+import pandas as pd
 from hyperopt import STATUS_OK, Trials, fmin, hp, tpe
 from mlflow.tracking import MlflowClient
 from pyspark.ml.classification import LogisticRegression
@@ -13,6 +16,9 @@ from pyspark.ml.feature import VectorAssembler
 from pyspark.sql import SparkSession
 from pyspark.sql.functions import col
 
+from ml.scoring.native_scorer import NATIVE_MODEL_ARTIFACT, NativeLogisticScorer
+from ml.training.spark_config import SparkExecution, resolve_execution
+
 FEATURE_COLUMNS = [
     "total_transactions",
     "total_spend",
@@ -22,26 +28,44 @@ FEATURE_COLUMNS = [
 TARGET_COLUMN = "churned"
 
 
-def _create_spark_session(app_name: str) -> SparkSession:
-    return (
-        SparkSession.builder.master("local[*]")
-        .appName(app_name)
-        .config("spark.ui.showConsoleProgress", "false")
-        .getOrCreate()
-    )
+def _create_spark_session(app_name: str) -> Tuple[SparkSession, SparkExecution]:
+    execution = resolve_execution()
+    builder = SparkSession.builder.master(execution.master).appName(app_name)
+    for key, value in execution.conf.items():
+        builder = builder.config(key, value)
+    print(f"Training on Spark {execution.mode} ({execution.master})")
+    return builder.getOrCreate(), execution
 
 
 def _prepare_dataset(spark: SparkSession, data_path: str):
-    df = spark.read.csv(data_path, header=True, inferSchema=True)
+    # The CSV lives on the driver's filesystem, which cluster executors cannot see, so it
+    # is loaded with pandas and shipped through Arrow. Training itself stays in the JVM,
+    # so executors need no Python of their own.
+    frame = pd.read_csv(data_path, usecols=FEATURE_COLUMNS + [TARGET_COLUMN])
+    df = spark.createDataFrame(frame)
     assembler = VectorAssembler(inputCols=FEATURE_COLUMNS, outputCol="features")
     transformed = assembler.transform(df)
     dataset = transformed.select(col("features"), col(TARGET_COLUMN).alias("label"))
-    return dataset.randomSplit([0.8, 0.2], seed=42)
-
-
-def run_hyperopt_training(data_path: str, experiment_name: str, model_name: str) -> str:
-    spark = _create_spark_session("ChurnTraining")
+    train_df, test_df = dataset.randomSplit([0.8, 0.2], seed=42)
+    # Every Hyperopt trial rescans both splits; keep them on the executors.
+    return train_df.cache(), test_df.cache()
+
+
+def run_hyperopt_training(
+    data_path: str,
+    experiment_name: str,
+    model_name: str,
+    on_trial_end: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> str:
+    """Tune, register and stage the churn model; returns the best trial's run id.
+
+    ``on_trial_end`` receives ``seconds``, ``auc``, ``train_rows`` and ``params`` after
+    every Hyperopt trial (the Airflow task uses it to export per-trial metrics).
+    """
+    spark, execution = _create_spark_session("ChurnTraining")
     train_df, test_df = _prepare_dataset(spark, data_path)
+    # Also materialises the cached split before the first trial.
+    train_rows = train_df.count()
     evaluator = BinaryClassificationEvaluator(metricName="areaUnderROC")
 
     mlflow.set_tracking_uri(os.environ["MLFLOW_TRACKING_URI"])
@@ -49,6 +73,7 @@ def run_hyperopt_training(data_path: str, experiment_name: str, model_name: str)
     mlflow.spark.autolog(log_models=False)
 
     def objective(params):
+        started = time.perf_counter()
         with mlflow.start_run(nested=True) as run:
             lr = LogisticRegression(
                 featuresCol="features",
@@ -68,8 +93,12 @@ def run_hyperopt_training(data_path: str, experiment_name: str, model_name: str)
                     "elastic_net": float(params["elastic_net"]),
                 }
             )
-            mlflow.spark.log_model(model, artifact_path="model")
-            return {"loss": -auc, "status": STATUS_OK, "run_id": run.info.run_id}
+            mlflow.spark.log_model(model, artifact_path="model", dfs_tmpdir=execution.dfs_tmpdir)
+        if on_trial_end is not None:
+            on_trial_end(
+                {"seconds": time.perf_counter() - started, "auc": auc, "train_rows": train_rows, "params": params}
+            )
+        return {"loss": -auc, "status": STATUS_OK, "run_id": run.info.run_id}
 
     search_space = {
         "max_iter": hp.quniform("max_iter", 20, 150, 10),
@@ -101,7 +130,10 @@ def run_hyperopt_training(data_path: str, experiment_name: str, model_name: str)
                 "elastic_net": float(best["elastic_net"]),
             }
         )
-        mlflow.spark.log_model(model, artifact_path="model")
+        mlflow.spark.log_model(model, artifact_path="model", dfs_tmpdir=execution.dfs_tmpdir)
+        # Spark-free copy of the weights for low-latency scoring (see ml.scoring.native_scorer).
+        native = NativeLogisticScorer.from_spark_model(model, FEATURE_COLUMNS)
+        mlflow.log_dict(native.to_dict(), NATIVE_MODEL_ARTIFACT)
         model_uri = f"runs:/{best_run.info.run_id}/model"
         registered_model = mlflow.register_model(model_uri, model_name)
 
@@ -0,0 +1,111 @@
+"""Nightly batch scoring of every feature-store customer into ClickHouse."""
+from __future__ import annotations
+
+import logging
+import os
+import sys
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from airflow.decorators import dag, task
+
+from include.connections import boto_client, clickhouse_client
+
+# mlflow, pandas and the NumPy scorer are imported inside the tasks to keep DAG parsing cheap.
+sys.path.append("/opt/airflow/platform")
+
+SCORING_PARTITIONS = int(os.getenv("BATCH_SCORING_PARTITIONS", "8"))
+SCORING_POOL = os.getenv("BATCH_SCORING_POOL", "batch_scoring")
+INSERT_CHUNK_ROWS = int(os.getenv("BATCH_SCORING_INSERT_CHUNK_ROWS", "100000"))
+# The Feast offline source: the seed object plus one object per customer_features_incremental run.
+FEATURESTORE_BUCKET = os.getenv("CEPH_BUCKET_FEATURESTORE", os.getenv("CEPH_BUCKET_BRONZE", "bronze"))
+FEATURESTORE_PREFIX = os.getenv("FEAST_SOURCE_PREFIX", "featurestore/customer_transactions")
+
+
+def _data_root() -> str:
+    return os.environ.get("FEAST_REFERENCE_DATA_PATH", "/opt/airflow/storage/data/ml")
+
+
+@dag(
+    dag_id="churn_batch_scoring",
+    schedule="0 2 * * *",
+    catchup=False,
+    start_date=datetime(2024, 1, 1),
+    default_args={"owner": "ml-platform", "retries": 1, "retry_delay": timedelta(minutes=5)},
+    tags=["ml", "scoring", "batch"],
+)
+def churn_batch_scoring() -> None:
+    @task()
+    def resolve_staged_model() -> Dict[str, Any]:
+        import mlflow
+        from mlflow.tracking import MlflowClient
+        from ml.scoring.native_scorer import NATIVE_MODEL_ARTIFACT, NativeLogisticScorer
+
+        model_name = os.environ.get("MLFLOW_MODEL_NAME", "oner_churn_model")
+        stage = os.environ.get("BATCH_SCORING_MODEL_STAGE", "Staging")
+        mlflow.set_tracking_uri(os.environ["MLFLOW_TRACKING_URI"])
+        versions = MlflowClient().get_latest_versions(model_name, stages=[stage])
+        if not versions:
+            raise RuntimeError(f"No '{stage}' version registered for model '{model_name}'")
+        version = versions[0]
+        local_path = mlflow.artifacts.download_artifacts(run_id=version.run_id, artifact_path=NATIVE_MODEL_ARTIFACT)
+        scorer = NativeLogisticScorer.load(local_path)
+        logging.info("Scoring with %s version %s", model_name, version.version)
+        # The exported weights are a few hundred bytes, so every mapped task reuses them via XCom
+        # instead of loading the model from MLflow again.
+        return {"model_version": f"{model_name}/{version.version}", "weights": scorer.to_dict()}
+
+    @task()
+    def plan_partitions(model: Dict[str, Any], **context) -> List[str]:
+        from include.batch_scoring import latest_features, partition_customers
+        from include.customer_features import read_offline_rows
+
+        feature_columns = model["weights"]["feature_columns"]
+        frame = read_offline_rows(
+            boto_client(),
+            FEATURESTORE_BUCKET,
+            FEATURESTORE_PREFIX,
+            ["customer_id", "event_timestamp", "created_at", *feature_columns],
+        )
+        features = latest_features(frame, feature_columns)
+        output_dir = os.path.join(_data_root(), "outputs", "batch_scoring", context["run_id"].replace(":", "_"))
+        os.makedirs(output_dir, exist_ok=True)
+        paths = []
+        for index, partition in enumerate(partition_customers(features, SCORING_PARTITIONS)):
+            path = os.path.join(output_dir, f"part-{index:04d}.parquet")
+            partition.to_parquet(path, index=False)
+            paths.append(path)
+        logging.info("Planned %s customers across %s partitions", len(features), len(paths))
+        return paths
+
+    @task(pool=SCORING_POOL)
+    def score_partition(path: str, model: Dict[str, Any], **context) -> int:
+        import pandas as pd
+        from include.batch_scoring import score_rows
+        from ml.scoring.native_scorer import NativeLogisticScorer
+
+        scorer = NativeLogisticScorer.from_dict(model["weights"])
+        frame = pd.read_parquet(path, columns=["customer_id", *scorer.feature_columns])
+        scored_at = context["data_interval_end"].replace(tzinfo=None)
+        rows = score_rows(frame, scorer, model["model_version"], scored_at)
+        client = clickhouse_client()
+        for start in range(0, len(rows), INSERT_CHUNK_ROWS):
+            client.execute(
+                "INSERT INTO analytics.churn_scores (customer_id, score, model_version, scored_at) VALUES",
+                rows[start : start + INSERT_CHUNK_ROWS],
+            )
+        return len(rows)
+
+    @task()
+    def report(counts: List[int]) -> int:
+        total = sum(counts)
+        logging.info("Wrote %s churn scores to analytics.churn_scores", total)
+        return total
+
+    model = resolve_staged_model()
+    partitions = plan_partitions(model)
+    counts = score_partition.partial(model=model).expand(path=partitions)
+    report(counts)
+
+
+churn_batch_scoring()
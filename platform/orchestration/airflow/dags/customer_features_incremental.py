@@ -0,0 +1,78 @@
+"""Daily incremental refresh of Feast ``customer_features`` from ``gold.orders_snapshot``."""
+from __future__ import annotations
+
+import logging
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta
+
+from airflow.decorators import dag, task
+
+from include.connections import boto_client, postgres_conn_info
+
+sys.path.append("/opt/airflow/platform")
+
+FEATURESTORE_BUCKET = os.getenv("CEPH_BUCKET_FEATURESTORE", os.getenv("CEPH_BUCKET_BRONZE", "bronze"))
+# Feast reads every object under this prefix; each run adds one and never rewrites the others.
+FEATURESTORE_PREFIX = os.getenv("FEAST_SOURCE_PREFIX", "featurestore/customer_transactions")
+
+
+@dag(
+    dag_id="customer_features_incremental",
+    schedule="30 1 * * *",
+    catchup=False,
+    max_active_runs=1,
+    start_date=datetime(2024, 1, 1),
+    default_args={"owner": "ml-platform", "retries": 1, "retry_delay": timedelta(minutes=5)},
+    tags=["ml", "features", "feast"],
+)
+def customer_features_incremental() -> None:
+    @task()
+    def compute_features(**context) -> int:
+        # Imported here so parsing the DAG file does not load pandas or psycopg2.
+        import psycopg2
+        from include.customer_features import apply_changes, feature_frame, iter_changed_orders, write_offline_rows
+        from ml.features.customer_aggregates import CustomerFeatureState
+        from ml.features.state_store import SqlStateStore
+
+        as_of = context["data_interval_end"].replace(tzinfo=None)
+        client = boto_client()
+        connection = psycopg2.connect(**postgres_conn_info())
+        try:
+            # Only the changed orders' contributions and their customers are read from the state tables.
+            state = CustomerFeatureState(store=SqlStateStore(connection))
+            watermark = state.store.watermark()
+            touched, watermark, changed = apply_changes(state, iter_changed_orders(connection, watermark), watermark)
+            touched |= state.expire(as_of.date())
+            logging.info(
+                "Read %s changed orders (%s without a customer); refreshing %s customers as of %s",
+                changed,
+                state.skipped,
+                len(touched),
+                as_of,
+            )
+            if touched:
+                created_at = datetime.utcnow()
+                frame = feature_frame(state, touched, as_of, created_at=created_at)
+                key = write_offline_rows(client, FEATURESTORE_BUCKET, FEATURESTORE_PREFIX, frame, as_of, created_at)
+                logging.info("Wrote %s feature rows to s3://%s/%s", len(frame), FEATURESTORE_BUCKET, key)
+            # The watermark only advances once the features it covers are in the offline source.
+            state.commit(watermark)
+        finally:
+            connection.close()
+        return len(touched)
+
+    @task()
+    def materialize_online(refreshed: int, **context) -> None:
+        if not refreshed:
+            logging.info("No customer features changed; skipping materialization")
+            return
+        repo_path = os.environ.get("FEAST_REPO_PATH", "/opt/airflow/feast_repo")
+        target = context["data_interval_end"].replace(tzinfo=None).isoformat()
+        subprocess.run(["feast", "materialize-incremental", target], cwd=repo_path, check=True)
+
+    materialize_online(compute_features())
+
+
+customer_features_incremental()
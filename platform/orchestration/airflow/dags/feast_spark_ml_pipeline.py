@@ -6,13 +6,14 @@ import sys
 import subprocess
 from datetime import datetime, timedelta
 
-import pandas as pd
 from airflow import DAG
 from airflow.operators.python import PythonOperator
-from feast import FeatureStore
 
+from include.pipeline_metrics import record_stage
+
+# feast, pandas and the training pipeline (pyspark, mlflow, hyperopt) are imported inside the
+# callables, so the scheduler does not load them every time it parses this file.
 sys.path.append("/opt/airflow/platform")
-from ml.training.train_pipeline import run_hyperopt_training
 
 FEAST_FEATURES = [
     "customer_features:total_transactions",
@@ -36,6 +37,9 @@ def feast_materialize(**_):
 
 
 def generate_training_dataset(**_):
+    import pandas as pd
+    from feast import FeatureStore
+
     repo_path = _repo_path()
     store = FeatureStore(repo_path)
     data_root = os.environ.get("FEAST_REFERENCE_DATA_PATH", "/opt/airflow/storage/data/ml")
@@ -52,14 +56,20 @@ def generate_training_dataset(**_):
     return training_path
 
 
+def _record_trial(trial):
+    record_stage("training_trial", trial["seconds"], rows=trial["train_rows"], training_trial_auc=trial["auc"])
+
+
 def train_spark_model(**context):
+    from ml.training.train_pipeline import run_hyperopt_training
+
     data_root = os.environ.get("FEAST_REFERENCE_DATA_PATH", "/opt/airflow/storage/data/ml")
     outputs_dir = os.path.join(data_root, "outputs")
     os.makedirs(outputs_dir, exist_ok=True)
     csv_path = os.path.join(data_root, "customer_transactions.csv")
     experiment_name = "customer_churn_experiment"
     model_name = os.environ.get("MLFLOW_MODEL_NAME", "oner_churn_model")
-    run_id = run_hyperopt_training(csv_path, experiment_name, model_name)
+    run_id = run_hyperopt_training(csv_path, experiment_name, model_name, on_trial_end=_record_trial)
     context["ti"].xcom_push(key="model_name", value=model_name)
     context["ti"].xcom_push(key="best_run_id", value=run_id)
 
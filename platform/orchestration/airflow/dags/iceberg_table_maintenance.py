@@ -0,0 +1,97 @@
+"""Nightly compaction and metadata cleanup for the medallion Iceberg tables."""
+from __future__ import annotations
+
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from airflow.decorators import dag, task
+from airflow.models.param import Param
+
+from include.iceberg_maintenance import MaintenanceConfig, maintain_table, spark_session
+
+MAINTENANCE_POOL = os.getenv("ICEBERG_MAINTENANCE_POOL", "iceberg_maintenance")
+DEFAULTS = MaintenanceConfig()
+
+
+def _tables() -> List[str]:
+    # include.iceberg_tables builds pyiceberg schemas on import; keep that out of DAG parsing.
+    from include.iceberg_tables import BRONZE_TABLE, SILVER_TABLE
+
+    configured = os.getenv("ICEBERG_MAINTENANCE_TABLES", f"{BRONZE_TABLE},{SILVER_TABLE}")
+    return [table.strip() for table in configured.split(",") if table.strip()]
+
+
+@dag(
+    dag_id="iceberg_table_maintenance",
+    schedule="0 4 * * *",
+    catchup=False,
+    max_active_runs=1,
+    start_date=datetime(2024, 1, 1),
+    default_args={"owner": "data-platform", "retries": 1, "retry_delay": timedelta(minutes=10)},
+    params={
+        "target_file_size_mb": Param(DEFAULTS.target_file_size_mb, type="integer", minimum=1),
+        "small_file_threshold_mb": Param(
+            DEFAULTS.small_file_threshold_mb,
+            type="integer",
+            minimum=1,
+            description="Files below this size are compaction candidates and counted as small",
+        ),
+        "min_input_files": Param(
+            DEFAULTS.min_input_files,
+            type="integer",
+            minimum=1,
+            description="Minimum small files in a partition before it is rewritten",
+        ),
+        "snapshot_retention_days": Param(DEFAULTS.snapshot_retention_days, type="integer", minimum=1),
+        "retain_last_snapshots": Param(DEFAULTS.retain_last_snapshots, type="integer", minimum=1),
+        "orphan_retention_days": Param(
+            DEFAULTS.orphan_retention_days,
+            type="integer",
+            minimum=1,
+            description="Only unreferenced files older than this are deleted, so in-flight writes are safe",
+        ),
+    },
+    tags=["iceberg", "maintenance"],
+)
+def iceberg_table_maintenance() -> None:
+    @task()
+    def list_tables() -> List[str]:
+        return _tables()
+
+    @task(pool=MAINTENANCE_POOL)
+    def maintain(table: str, **context) -> Dict[str, Any]:
+        config = MaintenanceConfig.from_params(context["params"])
+        spark = spark_session(f"iceberg-maintenance-{table}")
+        try:
+            report = maintain_table(spark, table, config, now=datetime.utcnow())
+        finally:
+            spark.stop()
+        before, after = report["before"], report["after"]
+        logging.info(
+            "%s: data files %s -> %s, bytes %s -> %s, manifests %s -> %s, snapshots %s -> %s",
+            table,
+            before["data_files"], after["data_files"],
+            before["data_bytes"], after["data_bytes"],
+            before["manifests"], after["manifests"],
+            before["snapshots"], after["snapshots"],
+        )
+        return report
+
+    @task()
+    def report(reports: List[Dict[str, Any]], **context) -> str:
+        data_root = os.environ.get("FEAST_REFERENCE_DATA_PATH", "/opt/airflow/storage/data/ml")
+        output_dir = os.path.join(data_root, "reports", "iceberg_maintenance")
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(output_dir, f"{context['ds_nodash']}_{context['run_id'].replace(':', '_')}.json")
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(list(reports), handle, indent=2)
+        logging.info("Iceberg maintenance report written to %s", path)
+        return path
+
+    report(maintain.expand(table=list_tables()))
+
+
+iceberg_table_maintenance()
@@ -1,27 +1,66 @@
 """Demo medallion DAG orchestrating Bronze -> Silver -> Gold pipeline."""
 from __future__ import annotations
 
-import io
 import json
 import logging
 import os
 import time
 from datetime import datetime, timedelta
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, Dict, List
 
-import boto3
-import pandas as pd
-import psycopg2
 import requests
 from requests import exceptions as requests_exceptions
-from include.transformations import bronze_frame_from_records, silver_frame
+from include.connections import boto_client, clickhouse_client, object_store_settings, postgres_conn_info
+from include.backfill import SILVER_INSERT_SQL, delete_silver_orders, silver_rows
+from include.bronze_objects import (
+    combine_latest,
+    list_objects,
+    object_size,
+    pending_objects,
+    read_manifest,
+    read_parquet_object,
+    read_watermark,
+    staged_key,
+    sync_started_at,
+    write_manifest,
+    write_parquet_object,
+    write_watermark,
+)
+from include.clickhouse_aggregates import months_for_orders, months_of, refresh_monthly_aggregates
+from include.gold_orders import ensure_partitions, publish_orders
+from include.pipeline_metrics import stage
+from include.task_profiling import profiled
 from airflow.decorators import dag, task
 from airflow.hooks.base import BaseHook
-from great_expectations.core.batch import RuntimeBatchRequest
-from great_expectations.data_context import get_context
-from clickhouse_driver import Client as ClickHouseClient
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# pandas, psycopg2, Great Expectations, pyiceberg and DuckDB (via include.iceberg_tables and
+# include.transformations) are imported inside the tasks so the scheduler parses this file
+# without loading them; tests/test_dag_imports.py enforces it.
 
 AIRBYTE_TIMEOUT = int(os.getenv("AIRBYTE_API_TIMEOUT", "600"))
+MEDALLION_POOL = os.getenv("MEDALLION_POOL", "medallion_transform")
+STAGING_PREFIX = os.getenv("MEDALLION_STAGING_PREFIX", "medallion/orders")
+MANIFEST_KEY = f"{STAGING_PREFIX}/_processed.json"
+# Start of the last sync whose objects all reached every sink; earlier objects are never listed as pending.
+WATERMARK_KEY = f"{STAGING_PREFIX}/_sync_watermark.json"
+# With the DuckDB engine, Great Expectations validates a reservoir sample instead of the whole object.
+DUCKDB_VALIDATION_SAMPLE_ROWS = int(os.getenv("MEDALLION_DUCKDB_VALIDATION_SAMPLE_ROWS", "10000"))
+
+
+def _bronze_bucket() -> str:
+    return os.getenv("CEPH_BUCKET_BRONZE", "bronze")
+
+
+def _silver_bucket() -> str:
+    return os.getenv("CEPH_BUCKET_SILVER", "silver")
+
+
+def _staged_frames(outputs: List[Dict[str, str]], layer: str) -> pd.DataFrame:
+    client = boto_client()
+    return combine_latest(read_parquet_object(client, _silver_bucket(), output[layer]) for output in outputs)
 
 
 def _airbyte_api_base() -> str:
@@ -57,65 +96,36 @@ def _airbyte_connection_id() -> str:
 
 
 
-def _boto_client() -> boto3.client:
-    conn = BaseHook.get_connection("object_store_default")
-    extra = conn.extra_dejson or {}
-    return boto3.client(
-        "s3",
-        endpoint_url=extra.get("endpoint_url", os.getenv("CEPH_RGW_ENDPOINT", "http://ceph:9000")),
-        aws_access_key_id=conn.login,
-        aws_secret_access_key=conn.password,
-        region_name=extra.get("region_name", os.getenv("CEPH_REGION", "us-east-1")),
-    )
-
-
-def _clickhouse_client() -> ClickHouseClient:
-    conn = BaseHook.get_connection("clickhouse_default")
-    return ClickHouseClient(
-        host=conn.host,
-        port=conn.port or 8123,
-        user=conn.login,
-        password=conn.password,
-        database=conn.schema or "analytics",
-        secure=conn.extra_dejson.get("secure", False) if conn.extra else False,
-    )
-
-
-def _postgres_conn_info() -> Dict[str, Any]:
-    conn = BaseHook.get_connection("postgres_curated")
-    return {
-        "dbname": conn.schema or "curated",
-        "user": conn.login,
-        "password": conn.password,
-        "host": conn.host,
-        "port": conn.port or 5432,
-    }
-
-
 def _ge_context():
+    from great_expectations.data_context import get_context
+
     return get_context(context_root_dir="/opt/great_expectations")
 
 
 def _run_checkpoint(suite_name: str, dataframe: pd.DataFrame, batch_id: str) -> None:
-    context = _ge_context()
-    batch_request = RuntimeBatchRequest(
-        datasource_name="runtime_pandas",
-        data_connector_name="runtime_data_connector",
-        data_asset_name="orders",
-        runtime_parameters={"batch_data": dataframe},
-        batch_identifiers={"batch_id": batch_id},
-    )
-    result = context.run_checkpoint(
-        checkpoint_name="orders_checkpoint",
-        validations=[
-            {
-                "batch_request": batch_request,
-                "expectation_suite_name": suite_name,
-            }
-        ],
-    )
-    if not result.success:
-        raise ValueError(f"Great Expectations checkpoint failed for {suite_name}")
+    from great_expectations.core.batch import RuntimeBatchRequest
+
+    with stage("ge_checkpoint", suite=suite_name) as metrics:
+        metrics.add_rows(len(dataframe))
+        context = _ge_context()
+        batch_request = RuntimeBatchRequest(
+            datasource_name="runtime_pandas",
+            data_connector_name="runtime_data_connector",
+            data_asset_name="orders",
+            runtime_parameters={"batch_data": dataframe},
+            batch_identifiers={"batch_id": batch_id},
+        )
+        result = context.run_checkpoint(
+            checkpoint_name="orders_checkpoint",
+            validations=[
+                {
+                    "batch_request": batch_request,
+                    "expectation_suite_name": suite_name,
+                }
+            ],
+        )
+        if not result.success:
+            raise ValueError(f"Great Expectations checkpoint failed for {suite_name}")
 
 
 @dag(
@@ -181,78 +191,143 @@ def medallion_batch_demo() -> None:
         return body
 
     @task()
-    def pull_bronze_objects(_: Dict[str, Any]) -> List[Dict[str, Any]]:
-        bucket = os.getenv("CEPH_BUCKET_BRONZE", "bronze")
+    def list_bronze_objects(_: Dict[str, Any]) -> List[Dict[str, Any]]:
         prefix = os.getenv("AIRBYTE_BRONZE_PREFIX", "airbyte")
-        client = _boto_client()
-        paginator = client.get_paginator("list_objects_v2")
-        latest = None
-        latest_obj = None
-        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
-            for obj in page.get("Contents", []):
-                if latest is None or obj["LastModified"] > latest:
-                    latest = obj["LastModified"]
-                    latest_obj = obj
-        if not latest_obj:
-            raise FileNotFoundError(f"No objects found in s3://{bucket}/{prefix}")
-        s3_obj = client.get_object(Bucket=bucket, Key=latest_obj["Key"])
-        raw_bytes = s3_obj["Body"].read()
-        df = pd.read_json(io.BytesIO(raw_bytes), lines=True)
-        bronze_df = bronze_frame_from_records(df)
-        _run_checkpoint("orders_bronze", bronze_df, batch_id="bronze")
-        return bronze_df.to_dict(orient="records")
+        client = boto_client()
+        listing = list_objects(client, _bronze_bucket(), prefix)
+        if not listing:
+            raise FileNotFoundError(f"No objects found in s3://{_bronze_bucket()}/{prefix}")
+        since = read_watermark(client, _silver_bucket(), WATERMARK_KEY)
+        pending = pending_objects(listing, read_manifest(client, _silver_bucket(), MANIFEST_KEY), since=since)
+        logging.info("%s of %s Bronze objects need processing (written since %s)", len(pending), len(listing), since)
+        return pending
+
+    @task(pool=MEDALLION_POOL)
+    @profiled
+    def bronze_to_silver(bronze_object: Dict[str, Any], **context) -> Dict[str, str]:
+        import pandas as pd
+        from include.transformations import (
+            bronze_frame_from_records,
+            duckdb_bronze_to_silver,
+            duckdb_connection,
+            read_bronze,
+            silver_frame,
+            transformation_engine,
+        )
+
+        key, etag = bronze_object["key"], bronze_object["etag"]
+        staged = {
+            "key": key,
+            "etag": etag,
+            "bronze": staged_key(STAGING_PREFIX, "bronze", key, etag),
+            "silver": staged_key(STAGING_PREFIX, "silver", key, etag),
+        }
+        # Every mapped task stamps the run's start, so one run is one ingestion batch.
+        ingested_at = pd.Timestamp(context["dag_run"].start_date)
+        engine = transformation_engine()
+        with stage("bronze_to_silver", engine=engine) as metrics:
+            if engine == "duckdb":
+                con = duckdb_connection(s3=object_store_settings())
+                bronze_uri = f"s3://{_silver_bucket()}/{staged['bronze']}"
+                silver_uri = f"s3://{_silver_bucket()}/{staged['silver']}"
+                source = f"s3://{_bronze_bucket()}/{key}"
+                rows = duckdb_bronze_to_silver(con, source, bronze_uri, silver_uri, ingested_at)
+                logging.info("DuckDB staged %s Bronze / %s Silver rows for %s", *rows, key)
+                for suite, uri in (("orders_bronze", bronze_uri), ("orders_silver", silver_uri)):
+                    sample = con.sql(
+                        f"SELECT * FROM read_parquet('{uri}') USING SAMPLE {DUCKDB_VALIDATION_SAMPLE_ROWS} ROWS"
+                    ).df()
+                    _run_checkpoint(suite, sample, batch_id=f"{suite.split('_')[1]}:{key}")
+                client = boto_client()
+                metrics.add_rows(rows[0])
+                metrics.add_bytes_read(bronze_object.get("size", 0))
+                for layer in ("bronze", "silver"):
+                    metrics.add_bytes_written(object_size(client, _silver_bucket(), staged[layer]))
+                return staged
+
+            client = boto_client()
+            raw_bytes = client.get_object(Bucket=_bronze_bucket(), Key=key)["Body"].read()
+            bronze_df = bronze_frame_from_records(read_bronze(raw_bytes))
+            _run_checkpoint("orders_bronze", bronze_df, batch_id=f"bronze:{key}")
+            silver_df = silver_frame(bronze_df, ingested_at=ingested_at)
+            _run_checkpoint("orders_silver", silver_df, batch_id=f"silver:{key}")
+            metrics.add_rows(len(bronze_df))
+            metrics.add_bytes_read(len(raw_bytes))
+            metrics.add_bytes_written(write_parquet_object(client, _silver_bucket(), staged["bronze"], bronze_df))
+            metrics.add_bytes_written(write_parquet_object(client, _silver_bucket(), staged["silver"], silver_df))
+            return staged
 
     @task()
-    def transform_to_silver(bronze_records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        df = silver_frame(bronze_records)
-        _run_checkpoint("orders_silver", df, batch_id="silver")
-        return df.to_dict(orient="records")
+    @profiled
+    def write_bronze_iceberg(outputs: List[Dict[str, str]], **context) -> int:
+        from include.iceberg_tables import catalog_from_env, ensure_bronze_table, replace_orders
+
+        with stage("iceberg_write", layer="bronze") as metrics:
+            table = ensure_bronze_table(catalog_from_env())
+            metrics.add_rows(replace_orders(table, _staged_frames(outputs, "bronze"), run_id=context["run_id"]))
+        return metrics.rows
 
     @task()
-    def load_silver_clickhouse(records: List[Dict[str, Any]]) -> str:
-        client = _clickhouse_client()
-        payload = [
-            (
-                rec.get("order_id"),
-                rec.get("order_date"),
-                rec.get("customer_id"),
-                rec.get("status"),
-                float(rec.get("sales_total", 0)),
-                rec.get("ingestion_date"),
-            )
-            for rec in records
-        ]
-        client.execute("TRUNCATE TABLE IF EXISTS analytics.orders_clean")
-        client.execute(
-            "INSERT INTO analytics.orders_clean (order_id, order_date, customer_id, status, sales_total, ingestion_date) VALUES",
-            payload,
-            types_check=True,
-        )
+    @profiled
+    def write_silver_iceberg(outputs: List[Dict[str, str]], **context) -> int:
+        from include.iceberg_tables import catalog_from_env, ensure_silver_table, replace_orders
+
+        with stage("iceberg_write", layer="silver") as metrics:
+            table = ensure_silver_table(catalog_from_env())
+            metrics.add_rows(replace_orders(table, _staged_frames(outputs, "silver"), run_id=context["run_id"]))
+        return metrics.rows
+
+    @task()
+    @profiled
+    def load_silver_clickhouse(outputs: List[Dict[str, str]]) -> str:
+        with stage("load_silver_clickhouse") as metrics:
+            payload = silver_rows(_staged_frames(outputs, "silver").to_dict(orient="records"))
+            client = clickhouse_client()
+            if payload:
+                order_ids = tuple(row[0] for row in payload)
+                # Replaced orders may move month, so collect the months they leave as well as enter.
+                months = months_for_orders(client, order_ids) | months_of(row[1] for row in payload)
+                # Only this run's orders are replaced, so Silver keeps rows from earlier objects.
+                delete_silver_orders(client, order_ids)
+                client.execute(SILVER_INSERT_SQL, payload, types_check=True)
+                refresh_monthly_aggregates(client, months)
+            metrics.add_rows(len(payload))
         return "analytics.orders_clean"
 
     @task()
+    def mark_processed(outputs: List[Dict[str, str]], airbyte_result: Dict[str, Any]) -> int:
+        client = boto_client()
+        processed = read_manifest(client, _silver_bucket(), MANIFEST_KEY)
+        processed.update({output["key"]: output["etag"] for output in outputs})
+        write_manifest(client, _silver_bucket(), MANIFEST_KEY, processed)
+        # Advanced only here, so objects of a sync whose run failed stay above the watermark.
+        since = sync_started_at(airbyte_result.get("job", {}))
+        if since is not None:
+            write_watermark(client, _silver_bucket(), WATERMARK_KEY, since)
+        return len(outputs)
+
+    @task()
+    @profiled
     def publish_gold(_: str) -> int:
-        client = _clickhouse_client()
-        rows = client.execute(
-            "SELECT order_id, order_date, customer_id, status, sales_total, ingestion_date FROM analytics.orders_clean"
-        )
-        if not rows:
-            logging.warning("No rows found in analytics.orders_clean")
-            return 0
-        connection = psycopg2.connect(**_postgres_conn_info())
-        cursor = connection.cursor()
-        upsert_sql = (
-            "INSERT INTO gold.orders_snapshot (order_id, order_date, customer_id, sales_total, status, ingested_at)"
-            " VALUES (%s, %s, %s, %s, %s, %s)"
-            " ON CONFLICT (order_id) DO UPDATE SET order_date = EXCLUDED.order_date,"
-            " customer_id = EXCLUDED.customer_id, sales_total = EXCLUDED.sales_total,"
-            " status = EXCLUDED.status, ingested_at = EXCLUDED.ingested_at"
-        )
-        cursor.executemany(upsert_sql, rows)
-        affected = cursor.rowcount
-        connection.commit()
-        cursor.close()
-        connection.close()
+        import psycopg2
+
+        with stage("publish_gold") as metrics:
+            client = clickhouse_client()
+            rows = client.execute(
+                "SELECT order_id, order_date, customer_id, status, sales_total, ingestion_date"
+                " FROM analytics.orders_clean"
+            )
+            if not rows:
+                logging.warning("No rows found in analytics.orders_clean")
+                return 0
+            connection = psycopg2.connect(**postgres_conn_info())
+            try:
+                ensure_partitions(connection, (row[1] for row in rows))
+                with connection, connection.cursor() as cursor:
+                    affected = publish_orders(cursor, rows)
+            finally:
+                connection.close()
+            metrics.add_rows(len(rows))
         return affected
 
     @task()
@@ -261,11 +336,13 @@ def medallion_batch_demo() -> None:
 
     job = trigger_airbyte_sync()
     airbyte_result = wait_for_airbyte(job)
-    bronze_records = pull_bronze_objects(airbyte_result)
-    silver_records = transform_to_silver(bronze_records)
-    silver_table = load_silver_clickhouse(silver_records)
+    staged = bronze_to_silver.expand(bronze_object=list_bronze_objects(airbyte_result))
+    iceberg_writes = [write_bronze_iceberg(staged), write_silver_iceberg(staged)]
+    silver_table = load_silver_clickhouse(staged)
     upsert_count = publish_gold(silver_table)
     notify_lineage(upsert_count)
+    # Objects are marked only after every sink has their rows, so a failed run retries them.
+    [*iceberg_writes, silver_table] >> mark_processed(staged, airbyte_result)
 
 
 medallion_batch_demo()
@@ -0,0 +1,89 @@
+"""Day planning and per-day overwrite statements for medallion backfills, plus per-order Silver deletes."""
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+MAX_BACKFILL_DAYS = 366
+# Bytes of order ids per statement; ClickHouse rejects queries over max_query_size (256 KiB by default).
+ORDER_ID_BATCH_BYTES = 64 * 1024
+
+SILVER_DELETE_DAY_SQL = (
+    "ALTER TABLE analytics.orders_clean DELETE"
+    " WHERE order_date >= toDateTime(%(day)s) AND order_date < toDateTime(%(day)s) + INTERVAL 1 DAY"
+)
+SILVER_DELETE_ORDERS_SQL = "ALTER TABLE analytics.orders_clean DELETE WHERE order_id IN %(order_ids)s"
+SILVER_INSERT_SQL = (
+    "INSERT INTO analytics.orders_clean (order_id, order_date, customer_id, status, sales_total, ingestion_date) VALUES"
+)
+GOLD_DELETE_DAY_SQL = (
+    "DELETE FROM gold.orders_snapshot"
+    " WHERE order_date >= %(day)s::date AND order_date < %(day)s::date + INTERVAL '1 day'"
+)
+
+
+def backfill_days(params: Dict[str, Any], logical_date: date) -> List[str]:
+    """Days to reprocess: the ``start_date``..``end_date`` params (inclusive) or the logical date."""
+    start: Optional[str] = params.get("start_date")
+    end: Optional[str] = params.get("end_date")
+    if not start and not end:
+        return [logical_date.isoformat()]
+    first = date.fromisoformat(start or end)
+    last = date.fromisoformat(end or start)
+    if last < first:
+        raise ValueError(f"end_date {last} is before start_date {first}")
+    span = (last - first).days + 1
+    if span > MAX_BACKFILL_DAYS:
+        raise ValueError(f"Backfill of {span} days exceeds the {MAX_BACKFILL_DAYS}-day limit; split the range")
+    return [(first + timedelta(days=offset)).isoformat() for offset in range(span)]
+
+
+def order_id_batches(order_ids: Iterable[str], max_bytes: int = ORDER_ID_BATCH_BYTES) -> Iterator[Tuple[str, ...]]:
+    """Split ``order_ids`` so each ``IN`` list stays under ``max_bytes`` of query text."""
+    batch: List[str] = []
+    size = 0
+    for order_id in order_ids:
+        # Quotes, comma and space around each literal.
+        length = len(str(order_id).encode("utf-8")) + 4
+        if batch and size + length > max_bytes:
+            yield tuple(batch)
+            batch, size = [], 0
+        batch.append(order_id)
+        size += length
+    if batch:
+        yield tuple(batch)
+
+
+def delete_silver_orders(client: Any, order_ids: Sequence[str]) -> None:
+    """Delete ``order_ids`` from ``analytics.orders_clean``, one synchronous mutation per id batch."""
+    for batch in order_id_batches(order_ids):
+        client.execute(SILVER_DELETE_ORDERS_SQL, {"order_ids": batch}, settings={"mutations_sync": 1})
+
+
+def silver_rows(records: List[Dict[str, Any]]) -> List[tuple]:
+    """Silver records shaped for ``analytics.orders_clean`` inserts."""
+    return [
+        (
+            rec.get("order_id"),
+            rec.get("order_date"),
+            rec.get("customer_id"),
+            rec.get("status"),
+            float(rec.get("sales_total", 0)),
+            rec.get("ingestion_date"),
+        )
+        for rec in records
+    ]
+
+
+def gold_rows(records: List[Dict[str, Any]]) -> List[tuple]:
+    return [
+        (
+            rec.get("order_id"),
+            rec.get("order_date"),
+            rec.get("customer_id"),
+            float(rec.get("sales_total", 0)),
+            rec.get("status"),
+            rec.get("ingestion_date"),
+        )
+        for rec in records
+    ]
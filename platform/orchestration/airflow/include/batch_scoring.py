@@ -0,0 +1,43 @@
+"""Helpers for nightly batch scoring of every customer in the feature store."""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def latest_features(frame: pd.DataFrame, feature_columns: Sequence[str]) -> pd.DataFrame:
+    """Keep the most recent feature row per ``customer_id``.
+
+    Like Feast, a later ``created_at`` wins between rows with the same ``event_timestamp``.
+    """
+    order = ["event_timestamp", "created_at"] if "created_at" in frame.columns else ["event_timestamp"]
+    columns = ["customer_id", *order, *feature_columns]
+    latest = frame[columns].copy()
+    for column in order:
+        latest[column] = pd.to_datetime(latest[column])
+    latest = latest.sort_values(order, kind="stable").drop_duplicates("customer_id", keep="last")
+    latest = latest.drop(columns=order[1:])
+    return latest.dropna(subset=list(feature_columns)).reset_index(drop=True)
+
+
+def partition_customers(frame: pd.DataFrame, partitions: int) -> List[pd.DataFrame]:
+    """Split customers into ``partitions`` stable, roughly equal buckets by hashed id."""
+    buckets = pd.util.hash_pandas_object(frame["customer_id"], index=False).to_numpy() % partitions
+    return [frame[buckets == bucket].reset_index(drop=True) for bucket in range(partitions)]
+
+
+def score_rows(
+    frame: pd.DataFrame, scorer, model_version: str, scored_at: datetime
+) -> List[Tuple[int, float, str, datetime]]:
+    """Score a partition and shape it as ``(customer_id, score, model_version, scored_at)`` rows."""
+    if frame.empty:
+        return []
+    scores = scorer.predict_proba(frame)
+    customer_ids = frame["customer_id"].to_numpy(dtype=np.int64)
+    return [
+        (int(customer_id), float(score), model_version, scored_at)
+        for customer_id, score in zip(customer_ids, scores)
+    ]
@@ -0,0 +1,62 @@
+"""Keep ``analytics.orders_customer_monthly_agg`` exact when Silver rows are deleted.
+
+The materialized view only sees inserts, so any writer that deletes from
+``analytics.orders_clean`` rebuilds the months it touched from Silver.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import Any, Iterable, List, Sequence, Set
+
+from include.backfill import order_id_batches
+
+AGG_TABLE = "analytics.orders_customer_monthly_agg"
+
+MONTHS_FOR_ORDERS_SQL = (
+    "SELECT DISTINCT toStartOfMonth(order_date) FROM analytics.orders_clean WHERE order_id IN %(order_ids)s"
+)
+DELETE_MONTHS_SQL = f"ALTER TABLE {AGG_TABLE} DELETE WHERE order_month IN %(months)s"
+REBUILD_MONTHS_SQL = (
+    f"INSERT INTO {AGG_TABLE}"
+    " (customer_id, order_month, order_count, gross_revenue, delivered_revenue, delivered_count,"
+    " first_order_at, last_order_at)"
+    " SELECT customer_id, toStartOfMonth(order_date) AS order_month,"
+    " countState(), sumState(sales_total), sumIfState(sales_total, status = 'delivered'),"
+    " countIfState(status = 'delivered'), minState(order_date), maxState(order_date)"
+    " FROM analytics.orders_clean"
+    " WHERE toStartOfMonth(order_date) IN %(months)s"
+    " GROUP BY customer_id, order_month"
+)
+
+
+def month_start(value: Any) -> date:
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.replace(day=1)
+
+
+def months_of(values: Iterable[Any]) -> Set[date]:
+    return {month_start(value) for value in values if value is not None}
+
+
+def months_for_orders(client: Any, order_ids: Sequence[str]) -> Set[date]:
+    """Months the given orders currently occupy in Silver (call before deleting them)."""
+    months: Set[date] = set()
+    for batch in order_id_batches(order_ids):
+        months |= months_of(row[0] for row in client.execute(MONTHS_FOR_ORDERS_SQL, {"order_ids": batch}))
+    return months
+
+
+def refresh_monthly_aggregates(client: Any, months: Iterable[date]) -> List[date]:
+    """Replace the aggregate rows of ``months`` with a recompute from ``analytics.orders_clean``.
+
+    Run after the Silver delete and insert. Rows the view added for those months
+    during the insert are dropped with the rest and rebuilt once.
+    """
+    months = sorted(set(months))
+    if not months:
+        return months
+    params = {"months": tuple(months)}
+    client.execute(DELETE_MONTHS_SQL, params, settings={"mutations_sync": 1})
+    client.execute(REBUILD_MONTHS_SQL, params)
+    return months
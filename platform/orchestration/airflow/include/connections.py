@@ -0,0 +1,59 @@
+"""Clients for the platform services, resolved from Airflow connections.
+
+Client libraries are imported when a client is built, not when a DAG file is parsed.
+"""
+from __future__ import annotations
+
+import os
+from typing import Any, Dict
+
+from airflow.hooks.base import BaseHook
+
+
+def object_store_settings() -> Dict[str, str]:
+    conn = BaseHook.get_connection("object_store_default")
+    extra = conn.extra_dejson or {}
+    return {
+        "endpoint": extra.get("endpoint_url", os.getenv("CEPH_RGW_ENDPOINT", "http://ceph:9000")),
+        "access_key": conn.login,
+        "secret_key": conn.password,
+        "region": extra.get("region_name", os.getenv("CEPH_REGION", "us-east-1")),
+    }
+
+
+def boto_client() -> Any:
+    import boto3
+
+    settings = object_store_settings()
+    return boto3.client(
+        "s3",
+        endpoint_url=settings["endpoint"],
+        aws_access_key_id=settings["access_key"],
+        aws_secret_access_key=settings["secret_key"],
+        region_name=settings["region"],
+    )
+
+
+def clickhouse_client() -> Any:
+    from clickhouse_driver import Client as ClickHouseClient
+
+    conn = BaseHook.get_connection("clickhouse_default")
+    return ClickHouseClient(
+        host=conn.host,
+        port=conn.port or 8123,
+        user=conn.login,
+        password=conn.password,
+        database=conn.schema or "analytics",
+        secure=conn.extra_dejson.get("secure", False) if conn.extra else False,
+    )
+
+
+def postgres_conn_info() -> Dict[str, Any]:
+    conn = BaseHook.get_connection("postgres_curated")
+    return {
+        "dbname": conn.schema or "curated",
+        "user": conn.login,
+        "password": conn.password,
+        "host": conn.host,
+        "port": conn.port or 5432,
+    }
@@ -0,0 +1,112 @@
+"""Incremental ``customer_features`` computation from ``gold.orders_snapshot``."""
+from __future__ import annotations
+
+import io
+from datetime import datetime
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+import pandas as pd
+
+from ml.features.customer_aggregates import FEATURE_COLUMNS, CustomerFeatureState
+
+# Inclusive on purpose: ``ingested_at`` is written per load, so rows sharing the watermark
+# timestamp may arrive after it was recorded. Replaying them is a no-op for the state.
+CHANGED_ORDERS_SQL = (
+    "SELECT order_id, customer_id, order_date, sales_total, ingested_at"
+    " FROM gold.orders_snapshot"
+    " WHERE %(watermark)s::timestamp IS NULL OR ingested_at >= %(watermark)s::timestamp"
+    " ORDER BY ingested_at"
+)
+OFFLINE_COLUMNS = ["customer_id", "event_timestamp", "created_at", *FEATURE_COLUMNS]
+
+
+def _version(ingested_at: Optional[datetime]) -> int:
+    if ingested_at is None:
+        return 0
+    return int((ingested_at - datetime(1970, 1, 1)).total_seconds() * 1_000_000)
+
+
+def _batches(rows: Iterable[Sequence[Any]], size: int) -> Iterator[List[Sequence[Any]]]:
+    batch: List[Sequence[Any]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_changed_orders(connection: Any, watermark: Optional[datetime], batch_size: int = 10_000) -> Iterator[Tuple]:
+    """Stream orders ingested since ``watermark`` through a server-side cursor."""
+    with connection.cursor(name="customer_features_changes") as cursor:
+        cursor.itersize = batch_size
+        cursor.execute(CHANGED_ORDERS_SQL, {"watermark": watermark})
+        yield from cursor
+
+
+def apply_changes(
+    state: CustomerFeatureState,
+    rows: Iterable[Sequence[Any]],
+    watermark: Optional[datetime],
+    batch_size: int = 10_000,
+) -> Tuple[Set[Any], Optional[datetime], int]:
+    """Fold ``(order_id, customer_id, order_date, sales_total, ingested_at)`` rows into the state.
+
+    Stored contributions and customers are prefetched once per ``batch_size`` rows.
+    Returns the touched customers, the advanced watermark and the number of rows read.
+    """
+    touched: Set[Any] = set()
+    count = 0
+    for batch in _batches(rows, batch_size):
+        state.prefetch([str(row[0]) for row in batch], [row[1] for row in batch])
+        for order_id, customer_id, order_date, sales_total, ingested_at in batch:
+            count += 1
+            day = order_date.date() if isinstance(order_date, datetime) else order_date
+            amount = float(sales_total) if sales_total is not None else 0.0
+            touched |= state.apply(str(order_id), customer_id, day, amount, _version(ingested_at))
+            if ingested_at is not None and (watermark is None or ingested_at > watermark):
+                watermark = ingested_at
+    return touched, watermark, count
+
+
+def feature_frame(
+    state: CustomerFeatureState, customers: Iterable[Any], as_of: datetime, created_at: datetime
+) -> pd.DataFrame:
+    """Feature rows for ``customers`` stamped for point-in-time joins at ``as_of``."""
+    rows = [state.features(customer_id, as_of.date()) for customer_id in sorted(customers, key=str)]
+    frame = pd.DataFrame(rows, columns=["customer_id", *FEATURE_COLUMNS])
+    frame.insert(1, "event_timestamp", as_of)
+    frame.insert(2, "created_at", created_at)
+    return frame
+
+
+def offline_object_key(prefix: str, as_of: datetime, created_at: datetime) -> str:
+    """One object per run under the offline source prefix, partitioned by feature date."""
+    return f"{prefix.strip('/')}/as_of={as_of:%Y-%m-%d}/part-{created_at:%Y%m%dT%H%M%S%f}.csv"
+
+
+def write_offline_rows(
+    client: Any, bucket: str, prefix: str, frame: pd.DataFrame, as_of: datetime, created_at: datetime
+) -> str:
+    """Upload ``frame`` as a new object next to the existing ones, which are never rewritten."""
+    key = offline_object_key(prefix, as_of, created_at)
+    buffer = io.StringIO()
+    frame.to_csv(buffer, index=False, date_format="%Y-%m-%dT%H:%M:%S")
+    client.put_object(Bucket=bucket, Key=key, Body=buffer.getvalue().encode("utf-8"))
+    return key
+
+
+def read_offline_rows(client: Any, bucket: str, prefix: str, columns: Sequence[str]) -> pd.DataFrame:
+    """``columns`` of every CSV object under the offline source ``prefix``: the seed and each run's rows."""
+    paginator = client.get_paginator("list_objects_v2")
+    frames = []
+    for page in paginator.paginate(Bucket=bucket, Prefix=f"{prefix.strip('/')}/"):
+        for obj in page.get("Contents", []):
+            if not obj["Key"].endswith(".csv"):
+                continue
+            body = client.get_object(Bucket=bucket, Key=obj["Key"])["Body"].read()
+            frames.append(pd.read_csv(io.BytesIO(body), usecols=list(columns)))
+    if not frames:
+        return pd.DataFrame(columns=list(columns))
+    return pd.concat(frames, ignore_index=True)
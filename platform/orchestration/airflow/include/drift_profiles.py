@@ -0,0 +1,162 @@
+"""Reference distribution profiles and windowed drift checks for the churn features."""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, Sequence
+
+import numpy as np
+import pandas as pd
+
+MODEL_FEATURES = [
+    "total_transactions",
+    "total_spend",
+    "avg_transaction_value",
+    "spend_last_30d",
+]
+PROFILE_VERSION = 1
+QUANTILE_PROBS = np.linspace(0.0, 1.0, 101)
+HISTOGRAM_BINS = 10
+PSI_THRESHOLD = 0.2
+_EPSILON = 1e-6
+
+
+def dataset_fingerprint(path: str, columns: Sequence[str]) -> str:
+    """Identify a reference dataset by location, size, mtime and projected columns."""
+    stat = os.stat(path)
+    key = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}|{','.join(columns)}|v{PROFILE_VERSION}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def read_columns(path: str, columns: Sequence[str]) -> pd.DataFrame:
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path, columns=list(columns))
+    return pd.read_csv(path, usecols=list(columns))
+
+
+def read_window(
+    path: str,
+    columns: Sequence[str],
+    start: datetime,
+    end: datetime,
+    timestamp_column: str = "event_timestamp",
+    chunksize: int = 250_000,
+) -> pd.DataFrame:
+    """Load rows with ``start <= timestamp < end``, projected to ``columns``."""
+    wanted = list(dict.fromkeys([*columns, timestamp_column]))
+    if path.endswith(".parquet"):
+        frame = pd.read_parquet(
+            path, columns=wanted, filters=[(timestamp_column, ">=", start), (timestamp_column, "<", end)]
+        )
+        return frame[list(columns)].reset_index(drop=True)
+    chunks = []
+    for chunk in pd.read_csv(path, usecols=wanted, chunksize=chunksize):
+        stamps = pd.to_datetime(chunk[timestamp_column])
+        chunks.append(chunk.loc[(stamps >= start) & (stamps < end), list(columns)])
+    if not chunks:
+        return pd.DataFrame(columns=list(columns))
+    return pd.concat(chunks, ignore_index=True)
+
+
+def build_reference_profile(frame: pd.DataFrame, columns: Sequence[str]) -> Dict[str, Any]:
+    """Summarise each column once: quantile sketch + histogram for numbers, counts for categories."""
+    profile: Dict[str, Any] = {"version": PROFILE_VERSION, "rows": int(len(frame)), "columns": {}}
+    for name in columns:
+        series = frame[name].dropna()
+        if pd.api.types.is_numeric_dtype(series):
+            values = series.to_numpy(dtype=np.float64)
+            quantiles = np.quantile(values, QUANTILE_PROBS)
+            edges = np.unique(np.quantile(values, np.linspace(0.0, 1.0, HISTOGRAM_BINS + 1))[1:-1])
+            counts = np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1)
+            profile["columns"][name] = {
+                "kind": "numeric",
+                "count": int(len(values)),
+                "mean": float(values.mean()) if len(values) else None,
+                "std": float(values.std()) if len(values) else None,
+                "quantiles": quantiles.tolist(),
+                "bin_edges": edges.tolist(),
+                "bin_counts": counts.tolist(),
+            }
+        else:
+            counts = series.astype(str).value_counts()
+            profile["columns"][name] = {
+                "kind": "categorical",
+                "count": int(len(series)),
+                "category_counts": {str(key): int(value) for key, value in counts.items()},
+            }
+    return profile
+
+
+def load_or_build_profile(reference_path: str, cache_dir: str, columns: Sequence[str]) -> Dict[str, Any]:
+    """Return the cached profile for ``reference_path``, building it on first use."""
+    fingerprint = dataset_fingerprint(reference_path, columns)
+    cache_path = os.path.join(cache_dir, f"reference_profile_{fingerprint}.json")
+    if os.path.exists(cache_path):
+        with open(cache_path, "r", encoding="utf-8") as handle:
+            return json.load(handle)
+    profile = build_reference_profile(read_columns(reference_path, columns), columns)
+    profile["source"] = reference_path
+    profile["fingerprint"] = fingerprint
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{cache_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump(profile, handle)
+    os.replace(tmp_path, cache_path)
+    return profile
+
+
+def _psi(expected: np.ndarray, actual: np.ndarray) -> float:
+    expected = np.clip(expected / max(expected.sum(), 1), _EPSILON, None)
+    actual = np.clip(actual / max(actual.sum(), 1), _EPSILON, None)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def _ks_against_sketch(quantiles: Sequence[float], values: np.ndarray) -> float:
+    ordered = np.sort(values)
+    reference_cdf = np.interp(ordered, quantiles, QUANTILE_PROBS)
+    n = len(ordered)
+    upper = np.arange(1, n + 1) / n
+    lower = np.arange(0, n) / n
+    return float(max(np.max(np.abs(upper - reference_cdf)), np.max(np.abs(lower - reference_cdf))))
+
+
+def compare_to_profile(
+    profile: Dict[str, Any], current: pd.DataFrame, psi_threshold: float = PSI_THRESHOLD
+) -> Dict[str, Any]:
+    """Score drift of a current window against a cached reference profile."""
+    results: Dict[str, Any] = {}
+    for name, reference in profile["columns"].items():
+        series = current[name].dropna()
+        if series.empty:
+            results[name] = {"count": 0, "psi": None, "drifted": False}
+            continue
+        if reference["kind"] == "numeric":
+            values = series.to_numpy(dtype=np.float64)
+            edges = np.asarray(reference["bin_edges"])
+            actual = np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1)
+            psi = _psi(np.asarray(reference["bin_counts"], dtype=np.float64), actual.astype(np.float64))
+            results[name] = {
+                "count": int(len(values)),
+                "mean": float(values.mean()),
+                "psi": psi,
+                "ks": _ks_against_sketch(reference["quantiles"], values),
+                "drifted": psi > psi_threshold,
+            }
+        else:
+            categories = list(reference["category_counts"])
+            counts = series.astype(str).value_counts()
+            expected = np.array([reference["category_counts"][key] for key in categories] + [0], dtype=np.float64)
+            unseen = int(counts[~counts.index.isin(categories)].sum())
+            actual = np.array([counts.get(key, 0) for key in categories] + [unseen], dtype=np.float64)
+            psi = _psi(expected, actual)
+            results[name] = {"count": int(len(series)), "psi": psi, "drifted": psi > psi_threshold}
+
+    drifted = [name for name, result in results.items() if result["drifted"]]
+    return {
+        "columns": results,
+        "drifted_columns": drifted,
+        "share_drifted": len(drifted) / len(results) if results else 0.0,
+        "dataset_drift": len(drifted) * 2 > len(results),
+    }
@@ -0,0 +1,119 @@
+"""Per-stage throughput metrics for the pipeline tasks, sent to the StatsD exporter.
+
+Tasks wrap their work in :func:`stage` and report the rows and bytes they moved.
+When the block ends, one UDP datagram is sent in DogStatsD format. The
+``statsd-exporter`` service turns it into Prometheus series that are labelled by
+``stage``:
+
+- ``oner_pipeline_rows_total`` and ``oner_pipeline_bytes_total`` (``direction`` read/written)
+- ``oner_pipeline_stage_duration_seconds`` histogram
+- ``oner_pipeline_stage_runs_total`` (``status`` ok/failed)
+
+Metrics are best effort. If the exporter is missing or unreachable, the datagram
+is dropped and the task carries on.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+PREFIX = "oner_pipeline"
+_KINDS = {"counter": "c", "gauge": "g", "timer": "ms"}
+
+logger = logging.getLogger(__name__)
+
+
+def _target() -> Optional[Tuple[str, int]]:
+    host = os.getenv("PIPELINE_METRICS_HOST", "statsd-exporter")
+    if not host:
+        return None
+    return host, int(os.getenv("PIPELINE_METRICS_PORT", "9125"))
+
+
+def format_metric(name: str, value: float, kind: str, tags: Dict[str, str]) -> str:
+    """One DogStatsD line, e.g. ``oner_pipeline_rows_total:120|c|#stage:publish_gold``."""
+    line = f"{PREFIX}_{name}:{value:g}|{_KINDS[kind]}"
+    if tags:
+        line += "|#" + ",".join(f"{key}:{str(tag).replace(',', '_')}" for key, tag in sorted(tags.items()))
+    return line
+
+
+def send(lines: List[str]) -> None:
+    """Send the lines as one datagram, dropping it (with a debug log) on any socket error."""
+    target = _target()
+    if not lines or target is None:
+        return
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.sendto("\n".join(lines).encode("utf-8"), target)
+    except OSError as exc:
+        logger.debug("Dropping %s pipeline metrics for %s:%s: %s", len(lines), *target, exc)
+
+
+@dataclass
+class StageMetrics:
+    stage: str
+    tags: Dict[str, str] = field(default_factory=dict)
+    rows: int = 0
+    bytes_read: int = 0
+    bytes_written: int = 0
+    gauges: Dict[str, float] = field(default_factory=dict)
+
+    def add_rows(self, count: int) -> None:
+        self.rows += int(count)
+
+    def add_bytes_read(self, count: int) -> None:
+        self.bytes_read += int(count)
+
+    def add_bytes_written(self, count: int) -> None:
+        self.bytes_written += int(count)
+
+    def gauge(self, name: str, value: float) -> None:
+        self.gauges[name] = float(value)
+
+    def lines(self, seconds: float, status: str) -> List[str]:
+        tags = {"stage": self.stage, **self.tags}
+        lines = [
+            format_metric("stage_duration_seconds", round(seconds * 1000, 3), "timer", tags),
+            format_metric("stage_runs_total", 1, "counter", {**tags, "status": status}),
+        ]
+        if self.rows:
+            lines.append(format_metric("rows_total", self.rows, "counter", tags))
+        if self.bytes_read:
+            lines.append(format_metric("bytes_total", self.bytes_read, "counter", {**tags, "direction": "read"}))
+        if self.bytes_written:
+            lines.append(format_metric("bytes_total", self.bytes_written, "counter", {**tags, "direction": "written"}))
+        lines.extend(format_metric(name, value, "gauge", tags) for name, value in sorted(self.gauges.items()))
+        return lines
+
+
+def record_stage(name: str, seconds: float, rows: int = 0, status: str = "ok", **gauges: float) -> None:
+    """Emit a stage that was timed elsewhere, e.g. a training trial reported through a callback."""
+    metrics = StageMetrics(name, rows=int(rows))
+    for gauge, value in gauges.items():
+        metrics.gauge(gauge, value)
+    send(metrics.lines(seconds, status))
+
+
+@contextmanager
+def stage(name: str, **tags: str) -> Iterator[StageMetrics]:
+    """Time the block and emit its row/byte counts; failures are counted and re-raised.
+
+    Keep ``tags`` low-cardinality (suite names, engines), never object keys or run ids.
+    """
+    metrics = StageMetrics(name, {key: str(value) for key, value in tags.items()})
+    started = time.perf_counter()
+    status = "failed"
+    try:
+        yield metrics
+        status = "ok"
+    finally:
+        seconds = time.perf_counter() - started
+        send(metrics.lines(seconds, status))
+        if status == "ok" and metrics.rows and seconds > 0:
+            logger.info("%s: %s rows in %.2fs (%.0f rows/s)", name, metrics.rows, seconds, metrics.rows / seconds)
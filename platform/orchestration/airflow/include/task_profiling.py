@@ -0,0 +1,202 @@
+"""Opt-in CPU and memory profiling of Airflow tasks, with artifacts uploaded to Ceph.
+
+Decorate a TaskFlow callable with :func:`profiled` (below ``@task``). Profiling only
+runs when the ``task_profiling`` Variable lists the DAG or the task. The Variable is a
+JSON list of ``"dag_id"``, ``"dag_id.task_id"`` or ``"*"``; for example,
+``["medallion_batch_demo.publish_gold"]``. Profiled tries record:
+
+- call stacks: with pyinstrument (``profile.speedscope.json`` for speedscope.app, plus
+  ``profile.html``), or with cProfile when pyinstrument is not installed
+  (``profile.pstats`` and a ``profile.txt`` summary);
+- tracemalloc peak/current memory and the top allocation sites (``memory.json``).
+
+Artifacts go to ``s3://$TASK_PROFILING_BUCKET/$TASK_PROFILING_PREFIX/<dag>/<task>/<run>/<try>/``
+and their links are written to the task log. Profiles are also uploaded when the task
+fails. Failing to upload only logs a warning.
+"""
+from __future__ import annotations
+
+import cProfile
+import functools
+import io
+import json
+import logging
+import marshal
+import os
+import pstats
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterable, Optional
+
+VARIABLE = "task_profiling"
+TOP_ALLOCATIONS = 25
+TRACEMALLOC_FRAMES = int(os.getenv("TASK_PROFILING_TRACEMALLOC_FRAMES", "10"))
+CONTENT_TYPES = {
+    ".json": "application/json",
+    ".html": "text/html",
+    ".txt": "text/plain",
+    ".pstats": "application/octet-stream",
+}
+
+logger = logging.getLogger(__name__)
+
+
+def profiling_enabled(targets: Optional[Iterable[str]], dag_id: str, task_id: str) -> bool:
+    """Whether ``targets`` (the Variable's list) selects this task."""
+    selected = {str(target).strip() for target in targets or ()}
+    return bool(selected & {"*", dag_id, f"{dag_id}.{task_id}"})
+
+
+def _configured_targets() -> Iterable[str]:
+    from airflow.models import Variable
+
+    targets = Variable.get(VARIABLE, default_var=[], deserialize_json=True)
+    return [targets] if isinstance(targets, str) else targets
+
+
+def allocation_report(
+    snapshot: tracemalloc.Snapshot, peak: int, current: int, top: int = TOP_ALLOCATIONS
+) -> Dict[str, Any]:
+    """Peak/current traced memory and the ``top`` allocation sites by size."""
+    statistics = snapshot.statistics("lineno")
+    return {
+        "peak_bytes": peak,
+        "current_bytes": current,
+        "top_allocations": [
+            {
+                "file": stat.traceback[0].filename,
+                "line": stat.traceback[0].lineno,
+                "size_bytes": stat.size,
+                "count": stat.count,
+            }
+            for stat in statistics[:top]
+        ],
+    }
+
+
+class TaskProfile:
+    """Record call stacks and allocations for the duration of a ``with`` block."""
+
+    def __init__(self, engine: Optional[str] = None) -> None:
+        self.engine = engine or os.getenv("TASK_PROFILING_ENGINE") or _default_engine()
+        self.artifacts: Dict[str, bytes] = {}
+        self.seconds = 0.0
+        self._profiler: Any = None
+        self._started = 0.0
+
+    def __enter__(self) -> "TaskProfile":
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+        self._started = time.perf_counter()
+        if self.engine == "pyinstrument":
+            from pyinstrument import Profiler
+
+            self._profiler = Profiler(async_mode="disabled")
+            self._profiler.start()
+        else:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        if self.engine == "pyinstrument":
+            self._profiler.stop()
+        else:
+            self._profiler.disable()
+        self.seconds = time.perf_counter() - self._started
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        memory = allocation_report(snapshot, peak, current)
+        memory["wall_seconds"] = round(self.seconds, 3)
+        self.artifacts["memory.json"] = json.dumps(memory, indent=2).encode("utf-8")
+        try:
+            self.artifacts.update(self._stack_artifacts())
+        except Exception as exc:  # pylint: disable=broad-except
+            # A rendering problem must not turn into a task failure.
+            logger.warning("Could not render %s call stacks: %s", self.engine, exc)
+
+    def _stack_artifacts(self) -> Dict[str, bytes]:
+        if self.engine == "pyinstrument":
+            from pyinstrument.renderers import SpeedscopeRenderer
+
+            return {
+                "profile.speedscope.json": self._profiler.output(SpeedscopeRenderer()).encode("utf-8"),
+                "profile.html": self._profiler.output_html().encode("utf-8"),
+            }
+        summary = io.StringIO()
+        stats = pstats.Stats(self._profiler, stream=summary)
+        stats.sort_stats("cumulative").print_stats(50)
+        # Same payload as Stats.dump_stats, which only writes to a path; opens with snakeviz or pstats.
+        return {"profile.pstats": marshal.dumps(stats.stats), "profile.txt": summary.getvalue().encode("utf-8")}
+
+
+def _default_engine() -> str:
+    try:
+        import pyinstrument  # noqa: F401
+    except ImportError:
+        return "cprofile"
+    return "pyinstrument"
+
+
+def artifact_prefix(dag_id: str, task_id: str, run_id: str, map_index: int, try_number: int) -> str:
+    base = os.getenv("TASK_PROFILING_PREFIX", "profiles").strip("/")
+    attempt = f"try{try_number}" if map_index < 0 else f"map{map_index}-try{try_number}"
+    return f"{base}/{dag_id}/{task_id}/{run_id.replace(':', '_')}/{attempt}"
+
+
+def upload_artifacts(client: Any, bucket: str, prefix: str, artifacts: Dict[str, bytes]) -> Dict[str, str]:
+    """Upload every artifact and return ``name -> link`` (presigned when the client supports it)."""
+    links = {}
+    for name, body in artifacts.items():
+        key = f"{prefix}/{name}"
+        content_type = CONTENT_TYPES.get(os.path.splitext(name)[1], "application/octet-stream")
+        client.put_object(Bucket=bucket, Key=key, Body=body, ContentType=content_type)
+        try:
+            links[name] = client.generate_presigned_url(
+                "get_object", Params={"Bucket": bucket, "Key": key}, ExpiresIn=7 * 24 * 3600
+            )
+        except Exception:  # pylint: disable=broad-except
+            links[name] = f"s3://{bucket}/{key}"
+    return links
+
+
+def _publish(profile: TaskProfile, context: Dict[str, Any]) -> None:
+    from include.connections import boto_client
+
+    ti = context["ti"]
+    bucket = os.getenv("TASK_PROFILING_BUCKET", os.getenv("CEPH_BUCKET_SILVER", "silver"))
+    prefix = artifact_prefix(ti.dag_id, ti.task_id, context["run_id"], ti.map_index, ti.try_number)
+    try:
+        links = upload_artifacts(boto_client(), bucket, prefix, profile.artifacts)
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.warning("Could not upload task profile to s3://%s/%s: %s", bucket, prefix, exc)
+        return
+    logger.info("Task profile (%s, %.1fs) uploaded to s3://%s/%s/", profile.engine, profile.seconds, bucket, prefix)
+    for name, link in links.items():
+        logger.info("  %s: %s", name, link)
+
+
+def profiled(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Profile the callable when the ``task_profiling`` Variable selects its task."""
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        from airflow.operators.python import get_current_context
+
+        context = get_current_context()
+        ti = context["ti"]
+        try:
+            enabled = profiling_enabled(_configured_targets(), ti.dag_id, ti.task_id)
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning("Ignoring unreadable %s Variable: %s", VARIABLE, exc)
+            enabled = False
+        if not enabled:
+            return func(*args, **kwargs)
+        profile = TaskProfile()
+        try:
+            with profile:
+                return func(*args, **kwargs)
+        finally:
+            _publish(profile, context)
+
+    return wrapper
@@ -1,28 +1,204 @@
-"""Data transformation helpers for the medallion demo."""
+"""Data transformation helpers for the medallion demo.
+
+Frames use pyarrow-backed strings and a fixed ``status`` categorical so Silver
+batches stay close to their Parquet size in memory. For objects larger than a
+worker's RAM the same Bronze -> Silver logic is available as DuckDB SQL that
+streams files to files and spills to local scratch.
+
+Bronze objects may be JSONL (plain, GZIP or ZSTD) or Parquet, depending on the
+Airbyte destination profile. Both readers detect the format and keep only
+``BRONZE_COLUMNS``.
+"""
 from __future__ import annotations
 
-from typing import Dict, List
+import io
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from urllib.parse import urlparse
 
 import pandas as pd
 
+ENGINES = ("pandas", "duckdb")
+BRONZE_COLUMNS = ["order_id", "order_date", "customer_id", "status", "sales_total"]
+_FORMAT_MAGIC = {
+    b"PAR1": ("parquet", None),
+    b"\x1f\x8b": ("jsonl", "gzip"),
+    b"\x28\xb5\x2f\xfd": ("jsonl", "zstd"),
+}
+_FORMAT_SUFFIXES = {
+    ".parquet": ("parquet", None),
+    ".gz": ("jsonl", "gzip"),
+    ".zst": ("jsonl", "zstd"),
+}
+STRING_DTYPE = "string[pyarrow]"
+STRING_COLUMNS = ["order_id", "customer_id", "status"]
+SILVER_STATUSES = ["delivered", "processing", "shipped"]
+# A fixed category set keeps the dtype identical across batches, so concatenating
+# per-object Silver frames does not fall back to object strings.
+SILVER_STATUS_DTYPE = pd.CategoricalDtype(SILVER_STATUSES)
+
+
+def _compact_strings(df: pd.DataFrame) -> pd.DataFrame:
+    for column in STRING_COLUMNS:
+        if column in df.columns and df[column].dtype != STRING_DTYPE:
+            df[column] = df[column].astype(STRING_DTYPE)
+    return df
+
+
+def transformation_engine() -> str:
+    engine = os.getenv("MEDALLION_TRANSFORM_ENGINE", "pandas").lower()
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown MEDALLION_TRANSFORM_ENGINE '{engine}'; expected one of {ENGINES}")
+    return engine
+
+
+def bronze_format(head: bytes = b"", key: str = "") -> Tuple[str, Optional[str]]:
+    """``(format, compression)`` of a Bronze object from its leading bytes, else its key suffix."""
+    for magic, detected in _FORMAT_MAGIC.items():
+        if head.startswith(magic):
+            return detected
+    for suffix, detected in _FORMAT_SUFFIXES.items():
+        if key.lower().endswith(suffix):
+            return detected
+    return "jsonl", None
+
+
+def read_bronze(source: Union[str, bytes], columns: Sequence[str] = BRONZE_COLUMNS) -> pd.DataFrame:
+    """Read a Bronze object (path or raw bytes) in any Airbyte output profile, keeping only ``columns``.
+
+    Parquet is read column-projected. JSONL still has to be parsed whole, but the
+    Airbyte envelope and extra fields are dropped before the frame is returned.
+    """
+    if isinstance(source, bytes):
+        head, handle = source[:4], io.BytesIO(source)
+    else:
+        with open(source, "rb") as probe:
+            head = probe.read(4)
+        handle = source
+    fmt, compression = bronze_format(head, source if isinstance(source, str) else "")
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(handle)
+        present = set(parquet.schema_arrow.names)
+        return parquet.read(columns=[column for column in columns if column in present]).to_pandas()
+    # dtype=False keeps JSON strings as strings (ids such as "00123" stay intact).
+    records = pd.read_json(handle, lines=True, dtype=False, compression=compression)
+    if "_airbyte_data" in records.columns:
+        records = pd.DataFrame(records["_airbyte_data"].tolist(), index=records.index)
+    return records[[column for column in columns if column in records.columns]]
+
 
 def bronze_frame_from_records(records: pd.DataFrame) -> pd.DataFrame:
     """Normalize Airbyte JSONL payload into a typed Bronze DataFrame."""
     df = records.copy()
     if "_airbyte_data" in df.columns:
-        df = df["_airbyte_data"].apply(pd.Series)
+        df = pd.DataFrame(df["_airbyte_data"].tolist(), index=df.index)
     df["order_date"] = pd.to_datetime(df["order_date"])
     df["sales_total"] = df["sales_total"].astype(float)
-    return df
+    return _compact_strings(df)
+
 
+def silver_frame(
+    bronze: Union[pd.DataFrame, List[Dict[str, object]]], ingested_at: Optional[pd.Timestamp] = None
+) -> pd.DataFrame:
+    """Filter and enrich Bronze records for the Silver layer.
 
-def silver_frame(bronze_records: List[Dict[str, object]]) -> pd.DataFrame:
-    """Filter and enrich Bronze records for the Silver layer."""
-    df = pd.DataFrame(bronze_records)
+    ``ingested_at`` stamps the whole batch (defaults to now, UTC); callers that split
+    one run across several tasks pass a shared value.
+    """
+    df = bronze.copy() if isinstance(bronze, pd.DataFrame) else pd.DataFrame(bronze)
     if df.empty:
         return df
+    df = _compact_strings(df)
+    df = df[df["status"].isin(SILVER_STATUSES)].copy()
     df["order_date"] = pd.to_datetime(df["order_date"])
-    df = df[df["status"].isin(["shipped", "delivered", "processing"])]
+    df["status"] = df["status"].astype(SILVER_STATUS_DTYPE)
     df["sales_total"] = df["sales_total"].astype(float)
-    df["ingestion_date"] = pd.Timestamp.utcnow()
+    df["ingestion_date"] = ingested_at if ingested_at is not None else pd.Timestamp.now(tz="UTC")
     return df.reset_index(drop=True)
+
+
+def _silver_sql(relation: str, ingested_at: pd.Timestamp) -> str:
+    statuses = ", ".join(f"'{status}'" for status in SILVER_STATUSES)
+    return (
+        f"SELECT *, TIMESTAMPTZ '{ingested_at.isoformat()}' AS ingestion_date"
+        f" FROM {relation} WHERE status IN ({statuses})"
+    )
+
+
+def _bronze_sql(source: str, con: Any) -> str:
+    fmt, compression = bronze_format(key=source)
+    if fmt == "parquet":
+        relation = f"read_parquet('{source}')"
+    else:
+        raw = f"read_json_auto('{source}', format = 'newline_delimited', compression = '{compression or 'auto_detect'}')"
+        columns = [row[0] for row in con.execute(f"DESCRIBE SELECT * FROM {raw}").fetchall()]
+        relation = f"(SELECT _airbyte_data.* FROM {raw})" if "_airbyte_data" in columns else raw
+    return (
+        "SELECT"
+        " CAST(order_id AS VARCHAR) AS order_id,"
+        " CAST(order_date AS TIMESTAMP) AS order_date,"
+        " CAST(customer_id AS VARCHAR) AS customer_id,"
+        " CAST(status AS VARCHAR) AS status,"
+        " CAST(sales_total AS DOUBLE) AS sales_total"
+        f" FROM {relation}"
+    )
+
+
+def duckdb_connection(
+    memory_limit: Optional[str] = None,
+    temp_directory: Optional[str] = None,
+    threads: Optional[int] = None,
+    s3: Optional[Dict[str, str]] = None,
+):
+    """DuckDB connection that spills to ``temp_directory`` and optionally reads/writes Ceph via httpfs."""
+    import duckdb
+
+    con = duckdb.connect()
+    con.execute(f"SET memory_limit = '{memory_limit or os.getenv('MEDALLION_DUCKDB_MEMORY_LIMIT', '2GB')}'")
+    con.execute(f"SET temp_directory = '{temp_directory or os.getenv('MEDALLION_DUCKDB_TEMP_DIR', '/tmp/duckdb')}'")
+    if threads:
+        con.execute(f"SET threads = {int(threads)}")
+    if s3:
+        endpoint = urlparse(s3["endpoint"])
+        con.execute("INSTALL httpfs")
+        con.execute("LOAD httpfs")
+        con.execute(
+            "CREATE OR REPLACE SECRET ceph (TYPE S3, KEY_ID ?, SECRET ?, REGION ?, ENDPOINT ?, URL_STYLE 'path', USE_SSL ?)",
+            [s3["access_key"], s3["secret_key"], s3.get("region", "us-east-1"), endpoint.netloc, endpoint.scheme == "https"],
+        )
+    return con
+
+
+def duckdb_bronze_to_silver(
+    con: Any, source: str, bronze_target: str, silver_target: str, ingested_at: pd.Timestamp
+) -> Tuple[int, int]:
+    """Normalize a JSONL object into Bronze Parquet, then filter it into Silver Parquet.
+
+    Both steps are ``COPY`` statements, so rows stream from file to file instead of
+    being materialised in Python. Silver reads the Bronze Parquet just written
+    rather than parsing the JSON twice. Returns ``(bronze_rows, silver_rows)``.
+    """
+    options = "(FORMAT parquet, COMPRESSION zstd)"
+    bronze_rows = con.execute(f"COPY ({_bronze_sql(source, con)}) TO '{bronze_target}' {options}").fetchone()[0]
+    silver_relation = f"read_parquet('{bronze_target}')"
+    silver_rows = con.execute(
+        f"COPY ({_silver_sql(silver_relation, ingested_at)}) TO '{silver_target}' {options}"
+    ).fetchone()[0]
+    return int(bronze_rows), int(silver_rows)
+
+
+def bronze_to_silver_files(
+    source: str, bronze_target: str, silver_target: str, ingested_at: pd.Timestamp, engine: str = "pandas"
+) -> Tuple[int, int]:
+    """Run the Bronze -> Silver step between files with either engine."""
+    if engine == "duckdb":
+        return duckdb_bronze_to_silver(duckdb_connection(), source, bronze_target, silver_target, ingested_at)
+    if engine != "pandas":
+        raise ValueError(f"Unknown engine '{engine}'; expected one of {ENGINES}")
+    bronze_df = bronze_frame_from_records(read_bronze(source))
+    silver_df = silver_frame(bronze_df, ingested_at=ingested_at)
+    bronze_df.to_parquet(bronze_target, index=False, compression="zstd")
+    silver_df.to_parquet(silver_target, index=False, compression="zstd")
+    return len(bronze_df), len(silver_df)
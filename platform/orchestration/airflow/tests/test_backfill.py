@@ -0,0 +1,58 @@
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[4]
+sys.path.insert(0, str(PROJECT_ROOT / "platform" / "orchestration" / "airflow"))
+
+from include.backfill import (
+    MAX_BACKFILL_DAYS,
+    ORDER_ID_BATCH_BYTES,
+    SILVER_DELETE_ORDERS_SQL,
+    backfill_days,
+    delete_silver_orders,
+    order_id_batches,
+)
+
+
+def test_backfill_days_from_range_or_logical_date():
+    assert backfill_days({}, date(2024, 2, 3)) == ["2024-02-03"]
+    assert backfill_days({"start_date": None, "end_date": None}, date(2024, 2, 3)) == ["2024-02-03"]
+    assert backfill_days({"start_date": "2024-02-28", "end_date": "2024-03-01"}, date(2024, 5, 1)) == [
+        "2024-02-28",
+        "2024-02-29",
+        "2024-03-01",
+    ]
+    assert backfill_days({"start_date": "2024-02-28"}, date(2024, 5, 1)) == ["2024-02-28"]
+
+
+def test_backfill_days_rejects_inverted_or_oversized_ranges():
+    with pytest.raises(ValueError, match="before start_date"):
+        backfill_days({"start_date": "2024-03-02", "end_date": "2024-03-01"}, date(2024, 5, 1))
+    with pytest.raises(ValueError, match=str(MAX_BACKFILL_DAYS)):
+        backfill_days({"start_date": "2022-01-01", "end_date": "2024-01-01"}, date(2024, 5, 1))
+
+
+def test_order_id_batches_stay_under_the_query_budget():
+    order_ids = [f"order-{index:06d}" for index in range(20_000)]
+
+    batches = list(order_id_batches(order_ids))
+
+    assert len(batches) > 1
+    assert [order_id for batch in batches for order_id in batch] == order_ids
+    assert all(sum(len(order_id) + 4 for order_id in batch) <= ORDER_ID_BATCH_BYTES for batch in batches)
+    assert list(order_id_batches([])) == []
+
+
+def test_delete_silver_orders_runs_one_mutation_per_batch():
+    calls = []
+
+    class RecordingClickHouse:
+        def execute(self, sql, params=None, settings=None):
+            calls.append((sql, params, settings))
+
+    delete_silver_orders(RecordingClickHouse(), ["o-1", "o-2", "o-3"])
+
+    assert calls == [(SILVER_DELETE_ORDERS_SQL, {"order_ids": ("o-1", "o-2", "o-3")}, {"mutations_sync": 1})]
@@ -0,0 +1,85 @@
+import io
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[4]
+sys.path.insert(0, str(PROJECT_ROOT / "platform" / "orchestration" / "airflow"))
+sys.path.insert(0, str(PROJECT_ROOT / "platform"))
+
+from include.batch_scoring import latest_features, partition_customers, score_rows
+from include.customer_features import read_offline_rows
+from ml.scoring.native_scorer import NativeLogisticScorer
+
+FEATURES = ["total_transactions", "total_spend", "avg_transaction_value", "spend_last_30d"]
+
+
+def test_partitioned_scoring_covers_every_customer_once():
+    frame = pd.read_csv(PROJECT_ROOT / "storage" / "data" / "ml" / "customer_transactions.csv")
+    stale = frame.head(3).assign(event_timestamp="2000-01-01T00:00:00", total_spend=-1.0)
+    features = latest_features(pd.concat([frame, stale]), FEATURES)
+    scorer = NativeLogisticScorer([0.01, 0.001, -0.02, 0.003], -0.5, FEATURES)
+    scored_at = datetime(2024, 1, 2)
+
+    rows = [
+        row
+        for partition in partition_customers(features, 4)
+        for row in score_rows(partition, scorer, "oner_churn_model/3", scored_at)
+    ]
+
+    assert sorted(row[0] for row in rows) == sorted(frame["customer_id"].unique().tolist())
+    expected = dict(zip(features["customer_id"], scorer.predict_proba(features)))
+    assert all(score == expected[customer_id] for customer_id, score, _, _ in rows)
+    assert (features["total_spend"] >= 0).all()
+    assert {row[2:] for row in rows} == {("oner_churn_model/3", scored_at)}
+
+
+class OfflineSourceS3:
+    def __init__(self, objects):
+        self.objects = objects
+
+    def get_paginator(self, operation):
+        return self
+
+    def paginate(self, Bucket, Prefix):
+        yield {"Contents": [{"Key": key} for bucket, key in sorted(self.objects) if key.startswith(Prefix)]}
+
+    def get_object(self, Bucket, Key):
+        return {"Body": io.BytesIO(self.objects[(Bucket, Key)])}
+
+
+def test_offline_source_objects_supply_the_latest_features():
+    seed = (PROJECT_ROOT / "storage" / "data" / "ml" / "customer_transactions.csv").read_bytes()
+    run = pd.DataFrame(
+        [
+            # A customer only the incremental DAG knows about, and a recompute of customer 1.
+            [9_000_001, "2024-03-02T00:00:00", "2024-03-02T01:00:00", 1, 12.5, 12.5, 12.5],
+            [1, "2024-03-02T00:00:00", "2024-03-02T01:00:00", 90, 800.0, 8.89, 10.0],
+            [1, "2024-03-02T00:00:00", "2024-03-02T03:00:00", 91, 810.0, 8.90, 20.0],
+        ],
+        columns=["customer_id", "event_timestamp", "created_at", *FEATURES],
+    )
+    client = OfflineSourceS3(
+        {
+            ("featurestore", "featurestore/customer_transactions/seed.csv"): seed,
+            ("featurestore", "featurestore/customer_transactions/as_of=2024-03-02/part-1.csv"): run.to_csv(
+                index=False
+            ).encode("utf-8"),
+            ("featurestore", "featurestore/other/seed.csv"): seed,
+        }
+    )
+
+    frame = read_offline_rows(
+        client,
+        "featurestore",
+        "featurestore/customer_transactions",
+        ["customer_id", "event_timestamp", "created_at", *FEATURES],
+    )
+    features = latest_features(frame, FEATURES).set_index("customer_id")
+
+    assert len(frame) == len(pd.read_csv(io.BytesIO(seed))) + 3
+    assert 9_000_001 in features.index
+    assert features.loc[1, "total_transactions"] == 91 and features.loc[1, "spend_last_30d"] == 20.0
+    assert list(features.columns) == ["event_timestamp", *FEATURES]
@@ -0,0 +1,63 @@
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[4]
+sys.path.insert(0, str(PROJECT_ROOT / "platform" / "orchestration" / "airflow"))
+
+from include.bronze_objects import WATERMARK_SKEW, combine_latest, pending_objects, staged_key, sync_started_at
+
+
+def _listing(key, etag, minute, size=100):
+    return {"Key": key, "ETag": f'"{etag}"', "LastModified": datetime(2024, 1, 1, 0, minute), "Size": size}
+
+
+def test_pending_objects_skips_loaded_and_empty_objects():
+    listing = [
+        _listing("airbyte/orders/2.jsonl", "b", 2),
+        _listing("airbyte/orders/1.jsonl", "a", 1),
+        _listing("airbyte/orders/3.jsonl", "c", 3, size=0),
+        _listing("airbyte/orders/4.jsonl", "d2", 4),
+    ]
+    processed = {"airbyte/orders/1.jsonl": "a", "airbyte/orders/4.jsonl": "d1"}
+
+    pending = pending_objects(listing, processed)
+
+    assert pending == [
+        {"key": "airbyte/orders/2.jsonl", "etag": "b", "size": 100},
+        {"key": "airbyte/orders/4.jsonl", "etag": "d2", "size": 100},
+    ]
+    assert staged_key("medallion/orders/", "silver", "airbyte/orders/4.jsonl", "d2") == (
+        "medallion/orders/silver/airbyte/orders/4.jsonl.d2.parquet"
+    )
+
+
+def test_pending_objects_only_considers_objects_since_watermark():
+    listing = [
+        _listing("airbyte/orders/old.jsonl", "a", 1),
+        _listing("airbyte/orders/delta-1.jsonl", "b", 10),
+        _listing("airbyte/orders/delta-2.jsonl", "c", 11),
+    ]
+
+    pending = pending_objects(listing, {"airbyte/orders/delta-1.jsonl": "b"}, since=datetime(2024, 1, 1, 0, 5))
+
+    assert pending == [{"key": "airbyte/orders/delta-2.jsonl", "etag": "c", "size": 100}]
+
+
+def test_sync_started_at_reads_job_epoch_with_skew():
+    started = sync_started_at({"id": 7, "createdAt": 1704067200})
+
+    assert started == datetime(2024, 1, 1, tzinfo=timezone.utc) - WATERMARK_SKEW
+    assert sync_started_at({"id": 7}) is None
+
+
+def test_combine_latest_keeps_newest_object_per_order():
+    older = pd.DataFrame({"order_id": ["o-1", "o-2"], "sales_total": [1.0, 2.0]})
+    newer = pd.DataFrame({"order_id": ["o-2", "o-3"], "sales_total": [20.0, 3.0]})
+
+    combined = combine_latest([older, pd.DataFrame(), newer])
+
+    assert combined.set_index("order_id")["sales_total"].to_dict() == {"o-1": 1.0, "o-2": 20.0, "o-3": 3.0}
+    assert combine_latest([]).empty
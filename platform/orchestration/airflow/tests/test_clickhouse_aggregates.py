@@ -0,0 +1,63 @@
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[4]
+sys.path.insert(0, str(PROJECT_ROOT / "platform" / "orchestration" / "airflow"))
+
+from include.clickhouse_aggregates import (
+    DELETE_MONTHS_SQL,
+    REBUILD_MONTHS_SQL,
+    months_for_orders,
+    months_of,
+    refresh_monthly_aggregates,
+)
+
+
+class RecordingClickHouse:
+    def __init__(self, rows=None):
+        self.rows = rows or []
+        self.calls = []
+
+    def execute(self, sql, params=None, settings=None):
+        self.calls.append((sql, params, settings))
+        return self.rows
+
+
+def test_months_of_normalises_dates_and_timestamps():
+    assert months_of([datetime(2024, 3, 31, 23, 59), date(2024, 3, 1), None, date(2024, 4, 2)]) == {
+        date(2024, 3, 1),
+        date(2024, 4, 1),
+    }
+
+
+def test_months_for_orders_skips_query_without_ids():
+    client = RecordingClickHouse(rows=[(date(2024, 1, 1),), (date(2024, 2, 1),)])
+
+    assert months_for_orders(client, []) == set()
+    assert client.calls == []
+    assert months_for_orders(client, ["o-1", "o-2"]) == {date(2024, 1, 1), date(2024, 2, 1)}
+    assert client.calls[0][1] == {"order_ids": ("o-1", "o-2")}
+
+
+def test_months_for_orders_queries_in_bounded_batches():
+    client = RecordingClickHouse(rows=[(date(2024, 1, 1),)])
+    order_ids = [f"order-{index:06d}" for index in range(20_000)]
+
+    assert months_for_orders(client, order_ids) == {date(2024, 1, 1)}
+    assert len(client.calls) > 1
+    assert [order_id for _, params, _ in client.calls for order_id in params["order_ids"]] == order_ids
+
+
+def test_refresh_deletes_then_rebuilds_each_month_once():
+    client = RecordingClickHouse()
+
+    months = refresh_monthly_aggregates(client, [date(2024, 2, 1), date(2024, 1, 1), date(2024, 2, 1)])
+
+    assert months == [date(2024, 1, 1), date(2024, 2, 1)]
+    (delete_sql, delete_params, delete_settings), (rebuild_sql, rebuild_params, _) = client.calls
+    assert delete_sql == DELETE_MONTHS_SQL and delete_settings == {"mutations_sync": 1}
+    assert rebuild_sql == REBUILD_MONTHS_SQL
+    assert "countIfState(status = 'delivered')" in rebuild_sql
+    assert delete_params == rebuild_params == {"months": (date(2024, 1, 1), date(2024, 2, 1))}
+    assert refresh_monthly_aggregates(client, []) == [] and len(client.calls) == 2
@@ -0,0 +1,132 @@
+import io
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[4]
+sys.path.insert(0, str(PROJECT_ROOT / "platform" / "orchestration" / "airflow"))
+sys.path.insert(0, str(PROJECT_ROOT / "platform"))
+
+from include.customer_features import (
+    OFFLINE_COLUMNS,
+    apply_changes,
+    feature_frame,
+    write_offline_rows,
+)
+from ml.features.customer_aggregates import CustomerFeatureState, entity_id
+from ml.features.state_store import SqlStateStore
+
+
+class RecordingS3:
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, Bucket, Key, Body):
+        self.objects[(Bucket, Key)] = Body
+
+
+def _order(order_id, customer_id, day, amount, ingested_day):
+    return (order_id, customer_id, datetime.fromisoformat(day), amount, datetime.fromisoformat(ingested_day))
+
+
+def test_incremental_runs_match_a_full_recompute():
+    history = [
+        _order("a", "1", "2024-01-02", 10.0, "2024-03-01"),
+        _order("b", "1", "2024-03-20", 30.0, "2024-03-20"),
+        _order("c", "2", "2024-03-25", 5.0, "2024-03-25"),
+    ]
+    state = CustomerFeatureState()
+    touched, watermark, count = apply_changes(state, history, None)
+    assert touched == {1, 2} and count == 3 and watermark == datetime(2024, 3, 25)
+
+    # The inclusive watermark replays the last row; an update moves order b to customer 2.
+    changes = [history[-1], _order("b", "2", "2024-03-30", 40.0, "2024-03-31")]
+    touched, watermark, _ = apply_changes(state, changes, watermark)
+    assert touched == {1, 2} and watermark == datetime(2024, 3, 31)
+
+    full = CustomerFeatureState()
+    apply_changes(full, [history[0], history[2], changes[1]], None)
+    as_of = datetime(2024, 4, 1)
+    expected = feature_frame(full, [1, 2], as_of, created_at=as_of)
+    actual = feature_frame(state, [1, 2], as_of, created_at=as_of)
+    pd.testing.assert_frame_equal(actual, expected)
+    assert list(actual.columns) == OFFLINE_COLUMNS
+    assert actual.set_index("customer_id").loc[2, "spend_last_30d"] == 45.0
+    assert actual.set_index("customer_id").loc[1, "spend_last_30d"] == 0.0
+
+
+def test_store_backed_runs_only_load_what_they_touch(tmp_path):
+    store = SqlStateStore.sqlite(str(tmp_path / "state.db"))
+    state = CustomerFeatureState(store=store)
+    assert store.watermark() is None
+    apply_changes(
+        state,
+        [
+            _order("a", "1", "2024-01-01", 10.0, "2024-01-01"),
+            _order("b", "2", "2024-03-01", 20.0, "2024-03-01"),
+            _order("c", "2", "2024-03-05", 5.0, "2024-03-05"),
+        ],
+        None,
+        batch_size=2,
+    )
+    assert state.expire(datetime(2024, 3, 10).date()) == {1}
+    state.commit(datetime(2024, 3, 5))
+
+    # A later run sees only the updated order and the customers it moves between.
+    rerun = CustomerFeatureState(store=SqlStateStore.sqlite(str(tmp_path / "state.db")))
+    assert rerun.store.watermark() == datetime(2024, 3, 5)
+    touched, _, _ = apply_changes(rerun, [_order("c", "1", "2024-03-06", 7.0, "2024-03-06")], None)
+    assert touched == {1, 2}
+    assert set(rerun.orders) == {"c"} and set(rerun.customers) == {1, 2}
+    assert rerun.expire(datetime(2024, 3, 11).date()) == set()
+    assert rerun.expire(datetime(2024, 4, 5).date()) == {1, 2}
+    rerun.commit(datetime(2024, 3, 6))
+
+    restored = CustomerFeatureState(store=SqlStateStore.sqlite(str(tmp_path / "state.db")))
+    as_of = datetime(2024, 4, 5).date()
+    assert restored.features(1, as_of) == {
+        "customer_id": 1,
+        "total_transactions": 2,
+        "total_spend": 17.0,
+        "avg_transaction_value": 8.5,
+        "spend_last_30d": 0.0,
+    }
+    assert restored.features(2, datetime(2024, 3, 20).date())["spend_last_30d"] == 0.0
+    assert restored.features(2, as_of)["total_spend"] == 20.0
+
+
+def test_offline_rows_are_written_as_new_objects():
+    store = RecordingS3()
+    state = CustomerFeatureState()
+    apply_changes(state, [_order("a", "3", "2024-03-01", 12.5, "2024-03-01")], None)
+    as_of = datetime(2024, 3, 2)
+    frame = feature_frame(state, [3], as_of, created_at=as_of)
+
+    first = write_offline_rows(store, "featurestore", "featurestore/customer_transactions/", frame, as_of, as_of)
+    second = write_offline_rows(
+        store, "featurestore", "featurestore/customer_transactions", frame, as_of, datetime(2024, 3, 2, 2)
+    )
+
+    assert first == "featurestore/customer_transactions/as_of=2024-03-02/part-20240302T000000000000.csv"
+    assert second != first and set(store.objects) == {("featurestore", first), ("featurestore", second)}
+    written = pd.read_csv(io.BytesIO(store.objects[("featurestore", first)]))
+    assert list(written.columns) == OFFLINE_COLUMNS and written.loc[0, "total_spend"] == 12.5
+
+
+def test_source_customer_ids_become_int64_entities():
+    assert entity_id("42") == 42 and entity_id(7) == 7
+    acme = entity_id("ACME_B2B")
+    assert isinstance(acme, int) and 2**62 <= acme < 2**63
+    assert entity_id(" ACME_B2B ") == acme != entity_id("GLOBEX")
+
+    state = CustomerFeatureState()
+    touched, _, count = apply_changes(
+        state,
+        [_order("a", "ACME_B2B", "2024-03-01", 12.5, "2024-03-01"), _order("b", None, "2024-03-01", 5.0, "2024-03-01")],
+        None,
+    )
+    assert touched == {acme} and count == 2 and state.skipped == 1
+    frame = feature_frame(state, touched, datetime(2024, 3, 2), created_at=datetime(2024, 3, 2))
+    assert frame["customer_id"].dtype == "int64"
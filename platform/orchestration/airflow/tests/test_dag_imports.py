@@ -0,0 +1,129 @@
+"""Parse-time import budget for the DAG files.
+
+The scheduler re-imports every DAG file on each parse loop, so whatever a DAG imports at
+module level (directly or through ``include``/``ml`` modules) is paid on every parse. The
+imports are resolved statically, without importing anything, and compared per file with
+the third-party packages it is allowed to load at parse time.
+"""
+import ast
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[4]
+AIRFLOW_ROOT = PROJECT_ROOT / "platform" / "orchestration" / "airflow"
+DAGS_DIR = AIRFLOW_ROOT / "dags"
+# Roots of first-party packages, followed into their modules.
+LOCAL_PACKAGES = {"include": AIRFLOW_ROOT, "ml": PROJECT_ROOT / "platform"}
+
+DEFAULT_BUDGET = frozenset({"airflow"})
+IMPORT_BUDGET: Dict[str, frozenset] = {
+    # The Airbyte API calls are plain HTTP; requests is already loaded by Airflow itself.
+    "medallion_batch.py": frozenset({"airflow", "requests"}),
+}
+
+
+def _is_type_checking(node: ast.If) -> bool:
+    test = node.test
+    return (isinstance(test, ast.Name) and test.id == "TYPE_CHECKING") or (
+        isinstance(test, ast.Attribute) and test.attr == "TYPE_CHECKING"
+    )
+
+
+def _module_level_imports(tree: ast.AST, package: str) -> Iterator[str]:
+    """Modules imported when the file executes; function bodies and TYPE_CHECKING blocks are skipped."""
+    stack: List[ast.AST] = [tree]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+            continue
+        if isinstance(node, ast.If) and _is_type_checking(node):
+            stack.extend(node.orelse)
+            continue
+        if isinstance(node, ast.Import):
+            yield from (alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                base = package.rsplit(".", node.level - 1)[0] if node.level > 1 else package
+                module = f"{base}.{node.module}" if node.module else base
+            else:
+                module = node.module or ""
+            yield module
+            # ``from include import bronze_objects`` imports a submodule.
+            yield from (f"{module}.{alias.name}" for alias in node.names)
+        stack.extend(ast.iter_child_nodes(node))
+
+
+def _local_files(module: str) -> List[Tuple[str, Path]]:
+    """Modules and files executed when importing a first-party ``module`` (package ``__init__``s included)."""
+    parts = module.split(".")
+    root = LOCAL_PACKAGES.get(parts[0])
+    if root is None:
+        return []
+    files = []
+    for depth in range(1, len(parts) + 1):
+        name, path = ".".join(parts[:depth]), root.joinpath(*parts[:depth])
+        if (path / "__init__.py").exists():
+            files.append((name, path / "__init__.py"))
+        elif path.with_suffix(".py").exists():
+            files.append((name, path.with_suffix(".py")))
+    return files
+
+
+def parse_time_imports(path: Path) -> Dict[str, Tuple[str, ...]]:
+    """Third-party top-level packages loaded by importing ``path``, with the chain that loads each."""
+    found: Dict[str, Tuple[str, ...]] = {}
+    seen: Set[Path] = set()
+    stack: List[Tuple[Path, Tuple[str, ...], Optional[str]]] = [(path, (path.name,), None)]
+    while stack:
+        current, chain, module = stack.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        package = module if current.name == "__init__.py" else (module or "").rpartition(".")[0]
+        for imported in _module_level_imports(ast.parse(current.read_text(encoding="utf-8")), package):
+            root = imported.split(".")[0]
+            if not root or root == "__future__" or root in sys.stdlib_module_names:
+                continue
+            if root in LOCAL_PACKAGES:
+                for name, local in _local_files(imported):
+                    stack.append((local, chain + (name,), name))
+            else:
+                found.setdefault(root, chain + (imported,))
+    return found
+
+
+DAG_FILES = sorted(DAGS_DIR.glob("*.py"))
+
+
+@pytest.mark.parametrize("dag_file", DAG_FILES, ids=lambda path: path.name)
+def test_dag_file_stays_within_import_budget(dag_file):
+    budget = IMPORT_BUDGET.get(dag_file.name, DEFAULT_BUDGET)
+    over = {root: chain for root, chain in parse_time_imports(dag_file).items() if root not in budget}
+
+    assert not over, "Imported while parsing {}; move into the task callables:\n{}".format(
+        dag_file.name, "\n".join(f"  {root}: {' -> '.join(chain)}" for root, chain in sorted(over.items()))
+    )
+
+
+def test_budget_checker_follows_include_modules(tmp_path):
+    dag_file = tmp_path / "example.py"
+    dag_file.write_text(
+        "from typing import TYPE_CHECKING\n"
+        "from airflow.decorators import dag\n"
+        "from include.iceberg_tables import BRONZE_TABLE\n"
+        "if TYPE_CHECKING:\n"
+        "    import numpy\n"
+        "def task():\n"
+        "    import psycopg2\n",
+        encoding="utf-8",
+    )
+
+    found = parse_time_imports(dag_file)
+
+    assert "pyiceberg" in found
+    assert found["pandas"][:2] == ("example.py", "include.iceberg_tables")
+    assert "numpy" not in found
+    assert "psycopg2" not in found
@@ -0,0 +1,67 @@
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[4]
+sys.path.insert(0, str(PROJECT_ROOT / "platform" / "orchestration" / "airflow"))
+
+from include import drift_profiles
+from include.drift_profiles import MODEL_FEATURES, compare_to_profile, load_or_build_profile, read_window
+
+
+def _frame(rng, rows, shift=0.0, start="2024-01-01"):
+    return pd.DataFrame(
+        {
+            "customer_id": np.arange(rows),
+            "event_timestamp": pd.date_range(start, periods=rows, freq="min"),
+            "total_transactions": rng.poisson(50, rows),
+            "total_spend": rng.gamma(2.0, 300.0, rows) + shift,
+            "avg_transaction_value": rng.gamma(2.0, 10.0, rows),
+            "spend_last_30d": rng.gamma(2.0, 80.0, rows),
+            "churned": rng.integers(0, 2, rows),
+        }
+    )
+
+
+def _fail_rebuild(*_):
+    raise AssertionError("reference profile should have been served from cache")
+
+
+def test_reference_profile_is_cached_per_dataset(tmp_path, monkeypatch):
+    rng = np.random.default_rng(7)
+    reference_path = tmp_path / "training_dataset.parquet"
+    _frame(rng, 5_000).to_parquet(reference_path, index=False)
+    cache_dir = tmp_path / "profiles"
+
+    first = load_or_build_profile(str(reference_path), str(cache_dir), MODEL_FEATURES)
+    monkeypatch.setattr(drift_profiles, "build_reference_profile", _fail_rebuild)
+    second = load_or_build_profile(str(reference_path), str(cache_dir), MODEL_FEATURES)
+
+    assert first == second
+    assert set(first["columns"]) == set(MODEL_FEATURES)
+    assert len(list(cache_dir.iterdir())) == 1
+
+
+def test_window_drift_flags_shifted_feature(tmp_path):
+    rng = np.random.default_rng(11)
+    reference_path = tmp_path / "reference.csv"
+    _frame(rng, 5_000).to_csv(reference_path, index=False)
+    profile = load_or_build_profile(str(reference_path), str(tmp_path / "profiles"), MODEL_FEATURES)
+
+    current_path = tmp_path / "current.csv"
+    pd.concat(
+        [_frame(rng, 2_000, start="2024-02-01"), _frame(rng, 2_000, shift=800.0, start="2024-02-03")]
+    ).to_csv(current_path, index=False)
+
+    stable = read_window(str(current_path), MODEL_FEATURES, datetime(2024, 2, 1), datetime(2024, 2, 2))
+    shifted = read_window(str(current_path), MODEL_FEATURES, datetime(2024, 2, 3), datetime(2024, 2, 4))
+
+    assert list(stable.columns) == MODEL_FEATURES
+    assert len(stable) == len(shifted) == 1_440
+    assert compare_to_profile(profile, stable)["drifted_columns"] == []
+    drift = compare_to_profile(profile, shifted)
+    assert drift["drifted_columns"] == ["total_spend"]
+    assert drift["columns"]["total_spend"]["ks"] > 0.5
@@ -0,0 +1,60 @@
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[4]
+sys.path.insert(0, str(PROJECT_ROOT / "platform" / "orchestration" / "airflow"))
+
+from include.gold_orders import UPSERT_FROM_STAGE_SQL, ensure_partitions, partition_months
+
+
+class RecordingCursor:
+    def __init__(self, statements):
+        self.statements = statements
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        return None
+
+    def execute(self, sql, params=None):
+        self.statements.append((sql, params))
+
+
+class RecordingConnection:
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *_):
+        if exc_type is None:
+            self.commits += 1
+
+    def cursor(self):
+        return RecordingCursor(self.statements)
+
+
+def test_partition_months_are_sorted_month_starts():
+    order_dates = [datetime(2024, 3, 31, 23, 59), date(2024, 1, 15), None, datetime(2024, 3, 1)]
+
+    assert partition_months(order_dates) == [date(2024, 1, 1), date(2024, 3, 1)]
+
+
+def test_ensure_partitions_commits_on_its_own_and_skips_empty_batches():
+    connection = RecordingConnection()
+
+    assert ensure_partitions(connection, []) == []
+    assert connection.statements == [] and connection.commits == 0
+
+    assert ensure_partitions(connection, [datetime(2024, 2, 9, 12)]) == [date(2024, 2, 1)]
+    (_, params), = connection.statements
+    assert params == ([date(2024, 2, 1)],) and connection.commits == 1
+
+
+def test_upsert_conflicts_on_partitioned_primary_key():
+    assert "ON CONFLICT (order_id, order_date)" in UPSERT_FROM_STAGE_SQL
+    assert "DISTINCT ON (order_id)" in UPSERT_FROM_STAGE_SQL
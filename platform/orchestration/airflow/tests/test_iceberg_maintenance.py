@@ -0,0 +1,88 @@
+import sys
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[4]
+sys.path.insert(0, str(PROJECT_ROOT / "platform" / "orchestration" / "airflow"))
+
+from include.iceberg_maintenance import MaintenanceConfig, expire_snapshots_sql, maintain_table, rewrite_data_files_sql
+
+
+class _Row(tuple):
+    def __new__(cls, **values):
+        row = super().__new__(cls, values.values())
+        row._values = values
+        return row
+
+    def asDict(self):
+        return dict(self._values)
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def collect(self):
+        return self._rows
+
+
+class RecordingSpark:
+    """Spark stand-in: answers metadata-table queries from a mutable table state."""
+
+    def __init__(self):
+        self.statements = []
+        self.files = [1_000_000] * 12 + [200_000_000]
+        self.manifests = 9
+        self.snapshots = 14
+
+    def sql(self, statement):
+        self.statements.append(statement)
+        if ".files" in statement:
+            small = sum(1 for size in self.files if size < 32 * 1024 * 1024)
+            return _Result([(len(self.files), sum(self.files), small)])
+        if ".manifests" in statement:
+            return _Result([(self.manifests,)])
+        if ".snapshots" in statement:
+            return _Result([(self.snapshots,)])
+        if "rewrite_data_files" in statement:
+            self.files = [12_000_000, 200_000_000]
+            return _Result([_Row(rewritten_data_files_count=12, added_data_files_count=1)])
+        if "expire_snapshots" in statement:
+            self.snapshots = 5
+            return _Result([_Row(deleted_data_files_count=12, deleted_manifest_files_count=7)])
+        if "rewrite_manifests" in statement:
+            self.manifests = 1
+            return _Result([_Row(rewritten_manifests_count=9, added_manifests_count=1)])
+        if "remove_orphan_files" in statement:
+            return _Result([("s3://iceberg/a.parquet",), ("s3://iceberg/b.parquet",)])
+        raise AssertionError(statement)
+
+
+def test_maintenance_reports_before_and_after():
+    spark = RecordingSpark()
+    config = MaintenanceConfig.from_params({"target_file_size_mb": 256, "min_input_files": 3, "unrelated": "x"})
+
+    report = maintain_table(spark, "silver.orders", config, now=datetime(2024, 5, 10, 4))
+
+    assert report["before"] == {
+        "data_files": 13,
+        "data_bytes": 212_000_000,
+        "small_files": 12,
+        "manifests": 9,
+        "snapshots": 14,
+    }
+    assert report["after"]["data_files"] == 2 and report["after"]["small_files"] == 1
+    assert report["delta"]["manifests"] == -8 and report["delta"]["snapshots"] == -9
+    assert report["procedures"]["remove_orphan_files"] == {"orphan_files_removed": 2}
+    procedures = [s.split("system.")[1].split("(")[0] for s in spark.statements if s.startswith("CALL")]
+    assert procedures == ["rewrite_data_files", "expire_snapshots", "rewrite_manifests", "remove_orphan_files"]
+
+
+def test_procedure_sql_uses_configured_thresholds():
+    config = MaintenanceConfig(target_file_size_mb=64, min_input_files=4, snapshot_retention_days=2, retain_last_snapshots=3)
+
+    rewrite = rewrite_data_files_sql("bronze.orders", config)
+    expire = expire_snapshots_sql("bronze.orders", config, now=datetime(2024, 5, 10, 4, 30))
+
+    assert "'target-file-size-bytes', '67108864'" in rewrite and "'min-input-files', '4'" in rewrite
+    assert "older_than => TIMESTAMP '2024-05-08 04:30:00'" in expire and "retain_last => 3" in expire
@@ -0,0 +1,96 @@
+import sys
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+pytest.importorskip("pyiceberg")
+from pyiceberg.catalog.sql import SqlCatalog
+from pyiceberg.expressions import EqualTo
+
+PROJECT_ROOT = Path(__file__).resolve().parents[4]
+sys.path.insert(0, str(PROJECT_ROOT / "platform" / "orchestration" / "airflow"))
+
+from include.iceberg_tables import (
+    SILVER_TABLE,
+    ensure_bronze_table,
+    ensure_silver_table,
+    overwrite_day,
+    read_day,
+    replace_orders,
+)
+
+
+@pytest.fixture()
+def catalog(tmp_path):
+    return SqlCatalog("test", uri=f"sqlite:///{tmp_path}/catalog.db", warehouse=f"file://{tmp_path}/warehouse")
+
+
+def _orders():
+    return pd.DataFrame(
+        {
+            "order_id": ["o-1", "o-2", "o-3"],
+            "order_date": pd.to_datetime(["2024-01-01T08:00:00", "2024-01-01T20:00:00", "2024-01-02T09:30:00"]),
+            "customer_id": ["ACME", "ACME", "GLOBEX"],
+            "sales_total": [10.0, 20.5, 7.25],
+            "status": ["shipped", "delivered", "processing"],
+        }
+    )
+
+
+def test_bronze_is_day_partitioned_zstd_parquet(catalog):
+    table = ensure_bronze_table(catalog)
+
+    assert replace_orders(table, _orders(), run_id="manual__1") == 3
+
+    table = catalog.load_table("bronze.orders")
+    tasks = list(table.scan().plan_files())
+    partitions = sorted(Path(task.file.file_path).parent.name for task in tasks)
+    assert partitions == ["order_date_day=2024-01-01", "order_date_day=2024-01-02"]
+    parquet = pq.ParquetFile(tasks[0].file.file_path.replace("file://", ""))
+    assert parquet.metadata.row_group(0).column(0).compression == "ZSTD"
+    assert table.current_snapshot().summary["airflow.run_id"] == "manual__1"
+
+    pruned = list(table.scan(row_filter=EqualTo("order_id", "o-3"), selected_fields=("order_id",)).plan_files())
+    assert len(pruned) == 1
+
+
+def test_replace_orders_upserts_by_order_id(catalog):
+    table = ensure_silver_table(catalog)
+    silver = _orders().assign(ingestion_date=pd.Timestamp("2024-01-03T00:00:00Z"))
+    replace_orders(table, silver)
+
+    late = pd.DataFrame(
+        {
+            "order_id": ["o-1", "o-1", "o-4"],
+            "order_date": pd.to_datetime(["2024-01-01T08:00:00", "2024-01-01T08:00:00", "2024-01-01T23:00:00"]),
+            "customer_id": ["ACME", "ACME", "INITECH"],
+            "status": ["shipped", "delivered", "shipped"],
+            "sales_total": [50.0, 99.0, 1.0],
+            "ingestion_date": pd.Timestamp("2024-01-04T00:00:00Z"),
+        }
+    )
+    assert replace_orders(table, late) == 2
+    replace_orders(table, late)
+
+    result = catalog.load_table(SILVER_TABLE).scan().to_pandas().sort_values("order_id").reset_index(drop=True)
+    assert result["order_id"].tolist() == ["o-1", "o-2", "o-3", "o-4"]
+    assert result.loc[0, "sales_total"] == 99.0 and result.loc[0, "status"] == "delivered"
+    assert ensure_silver_table(catalog).schema() == table.schema()
+
+
+def test_overwrite_day_replaces_a_single_partition(catalog):
+    table = ensure_bronze_table(catalog)
+    replace_orders(table, _orders())
+    day = date(2024, 1, 1)
+
+    reprocessed = read_day(table, day).assign(sales_total=0.0)
+    assert sorted(reprocessed["order_id"]) == ["o-1", "o-2"]
+    assert overwrite_day(table, reprocessed.iloc[[0]], day, run_id="backfill__1") == 1
+    assert read_day(table, day)[["order_id", "sales_total"]].values.tolist() == [["o-1", 0.0]]
+
+    overwrite_day(table, reprocessed.iloc[0:0], day)
+    remaining = catalog.load_table("bronze.orders").scan().to_pandas()
+    assert remaining["order_id"].tolist() == ["o-3"]
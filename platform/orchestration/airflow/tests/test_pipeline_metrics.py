@@ -0,0 +1,80 @@
+import socket
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[4]
+sys.path.insert(0, str(PROJECT_ROOT / "platform" / "orchestration" / "airflow"))
+
+from include import pipeline_metrics
+from include.pipeline_metrics import format_metric, record_stage, stage
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    datagrams = []
+    monkeypatch.setattr(pipeline_metrics, "send", datagrams.append)
+    return datagrams
+
+
+def test_format_metric_uses_dogstatsd_tags():
+    line = format_metric("rows_total", 120, "counter", {"stage": "publish_gold", "suite": "a,b"})
+
+    assert line == "oner_pipeline_rows_total:120|c|#stage:publish_gold,suite:a_b"
+
+
+def test_stage_emits_duration_rows_and_bytes(sent):
+    with stage("bronze_to_silver", engine="duckdb") as metrics:
+        metrics.add_rows(10)
+        metrics.add_bytes_read(2048)
+        metrics.add_bytes_written(512)
+
+    lines = sent[0]
+    assert lines[0].startswith("oner_pipeline_stage_duration_seconds:")
+    assert lines[0].endswith("|ms|#engine:duckdb,stage:bronze_to_silver")
+    assert "oner_pipeline_stage_runs_total:1|c|#engine:duckdb,stage:bronze_to_silver,status:ok" in lines
+    assert "oner_pipeline_rows_total:10|c|#engine:duckdb,stage:bronze_to_silver" in lines
+    assert "oner_pipeline_bytes_total:2048|c|#direction:read,engine:duckdb,stage:bronze_to_silver" in lines
+    assert "oner_pipeline_bytes_total:512|c|#direction:written,engine:duckdb,stage:bronze_to_silver" in lines
+
+
+def test_failed_stage_is_counted_and_reraised(sent):
+    with pytest.raises(ValueError):
+        with stage("ge_checkpoint", suite="orders_silver"):
+            raise ValueError("checkpoint failed")
+
+    assert "oner_pipeline_stage_runs_total:1|c|#stage:ge_checkpoint,status:failed,suite:orders_silver" in sent[0]
+    assert not any(line.startswith("oner_pipeline_rows_total") for line in sent[0])
+
+
+def test_record_stage_reports_externally_timed_trials(sent):
+    record_stage("training_trial", 2.5, rows=800, training_trial_auc=0.91)
+
+    assert sent[0] == [
+        "oner_pipeline_stage_duration_seconds:2500|ms|#stage:training_trial",
+        "oner_pipeline_stage_runs_total:1|c|#stage:training_trial,status:ok",
+        "oner_pipeline_rows_total:800|c|#stage:training_trial",
+        "oner_pipeline_training_trial_auc:0.91|g|#stage:training_trial",
+    ]
+
+
+def test_send_delivers_one_udp_datagram(monkeypatch):
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as receiver:
+        receiver.bind(("127.0.0.1", 0))
+        receiver.settimeout(2)
+        monkeypatch.setenv("PIPELINE_METRICS_HOST", "127.0.0.1")
+        monkeypatch.setenv("PIPELINE_METRICS_PORT", str(receiver.getsockname()[1]))
+
+        pipeline_metrics.send(["a:1|c", "b:2|c"])
+
+        assert receiver.recv(1024) == b"a:1|c\nb:2|c"
+
+
+def test_send_never_fails_the_task(monkeypatch):
+    monkeypatch.setenv("PIPELINE_METRICS_HOST", "statsd-exporter.invalid")
+
+    pipeline_metrics.send(["a:1|c"])
+
+    monkeypatch.setenv("PIPELINE_METRICS_HOST", "")
+    pipeline_metrics.send(["a:1|c"])
@@ -0,0 +1,66 @@
+import json
+import marshal
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[4]
+sys.path.insert(0, str(PROJECT_ROOT / "platform" / "orchestration" / "airflow"))
+
+from include.task_profiling import TaskProfile, artifact_prefix, profiling_enabled, upload_artifacts
+
+
+class RecordingS3:
+    def __init__(self, presign=True):
+        self.objects = {}
+        self.presign = presign
+
+    def put_object(self, Bucket, Key, Body, ContentType):
+        self.objects[(Bucket, Key)] = (Body, ContentType)
+
+    def generate_presigned_url(self, operation, Params, ExpiresIn):
+        if not self.presign:
+            raise RuntimeError("no credentials")
+        return f"http://ceph:9000/{Params['Bucket']}/{Params['Key']}?signature"
+
+
+def test_profiling_enabled_matches_dag_task_or_wildcard():
+    assert profiling_enabled(["medallion_batch_demo"], "medallion_batch_demo", "publish_gold")
+    assert profiling_enabled(["medallion_batch_demo.publish_gold"], "medallion_batch_demo", "publish_gold")
+    assert profiling_enabled(["*"], "medallion_backfill", "backfill_day")
+    assert not profiling_enabled(["medallion_batch_demo.publish_gold"], "medallion_batch_demo", "bronze_to_silver")
+    assert not profiling_enabled([], "medallion_batch_demo", "publish_gold")
+    assert not profiling_enabled(None, "medallion_batch_demo", "publish_gold")
+
+
+def test_cprofile_profile_records_stacks_and_allocations():
+    with TaskProfile(engine="cprofile") as profile:
+        blocks = [bytearray(64 * 1024) for _ in range(16)]
+        sum(len(block) for block in blocks)
+
+    memory = json.loads(profile.artifacts["memory.json"])
+    assert memory["peak_bytes"] >= 16 * 64 * 1024
+    assert memory["top_allocations"][0]["size_bytes"] > 0
+    assert {"file", "line", "count"} <= set(memory["top_allocations"][0])
+    stats = marshal.loads(profile.artifacts["profile.pstats"])
+    assert any("builtins.sum" in function for _, _, function in stats)
+    assert b"cumulative" in profile.artifacts["profile.txt"]
+
+
+def test_artifact_prefix_separates_mapped_tries():
+    assert artifact_prefix("dag", "task", "manual__2024-01-01T00:00:00", -1, 2) == (
+        "profiles/dag/task/manual__2024-01-01T00_00_00/try2"
+    )
+    assert artifact_prefix("dag", "task", "scheduled__x", 3, 1).endswith("/map3-try1")
+
+
+def test_upload_artifacts_returns_presigned_links_or_s3_uris():
+    artifacts = {"memory.json": b"{}", "profile.html": b"<html/>"}
+
+    client = RecordingS3()
+    links = upload_artifacts(client, "silver", "profiles/dag/task/run/try1", artifacts)
+
+    assert client.objects[("silver", "profiles/dag/task/run/try1/profile.html")] == (b"<html/>", "text/html")
+    assert links["memory.json"].startswith("http://ceph:9000/silver/profiles/dag/task/run/try1/memory.json")
+
+    links = upload_artifacts(RecordingS3(presign=False), "silver", "p", artifacts)
+    assert links["profile.html"] == "s3://silver/p/profile.html"
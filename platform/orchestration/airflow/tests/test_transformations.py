@@ -1,12 +1,30 @@
+import gzip
+import json
 import sys
 from pathlib import Path
 
 import pandas as pd
+import pyarrow.parquet as pq
+import pytest
 
 PROJECT_ROOT = Path(__file__).resolve().parents[4]
 sys.path.insert(0, str(PROJECT_ROOT / "platform" / "orchestration" / "airflow"))
 
-from include.transformations import bronze_frame_from_records, silver_frame
+from include.transformations import (
+    BRONZE_COLUMNS,
+    ENGINES,
+    bronze_format,
+    bronze_frame_from_records,
+    bronze_to_silver_files,
+    read_bronze,
+    silver_frame,
+)
+
+
+def _rows(path):
+    table = pq.read_table(path)
+    rows = [{key: value for key, value in row.items() if not key.startswith("__")} for row in table.to_pylist()]
+    return sorted(rows, key=lambda row: row["order_id"])
 
 
 def test_bronze_frame_normalizes_types():
@@ -52,3 +70,129 @@ def test_silver_frame_filters_invalid_status():
     assert len(silver) == 1
     assert silver.iloc[0]["order_id"] == "ok"
     assert "ingestion_date" in silver.columns
+
+
+def _bronze_records(rows):
+    statuses = ["shipped", "delivered", "processing", "cancelled"]
+    return [
+        {
+            "order_id": f"ord-{index:08d}",
+            "order_date": "2024-01-01T10:00:00",
+            "customer_id": f"CUST-{index % 500:05d}",
+            "status": statuses[index % len(statuses)],
+            "sales_total": float(index % 1000),
+        }
+        for index in range(rows)
+    ]
+
+
+def test_silver_frame_uses_compact_dtypes_and_one_batch_timestamp():
+    stamp = pd.Timestamp("2024-01-02T03:04:05Z")
+
+    silver = silver_frame(bronze_frame_from_records(pd.DataFrame(_bronze_records(8))), ingested_at=stamp)
+
+    assert silver["order_id"].dtype == "string[pyarrow]"
+    assert silver["customer_id"].dtype == "string[pyarrow]"
+    assert isinstance(silver["status"].dtype, pd.CategoricalDtype)
+    assert set(silver["status"].cat.categories) == {"shipped", "delivered", "processing"}
+    assert (silver["ingestion_date"] == stamp).all()
+    assert pd.concat([silver, silver])["status"].dtype == silver["status"].dtype
+
+
+def test_silver_frame_memory_budget():
+    rows = 20_000
+    records = _bronze_records(rows)
+    stamp = pd.Timestamp("2024-01-02T00:00:00Z")
+
+    # The previous object-dtype implementation, kept as the baseline.
+    baseline = pd.DataFrame(records)
+    baseline["order_date"] = pd.to_datetime(baseline["order_date"])
+    baseline = baseline[baseline["status"].isin(["shipped", "delivered", "processing"])]
+    baseline["sales_total"] = baseline["sales_total"].astype(float)
+    baseline["ingestion_date"] = stamp
+    compact = silver_frame(records, ingested_at=stamp)
+
+    assert len(compact) == len(baseline)
+    baseline_per_row = baseline.memory_usage(deep=True).sum() / len(baseline)
+    compact_per_row = compact.memory_usage(deep=True).sum() / len(compact)
+    saved = baseline_per_row - compact_per_row
+    assert compact_per_row <= 0.5 * baseline_per_row, (
+        f"Silver uses {compact_per_row:.0f} B/row vs {baseline_per_row:.0f} B/row baseline ({saved:.0f} B/row saved)"
+    )
+
+
+@pytest.mark.parametrize("airbyte_envelope", [True, False])
+def test_pandas_and_duckdb_engines_match(tmp_path, airbyte_envelope):
+    pytest.importorskip("duckdb")
+    records = _bronze_records(300) + [
+        {"order_id": "00042", "order_date": "2024-01-03T00:00:00", "customer_id": "007", "status": "shipped", "sales_total": "12.50"}
+    ]
+    source = tmp_path / "orders.jsonl"
+    with source.open("w", encoding="utf-8") as handle:
+        for record in records:
+            payload = {"_airbyte_ab_id": "id", "_airbyte_data": record} if airbyte_envelope else record
+            handle.write(json.dumps(payload) + "\n")
+    stamp = pd.Timestamp("2024-01-04T05:06:07Z")
+
+    outputs = {}
+    for engine in ENGINES:
+        bronze_path, silver_path = tmp_path / f"{engine}-bronze.parquet", tmp_path / f"{engine}-silver.parquet"
+        counts = bronze_to_silver_files(str(source), str(bronze_path), str(silver_path), stamp, engine=engine)
+        outputs[engine] = (counts, _rows(bronze_path), _rows(silver_path))
+
+    assert outputs["pandas"][0] == outputs["duckdb"][0] == (301, 226)
+    assert outputs["pandas"][1] == outputs["duckdb"][1]
+    assert outputs["pandas"][2] == outputs["duckdb"][2]
+    assert {"order_id": "00042", "customer_id": "007"}.items() <= outputs["duckdb"][2][0].items()
+
+
+def _write_profiles(tmp_path, records):
+    """Write the same Bronze records in every Airbyte output profile; returns {profile: path}."""
+    envelope = [{"_airbyte_ab_id": f"id-{i}", "_airbyte_emitted_at": 1704067200000, "_airbyte_data": r} for i, r in enumerate(records)]
+    lines = "".join(json.dumps(row) + "\n" for row in envelope)
+    paths = {"jsonl": tmp_path / "orders.jsonl", "jsonl-gzip": tmp_path / "orders.jsonl.gz", "parquet": tmp_path / "orders.parquet"}
+    paths["jsonl"].write_text(lines, encoding="utf-8")
+    with gzip.open(paths["jsonl-gzip"], "wt", encoding="utf-8") as handle:
+        handle.write(lines)
+    # Airbyte's Parquet output keeps the metadata columns next to flattened record fields.
+    flat = pd.DataFrame([{**{k: v for k, v in row.items() if k != "_airbyte_data"}, **row["_airbyte_data"]} for row in envelope])
+    flat.to_parquet(paths["parquet"], index=False, compression="zstd")
+    return paths
+
+
+def test_bronze_format_prefers_magic_bytes_over_key():
+    assert bronze_format(b"PAR1", "orders.jsonl") == ("parquet", None)
+    assert bronze_format(b"\x1f\x8b\x08\x00") == ("jsonl", "gzip")
+    assert bronze_format(key="raw/orders/2024_01_01.parquet") == ("parquet", None)
+    assert bronze_format(b'{"_airbyte') == ("jsonl", None)
+
+
+def test_read_bronze_detects_profiles_and_projects_columns(tmp_path):
+    records = _bronze_records(2000)
+    paths = _write_profiles(tmp_path, records)
+    frames = {profile: read_bronze(str(path)) for profile, path in paths.items()}
+    frames["parquet-bytes"] = read_bronze(paths["parquet"].read_bytes())
+
+    expected = bronze_frame_from_records(pd.DataFrame(records))
+    for profile, frame in frames.items():
+        assert list(frame.columns) == BRONZE_COLUMNS, profile
+        pd.testing.assert_frame_equal(bronze_frame_from_records(frame), expected, check_dtype=False, obj=profile)
+    sizes = {profile: path.stat().st_size for profile, path in paths.items()}
+    assert sizes["parquet"] * 3 < sizes["jsonl"], sizes
+    assert sizes["jsonl-gzip"] * 3 < sizes["jsonl"], sizes
+
+
+def test_duckdb_reads_parquet_profile(tmp_path):
+    pytest.importorskip("duckdb")
+    paths = _write_profiles(tmp_path, _bronze_records(200))
+    stamp = pd.Timestamp("2024-01-04T05:06:07Z")
+
+    counts = {
+        engine: bronze_to_silver_files(
+            str(paths["parquet"]), str(tmp_path / f"{engine}-b.parquet"), str(tmp_path / f"{engine}-s.parquet"), stamp, engine
+        )
+        for engine in ENGINES
+    }
+
+    assert counts["pandas"] == counts["duckdb"]
+    assert pq.read_schema(tmp_path / "duckdb-b.parquet").names == BRONZE_COLUMNS
@@ -0,0 +1,38 @@
+"""Thin Pulsar subscription wrapper used by the CDC consumers."""
+from __future__ import annotations
+
+from typing import Any, Optional
+
+
+class PulsarBroker:
+    """Subscribe to a topic with explicit, per-message acknowledgement."""
+
+    def __init__(self, service_url: str, topic: str, subscription: str) -> None:
+        import pulsar
+
+        self._pulsar = pulsar
+        self._client = pulsar.Client(service_url)
+        self._consumer = self._client.subscribe(
+            topic,
+            subscription_name=subscription,
+            # A single active consumer per subscription keeps per-row change order intact.
+            consumer_type=pulsar.ConsumerType.Failover,
+            initial_position=pulsar.InitialPosition.Earliest,
+            negative_ack_redelivery_delay_ms=5_000,
+        )
+
+    def receive(self, timeout_ms: int) -> Optional[Any]:
+        try:
+            return self._consumer.receive(timeout_millis=max(int(timeout_ms), 1))
+        except self._pulsar.Timeout:
+            return None
+
+    def acknowledge(self, message: Any) -> None:
+        self._consumer.acknowledge(message)
+
+    def negative_acknowledge(self, message: Any) -> None:
+        self._consumer.negative_acknowledge(message)
+
+    def close(self) -> None:
+        self._consumer.close()
+        self._client.close()
@@ -0,0 +1,103 @@
+"""Size/time-bounded micro-batching with acknowledge-after-write semantics."""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Callable, List, Optional, Protocol
+
+from cdc.debezium import ChangeEvent, decode_event
+
+logger = logging.getLogger(__name__)
+
+
+class Broker(Protocol):
+    def receive(self, timeout_ms: int) -> Optional[Any]: ...
+
+    def acknowledge(self, message: Any) -> None: ...
+
+    def negative_acknowledge(self, message: Any) -> None: ...
+
+
+class Sink(Protocol):
+    def write(self, events: List[ChangeEvent]) -> None: ...
+
+
+class MicroBatchConsumer:
+    """Buffer decoded change events and hand them to a sink in batches.
+
+    A batch is flushed once it holds ``max_rows`` events or its oldest event has
+    waited ``max_interval_seconds``. Messages are acknowledged only after the sink
+    write succeeds; on failure they are negatively acknowledged for redelivery.
+    """
+
+    def __init__(
+        self,
+        broker: Broker,
+        sink: Sink,
+        max_rows: int = 5_000,
+        max_interval_seconds: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.broker = broker
+        self.sink = sink
+        self.max_rows = max_rows
+        self.max_interval_seconds = max_interval_seconds
+        self._clock = clock
+        self._events: List[ChangeEvent] = []
+        self._messages: List[Any] = []
+        self._batch_started: Optional[float] = None
+        self.flushed_events = 0
+        self.failed_flushes = 0
+        self.skipped_messages = 0
+
+    def _remaining_ms(self) -> int:
+        if self._batch_started is None:
+            return int(self.max_interval_seconds * 1000)
+        return int((self._batch_started + self.max_interval_seconds - self._clock()) * 1000)
+
+    def _due(self) -> bool:
+        if not self._messages:
+            return False
+        return len(self._events) >= self.max_rows or self._remaining_ms() <= 0
+
+    def poll_once(self) -> int:
+        """Receive at most one message, then flush if a threshold was reached."""
+        message = self.broker.receive(max(self._remaining_ms(), 1))
+        if message is not None:
+            try:
+                event = decode_event(message.data())
+            except (ValueError, TypeError, KeyError):
+                logger.exception("Skipping undecodable CDC message")
+                event = None
+                self.skipped_messages += 1
+            if self._batch_started is None:
+                self._batch_started = self._clock()
+            self._messages.append(message)
+            if event is not None:
+                self._events.append(event)
+        return self.flush() if self._due() else 0
+
+    def flush(self) -> int:
+        if not self._messages:
+            return 0
+        events, messages = self._events, self._messages
+        self._events, self._messages, self._batch_started = [], [], None
+        try:
+            if events:
+                self.sink.write(events)
+        except Exception:  # noqa: BLE001 - the batch is redelivered, so keep consuming
+            self.failed_flushes += 1
+            logger.exception("Sink write failed; redelivering %s messages", len(messages))
+            for message in messages:
+                self.broker.negative_acknowledge(message)
+            return 0
+        for message in messages:
+            self.broker.acknowledge(message)
+        self.flushed_events += len(events)
+        return len(events)
+
+    def run(self, stop: threading.Event) -> None:
+        while not stop.is_set():
+            self.poll_once()
+        self.flush()
@@ -0,0 +1,96 @@
+"""Stream Debezium ``gold.orders_snapshot`` changes into ClickHouse ``analytics.orders_clean_cdc``."""
+from __future__ import annotations
+
+import logging
+import os
+import signal
+import threading
+from datetime import date
+from typing import Any, Dict, List, Tuple
+
+from cdc.consumer import MicroBatchConsumer
+from cdc.debezium import ChangeEvent, decode_decimal, decode_timestamp
+
+SILVER_STATUSES = {"shipped", "delivered", "processing"}
+TARGET_TABLE = "analytics.orders_clean_cdc"
+INSERT_SQL = (
+    f"INSERT INTO {TARGET_TABLE}"
+    " (order_id, order_date, customer_id, status, sales_total, ingestion_date, version, is_deleted) VALUES"
+)
+
+logger = logging.getLogger(__name__)
+
+
+def silver_row(event: ChangeEvent) -> Tuple[Any, ...]:
+    """Map a change event onto the Silver schema.
+
+    Deletes, and rows whose status leaves the Silver filter, become ``is_deleted``
+    tombstones so ReplacingMergeTree drops the order on merge/FINAL.
+    """
+    row: Dict[str, Any] = event.row
+    status = row.get("status")
+    deleted = event.is_delete or status not in SILVER_STATUSES
+    ingested_at = decode_timestamp(row.get("ingested_at"))
+    return (
+        str(row["order_id"]),
+        decode_timestamp(row.get("order_date")),
+        row.get("customer_id") or "",
+        status or "",
+        decode_decimal(row.get("sales_total")),
+        ingested_at.date() if ingested_at else date.today(),
+        event.version,
+        int(deleted),
+    )
+
+
+class ClickHouseSilverSink:
+    def __init__(self, client: Any) -> None:
+        self.client = client
+
+    def write(self, events: List[ChangeEvent]) -> None:
+        latest: Dict[str, Tuple[Any, ...]] = {}
+        for event in events:
+            row = silver_row(event)
+            current = latest.get(row[0])
+            if current is None or row[6] >= current[6]:
+                latest[row[0]] = row
+        self.client.execute(INSERT_SQL, list(latest.values()))
+
+
+def main() -> None:
+    from clickhouse_driver import Client as ClickHouseClient
+
+    from cdc.broker import PulsarBroker
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    broker = PulsarBroker(
+        os.getenv("DEBEZIUM_PULSAR_SERVICE_URL", "pulsar://pulsar:6650"),
+        os.getenv("DEBEZIUM_PULSAR_TOPIC", "persistent://public/default/oner.orders"),
+        os.getenv("CDC_SILVER_SUBSCRIPTION", "orders-clean-cdc"),
+    )
+    client = ClickHouseClient(
+        host=os.getenv("CLICKHOUSE_HOST", "clickhouse"),
+        port=int(os.getenv("CLICKHOUSE_NATIVE_PORT", "9000")),
+        user=os.getenv("CLICKHOUSE_USER", "default"),
+        password=os.getenv("CLICKHOUSE_PASSWORD", ""),
+        database=os.getenv("CLICKHOUSE_DB", "analytics"),
+    )
+    consumer = MicroBatchConsumer(
+        broker,
+        ClickHouseSilverSink(client),
+        max_rows=int(os.getenv("CDC_FLUSH_MAX_ROWS", "5000")),
+        max_interval_seconds=float(os.getenv("CDC_FLUSH_INTERVAL_SECONDS", "2")),
+    )
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    logger.info("Consuming CDC events into %s", TARGET_TABLE)
+    try:
+        consumer.run(stop)
+    finally:
+        broker.close()
+        client.disconnect()
+
+
+if __name__ == "__main__":
+    main()
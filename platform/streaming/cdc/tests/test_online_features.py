@@ -0,0 +1,69 @@
+import sys
+from datetime import datetime
+from pathlib import Path
+
+STREAMING_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(STREAMING_ROOT))
+sys.path.insert(0, str(STREAMING_ROOT.parent))
+
+from cdc.debezium import ChangeEvent
+from cdc.online_features import CustomerFeatureState, OnlineFeatureSink, load_state
+
+
+def _event(op, order_id, customer_id, day, amount, version):
+    micros = int((datetime.fromisoformat(day) - datetime(1970, 1, 1)).total_seconds() * 1_000_000)
+    row = {"order_id": order_id, "customer_id": customer_id, "order_date": micros, "sales_total": amount}
+    return ChangeEvent(op=op, row=row, version=version, source_ts_ms=0)
+
+
+def test_sink_pushes_incremental_aggregates_and_checkpoints(tmp_path):
+    pushed = []
+    now = [datetime(2024, 3, 31, 12)]
+    state_path = str(tmp_path / "state.db")
+    sink = OnlineFeatureSink(load_state(state_path), pushed.extend, clock=lambda: now[0])
+
+    sink.write(
+        [
+            _event("c", "a", "7", "2024-03-30", 100.0, 1),
+            _event("c", "b", "7", "2024-01-05", 50.0, 2),
+            _event("c", "c", "8", "2024-03-10", 20.0, 3),
+            _event("u", "a", "7", "2024-03-30", 40.0, 4),
+            _event("c", "a", "7", "2024-03-30", 999.0, 1),
+        ]
+    )
+
+    latest = {row["customer_id"]: row for row in pushed}
+    assert latest[7]["total_transactions"] == 2
+    assert latest[7]["total_spend"] == 90.0
+    assert latest[7]["avg_transaction_value"] == 45.0
+    assert latest[7]["spend_last_30d"] == 40.0
+    assert latest[8]["spend_last_30d"] == 20.0
+
+    pushed.clear()
+    sink.write([_event("d", "c", "8", "2024-03-10", 20.0, 5)])
+    assert pushed[0]["customer_id"] == 8 and pushed[0]["total_transactions"] == 0
+
+    # Each flush committed only its own rows; a restart reads them back on demand.
+    assert not sink.state.orders
+    restored = load_state(state_path)
+    assert restored.features(7, now[0].date()) == sink.state.features(7, now[0].date())
+    assert restored.features(8, now[0].date())["total_spend"] == 0.0
+    pushed.clear()
+    OnlineFeatureSink(restored, pushed.extend, clock=lambda: now[0]).write([_event("u", "b", "7", "2024-01-05", 60.0, 6)])
+    assert pushed[0]["total_transactions"] == 2 and pushed[0]["total_spend"] == 100.0
+
+
+def test_window_slides_without_new_events():
+    pushed = []
+    now = [datetime(2024, 3, 31)]
+    sink = OnlineFeatureSink(CustomerFeatureState(), pushed.extend, clock=lambda: now[0])
+    sink.write([_event("c", "a", "7", "2024-03-15", 30.0, 1)])
+    pushed.clear()
+
+    sink.expire_if_due()
+    assert pushed == []
+
+    now[0] = datetime(2024, 4, 14)
+    sink.expire_if_due()
+    assert pushed[0]["spend_last_30d"] == 0.0
+    assert pushed[0]["total_spend"] == 30.0
@@ -0,0 +1,139 @@
+import json
+import sys
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+STREAMING_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(STREAMING_ROOT))
+
+from cdc.consumer import MicroBatchConsumer
+from cdc.debezium import decode_event
+from cdc.orders_silver import ClickHouseSilverSink
+
+
+class FakeMessage:
+    def __init__(self, payload):
+        self._payload = payload
+
+    def data(self):
+        return self._payload
+
+
+class InMemoryBroker:
+    """Pulsar stand-in: queued messages, ack bookkeeping and nack redelivery."""
+
+    def __init__(self, clock):
+        self._clock = clock
+        self.pending = deque()
+        self.acked = []
+        self.nacked = []
+
+    def publish(self, payload):
+        self.pending.append(FakeMessage(payload))
+
+    def receive(self, timeout_ms):
+        if self.pending:
+            return self.pending.popleft()
+        self._clock.advance(timeout_ms / 1000.0)
+        return None
+
+    def acknowledge(self, message):
+        self.acked.append(message)
+
+    def negative_acknowledge(self, message):
+        self.nacked.append(message)
+        self.pending.append(message)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class RecordingClickHouse:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.inserts = []
+
+    def execute(self, sql, rows):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("clickhouse unavailable")
+        self.inserts.append((sql, rows))
+
+
+def _envelope(op, order_id, status="shipped", amount=10.5, lsn=100, with_schema=True):
+    image = {
+        "order_id": order_id,
+        "order_date": 1704067200000000,
+        "customer_id": "ACME",
+        "sales_total": amount,
+        "status": status,
+        "ingested_at": 1704153600000000,
+    }
+    payload = {
+        "op": op,
+        "before": image if op == "d" else None,
+        "after": None if op == "d" else image,
+        "source": {"lsn": lsn, "ts_ms": 1704153600000},
+    }
+    return json.dumps({"schema": {}, "payload": payload} if with_schema else payload).encode()
+
+
+def test_decode_event_handles_schema_wrapper_and_tombstones():
+    event = decode_event(_envelope("u", "o-1", lsn=42))
+
+    assert event.op == "u" and event.version == 42
+    assert decode_event(_envelope("c", "o-1", with_schema=False)).row["order_id"] == "o-1"
+    assert decode_event(b"") is None
+    assert decode_event(b"null") is None
+
+
+def test_consumer_flushes_on_size_and_acks_after_insert():
+    clock = Clock()
+    broker = InMemoryBroker(clock)
+    clickhouse = RecordingClickHouse()
+    consumer = MicroBatchConsumer(broker, ClickHouseSilverSink(clickhouse), max_rows=3, max_interval_seconds=60, clock=clock)
+    broker.publish(_envelope("c", "o-1", lsn=1))
+    broker.publish(_envelope("u", "o-1", amount=12.0, lsn=2))
+    broker.publish(_envelope("c", "o-2", status="cancelled", lsn=3))
+    broker.publish(_envelope("d", "o-3", lsn=4))
+
+    for _ in range(3):
+        consumer.poll_once()
+
+    assert len(broker.acked) == 3
+    (_, rows), = clickhouse.inserts
+    by_id = {row[0]: row for row in rows}
+    assert by_id["o-1"][4] == 12.0 and by_id["o-1"][6] == 2 and by_id["o-1"][7] == 0
+    assert by_id["o-1"][1] == datetime(2024, 1, 1)
+    assert by_id["o-2"][7] == 1
+    assert len(broker.pending) == 1
+
+
+def test_consumer_flushes_on_time_and_redelivers_failed_batches():
+    clock = Clock()
+    broker = InMemoryBroker(clock)
+    clickhouse = RecordingClickHouse(failures=1)
+    consumer = MicroBatchConsumer(broker, ClickHouseSilverSink(clickhouse), max_rows=100, max_interval_seconds=2, clock=clock)
+    broker.publish(_envelope("d", "o-9", lsn=7))
+
+    consumer.poll_once()
+    assert clickhouse.inserts == [] and broker.acked == []
+
+    consumer.poll_once()
+    assert consumer.failed_flushes == 1
+    assert len(broker.nacked) == 1 and broker.acked == []
+
+    consumer.poll_once()
+    consumer.poll_once()
+    assert len(broker.acked) == 1
+    (_, rows), = clickhouse.inserts
+    assert rows[0][0] == "o-9" and rows[0][7] == 1